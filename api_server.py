@@ -0,0 +1,91 @@
+"""
+Headless HTTP/JSON API around one shared, warm ObsiQueryBot.
+
+    python api_server.py
+
+Endpoints:
+    GET  /health                 liveness check, with how often the search filters came from the fast path vs the LLM
+    POST /query                  {"message": ..., "thread_id": optional, "mode": optional "agent" | "fast"} -> {"thread_id", "reply", "artifact"}
+    POST /query/stream           same body, streams the bot's events as newline-delimited JSON
+
+Every conversation is isolated by its thread_id. Requests on the same thread are serialized so turns
+never interleave, and at most API_MAX_CONCURRENT_RUNS graph runs execute at once across all threads.
+"""
+import asyncio
+import json
+import uuid
+import weakref
+from typing import Any, AsyncIterator, Literal, Optional
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from src import bot
+from src.nodes.search_filter_fast_path import get_filter_path_counters
+from src.utils import config, setup_logger
+
+log = setup_logger(__name__)
+
+app = FastAPI(title="ObsiQuery API")
+
+_run_slots = asyncio.Semaphore(config.API_MAX_CONCURRENT_RUNS)
+# one lock per thread that currently has a request in flight; unused locks are dropped automatically
+_thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+class QueryRequest(BaseModel):
+    message: str = Field(..., min_length=1, description="The user's message.")
+    thread_id: Optional[str] = Field(default=None, description="Conversation to continue. A new one is started when omitted.")
+    mode: Optional[Literal["agent", "fast"]] = Field(default=None, description="Graph to answer with. Defaults to GRAPH_MODE.")
+
+
+class QueryResponse(BaseModel):
+    thread_id: str
+    reply: str
+    artifact: Optional[Any] = None
+
+
+def thread_lock(thread_id: str) -> asyncio.Lock:
+    lock = _thread_locks.get(thread_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _thread_locks[thread_id] = lock
+    return lock
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok", "search_filter_paths": get_filter_path_counters()}
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query(request: QueryRequest) -> QueryResponse:
+    thread_id = request.thread_id or str(uuid.uuid4())
+    lock = thread_lock(thread_id)
+    async with lock, _run_slots:
+        final: dict = {}
+        async for event in bot.astream(request.message, thread_id, request.mode):
+            if event["type"] in ("final", "error"):
+                final = event
+    if final.get("type") != "final":
+        raise HTTPException(status_code=500, detail=final.get("error", "The graph run did not finish."))
+    return QueryResponse(thread_id=thread_id, reply=str(final["reply"]), artifact=final.get("artifact"))
+
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest) -> StreamingResponse:
+    thread_id = request.thread_id or str(uuid.uuid4())
+
+    async def events() -> AsyncIterator[str]:
+        lock = thread_lock(thread_id)
+        async with lock, _run_slots:
+            yield json.dumps({"type": "thread", "thread_id": thread_id}) + "\n"
+            async for event in bot.astream(request.message, thread_id, request.mode):
+                yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+if __name__ == "__main__":
+    log.info(f"Starting ObsiQuery API on {config.API_HOST}:{config.API_PORT}")
+    uvicorn.run(app, host=config.API_HOST, port=config.API_PORT)
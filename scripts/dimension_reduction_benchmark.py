@@ -0,0 +1,82 @@
+"""
+Benchmark of reduced-dimension embeddings against full dimension.
+
+Embeds a sample of chunks from the vault with the full-dimension base model, uses the first line of
+random chunks as queries, and compares exact top-k search on full vectors with Matryoshka truncation
+and PCA projection (fitted on the sampled corpus) for latency, memory and recall@k.
+
+Usage:
+    python -m scripts.dimension_reduction_benchmark --chunks 3000 --queries 100 --dims 512 256 128
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from src.utils import config
+from src.data_ingestion.ingestion_logging import collect_markdown_metadata
+from src.data_ingestion.md_file_processor import load_markdown_file, chunk_documents
+from src.embedding import embedding_model_instance, DimensionReducer, ReducedDimensionEmbeddings
+from src.vector_store.vector_math import l2_normalize, top_k_indices
+
+
+def sample_chunk_texts(n: int, seed: int) -> list[str]:
+    texts = []
+    for file in collect_markdown_metadata(config.OBSIDIAN_VAULT_PATH): # type: ignore
+        texts.extend(chunk.page_content for chunk in chunk_documents(load_markdown_file(file), file))
+    random.Random(seed).shuffle(texts)
+    return texts[:n]
+
+
+def search(matrix: np.ndarray, queries: np.ndarray, k: int, repeats: int) -> tuple[np.ndarray, float]:
+    """Exact top-k, one query at a time. Returns indices (k, q) and mean ms per query."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        top = np.concatenate([top_k_indices(matrix @ q[:, None], k) for q in queries], axis=1)
+    return top, (time.perf_counter() - start) * 1000 / (repeats * len(queries))
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(found[:, i]) & set(truth[:, i])) / truth.shape[0] for i in range(truth.shape[1])]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dims", type=int, nargs="+", default=[512, 256, 128])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    base = embedding_model_instance.base_embeddings if isinstance(embedding_model_instance, ReducedDimensionEmbeddings) else embedding_model_instance
+
+    texts = sample_chunk_texts(args.chunks, args.seed)
+    query_texts = [text.strip().split("\n")[0] for text in random.Random(args.seed + 1).sample(texts, min(args.queries, len(texts)))]
+    print(f"Embedding {len(texts)} chunks and {len(query_texts)} queries with {config.OLLAMA_EMBEDDING_MODEL} ...")
+    corpus = l2_normalize(np.asarray(base.embed_documents(texts)))
+    queries = l2_normalize(np.asarray([base.embed_query(text) for text in query_texts]))
+
+    full_dim = corpus.shape[1]
+    truth, full_ms = search(corpus, queries, args.k, args.repeats)
+    print(f"{'mode':<11} {'dim':>5} {'recall@k':>9} {'ms/query':>9} {'MB':>8}")
+    print(f"{'full':<11} {full_dim:>5} {1.0:>9.3f} {full_ms:>9.3f} {corpus.nbytes / 2**20:>8.2f}")
+
+    for dim in args.dims:
+        if dim >= full_dim:
+            continue
+        for mode in ("matryoshka", "pca"):
+            reducer = DimensionReducer(mode, dim, projection_path=os.path.join(tempfile.gettempdir(), f"obsiquery_benchmark_projection_{dim}.npz"))
+            if mode == "pca":
+                if len(corpus) < dim:
+                    continue
+                reducer.fit(corpus)
+            reduced_corpus, reduced_queries = reducer.transform(corpus), reducer.transform(queries)
+            found, ms = search(reduced_corpus, reduced_queries, args.k, args.repeats)
+            print(f"{mode:<11} {dim:>5} {recall_at_k(found, truth):>9.3f} {ms:>9.3f} {reduced_corpus.nbytes / 2**20:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency comparison of the agent graph against the single-call fast mode graph.
+
+Sends the same questions through both graphs, each question in a fresh thread, and reports
+time to first answer token, total time and the number of LLM calls per question (median and p90).
+Modes alternate per question so model warm-up and caching do not favour one of them.
+
+Usage:
+    python -m scripts.graph_latency_benchmark --questions "What is the on-call process?" "Summarize project alpha"
+    python -m scripts.graph_latency_benchmark --questions-file questions.txt --repeats 2
+"""
+import argparse
+import time
+import uuid
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from src import bot
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.calls += 1
+
+
+def run_once(question: str, mode: str) -> dict:
+    """Streams one question through a graph and times it."""
+    counter = LLMCallCounter()
+    config = bot.get_thread_config(str(uuid.uuid4())) | {"callbacks": [counter]}
+    graph = bot.select_graph(mode)
+    result: dict = {"reply": "", "artifact": None}
+    first_token = None
+    start = time.perf_counter()
+    for stream_mode, chunk in graph.stream({"messages": [("user", question)]}, config=config, stream_mode=bot.STREAM_MODES):
+        for event in bot._stream_events(stream_mode, chunk, result):
+            if event["type"] == "token" and first_token is None:
+                first_token = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return {"first_token": first_token if first_token is not None else total, "total": total, "llm_calls": counter.calls, "reply": result["reply"]}
+
+
+def summarize(values: list) -> str:
+    return f"median {np.median(values):7.2f}  p90 {np.percentile(values, 90):7.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", nargs="*", default=[])
+    parser.add_argument("--questions-file", help="One question per line.")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--show-replies", action="store_true")
+    args = parser.parse_args()
+
+    questions = list(args.questions)
+    if args.questions_file:
+        with open(args.questions_file, encoding="utf-8") as f:
+            questions.extend(line.strip() for line in f if line.strip())
+    if not questions:
+        parser.error("Give at least one question with --questions or --questions-file.")
+
+    runs: dict = {"agent": [], "fast": []}
+    for repeat in range(args.repeats):
+        for i, question in enumerate(questions):
+            order = ("agent", "fast") if (i + repeat) % 2 == 0 else ("fast", "agent")
+            for mode in order:
+                run = run_once(question, mode)
+                runs[mode].append(run)
+                print(f"[{mode:5}] {run['total']:6.2f}s  first token {run['first_token']:6.2f}s  {run['llm_calls']} LLM calls  | {question[:60]}")
+                if args.show_replies:
+                    print(f"        {str(run['reply'])[:300]}")
+
+    print(f"\n{'':8}{'first token (s)':>30}   {'total (s)':>30}   LLM calls")
+    for mode, mode_runs in runs.items():
+        print(
+            f"{mode:8}{summarize([run['first_token'] for run in mode_runs]):>30}   "
+            f"{summarize([run['total'] for run in mode_runs]):>30}   {np.mean([run['llm_calls'] for run in mode_runs]):.1f}"
+        )
+    speedup = np.median([run["total"] for run in runs["agent"]]) / max(np.median([run["total"] for run in runs["fast"]]), 1e-9)
+    print(f"\nFast mode answers {speedup:.1f}x faster than the agent graph (median total latency).")
+
+
+if __name__ == "__main__":
+    main()
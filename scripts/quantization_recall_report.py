@@ -0,0 +1,88 @@
+"""
+Recall report for the quantized NumPy vector index.
+
+Compares the int8 and binary first-pass + full-precision rescoring search against the exact
+float32 search over the same index, using perturbed stored chunk vectors as queries.
+Runs on a temporary copy of the index, since opening it with a new quantization mode writes code files.
+
+Usage:
+    python -m scripts.quantization_recall_report --queries 200 --k 5
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from src.utils import config
+from src.vector_store.numpy_backend import BINARY_CODES_FILE, INT8_CODES_FILE, INT8_SCALES_FILE, NumpyVectorBackend
+from src.vector_store.quantization import code_bytes_per_vector
+from src.vector_store.vector_math import l2_normalize
+
+
+def sample_queries(backend: NumpyVectorBackend, n: int, noise: float, seed: int) -> np.ndarray:
+    """Random stored vectors with gaussian noise, so queries are near but not identical to chunks."""
+    rng = np.random.default_rng(seed)
+    ids = backend.ids()
+    picked = rng.choice(len(ids), size=min(n, len(ids)), replace=False)
+    vectors = backend.get_embeddings([ids[i] for i in np.sort(picked)])
+    return l2_normalize(vectors + rng.normal(scale=noise, size=vectors.shape).astype(np.float32))
+
+
+def timed_ids(backend: NumpyVectorBackend, queries: np.ndarray, k: int) -> tuple[list[set], float]:
+    """Runs one query at a time (the interactive case) and returns the hit ids and mean latency in ms."""
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append({hit.id for hit in backend.query(query[None, :], k)[0]})
+    return results, (time.perf_counter() - start) * 1000 / max(1, len(queries))
+
+
+def copy_index(source: Path, persist_directory: str) -> None:
+    """Copies the index files (without any quantized codes) to where a backend on `persist_directory` looks for them."""
+    target = Path(persist_directory) / "numpy_index" / source.name
+    shutil.copytree(source, target, ignore=shutil.ignore_patterns(INT8_CODES_FILE, INT8_SCALES_FILE, BINARY_CODES_FILE, "*.tmp"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.02)
+    parser.add_argument("--rescore-factor", type=int, default=config.VECTOR_RESCORE_FACTOR)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    source = Path(config.VECTOR_STORE_DIR) / "numpy_index" / config.VECTOR_STORE_COLLECTION # type: ignore
+    if not source.exists():
+        print("There is no NumPy index. Ingest notes with VECTOR_BACKEND=numpy first.")
+        return
+
+    with tempfile.TemporaryDirectory(prefix="obsiquery-recall-", ignore_cleanup_errors=True) as workdir:
+        copy_index(source, workdir)
+        exact = NumpyVectorBackend(config.VECTOR_STORE_COLLECTION, workdir) # type: ignore
+        if not exact.count() or not exact.dim:
+            print("The NumPy index is empty. Ingest notes with VECTOR_BACKEND=numpy first.")
+            return
+
+        queries = sample_queries(exact, args.queries, args.noise, args.seed)
+        truth, exact_ms = timed_ids(exact, queries, args.k)
+        full_bytes = code_bytes_per_vector(exact.dim, "none") * exact.count()
+
+        print(f"Index: {exact.count()} chunks, dim={exact.dim}, queries={len(queries)}, k={args.k}, rescore_factor={args.rescore_factor}")
+        print(f"{'mode':<8} {'recall@k':>9} {'ms/query':>9} {'resident MB':>12} {'reduction':>10}")
+        print(f"{'exact':<8} {1.0:>9.3f} {exact_ms:>9.2f} {full_bytes / 2**20:>12.1f} {1.0:>9.1f}x")
+
+        for mode in ("int8", "binary"):
+            backend = NumpyVectorBackend(
+                config.VECTOR_STORE_COLLECTION, workdir, # type: ignore
+                quantization=mode, rescore_factor=args.rescore_factor,
+            )
+            found, mode_ms = timed_ids(backend, queries, args.k)
+            recall = np.mean([len(f & t) / max(1, len(t)) for f, t in zip(found, truth)])
+            resident = code_bytes_per_vector(exact.dim, mode) * exact.count()
+            print(f"{mode:<8} {recall:>9.3f} {mode_ms:>9.2f} {resident / 2**20:>12.1f} {full_bytes / resident:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
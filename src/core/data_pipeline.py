@@ -1,6 +1,7 @@
 from src.data_ingestion.ingestion_logging import log_file_metadata,get_files_for_ingestion_from_log_table
 from src.data_ingestion.ingestion_pipeline import ingest_md_files_to_vector_database
 from src.utils import config,setup_logger
+from src.vector_store import reset_index_if_settings_changed
 
 logger = setup_logger(__name__)
 
@@ -9,6 +10,9 @@ def run_ingestion():
     # use this function to log metadata of Markdown files in a directory to the SQLite database. TODO: NEED TO ADD RETRY LOGIC.
         log_file_metadata(config.OBSIDIAN_VAULT_PATH) # type: ignore
 
+        # a changed backend / embedding setup requeues every file, so none stays 'completed' without vectors
+        reset_index_if_settings_changed()
+
         #query the database for files that are pending ingestion
         files_to_ingest = get_files_for_ingestion_from_log_table()
 
@@ -1,18 +1,26 @@
 from src.utils import setup_logger
 from src.llm import llm_instance
 from src.nodes import retrieve_notes_tool
+from src.utils import config
 from langgraph.checkpoint.memory import InMemorySaver
-from src.graph import create_simple_graph
-from langchain_core.messages import HumanMessage
+from src.graph import create_simple_graph, create_fast_graph
+from src.graph.sqlite_checkpointer import BoundedSQLiteSaver
+from src.graph.streaming import token_event
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from typing import AsyncIterator, Iterator, Optional
 
 log = setup_logger(__name__)
 
 class ObsiQueryBot:
+    STREAM_MODES = ["messages", "custom", "updates"] # tokens, progress events, node outputs
+    GRAPH_MODES = ("agent", "fast")
+
     def __init__(self):
         self.memory = self._initialize_memory_saver()
         self.tools = self._initialize_tools()
         self.llm = self._initialize_llm_with_tools()
         self.graph = self._initialize_graph()
+        self.fast_graph = self._initialize_fast_graph()
         log.info("ObsiQueryBot initialized")
 
     def _initialize_llm(self):
@@ -20,6 +28,15 @@ class ObsiQueryBot:
         return llm_instance
 
     def _initialize_memory_saver(self):
+        if config.CHECKPOINTER == "sqlite":
+            log.info(f"SQLite memory initialized for ObsiQueryBot at {config.CHECKPOINT_DB_FILE}")
+            return BoundedSQLiteSaver(
+                config.CHECKPOINT_DB_FILE,
+                ttl_seconds=config.CHECKPOINT_TTL_HOURS * 3600,
+                max_bytes=int(config.CHECKPOINT_MAX_DB_MB * 2**20),
+                keep_per_thread=config.CHECKPOINT_KEEP_PER_THREAD,
+                maintenance_interval=config.CHECKPOINT_MAINTENANCE_INTERVAL,
+            )
         log.info("Memory initialized for ObsiQueryBot")
         return InMemorySaver()
 
@@ -36,11 +53,29 @@ class ObsiQueryBot:
         log.info("Graph initialized for ObsiQueryBot")
         return create_simple_graph(llm_with_tools=self.llm,memory=self.memory,tools=self.tools)
     
+    def _initialize_fast_graph(self):
+        log.info("Fast graph initialized for ObsiQueryBot")
+        return create_fast_graph(llm=llm_instance, memory=self.memory)
+
+    def select_graph(self, mode: Optional[str] = None):
+        """
+        The graph for a request: 'agent' (ReAct agent with the RAG tool team) or 'fast' (retrieve from the
+        message and answer in one LLM call). Defaults to GRAPH_MODE. Both share the checkpointer, so a
+        thread can switch modes between turns.
+        """
+        mode = (mode or config.GRAPH_MODE).lower()
+        if mode not in self.GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode '{mode}', expected one of {self.GRAPH_MODES}.")
+        return self.fast_graph if mode == "fast" else self.graph
+
     def get_thread_config(self, thread_id: str) -> dict:
-        """Generates the LangGraph configuration for a given thread_id."""
-        return {"configurable": {"thread_id": thread_id}}    
+        """
+        Generates the LangGraph configuration for a given thread_id.
+        max_concurrency caps how many tool calls of one AI message the ToolNode runs at once (sync runs).
+        """
+        return {"configurable": {"thread_id": thread_id}, "max_concurrency": config.TOOL_CALL_CONCURRENCY}    
     
-    def invoke_graph(self, user_input: str , thread_id: str):
+    def invoke_graph(self, user_input: str , thread_id: str, mode: Optional[str] = None):
         """Invokes the LangGraph with user input for a specific thread."""
 
         if not user_input or not thread_id:
@@ -51,7 +86,7 @@ class ObsiQueryBot:
         log.debug(f"Invoking graph for thread '{thread_id}' with input: '{user_input}'")
 
         try:
-            response = self.graph.invoke({"messages": [HumanMessage(content=user_input)]}, config=config) # type: ignore
+            response = self.select_graph(mode).invoke({"messages": [HumanMessage(content=user_input)]}, config=config) # type: ignore
             log.debug(f"Graph response for thread '{thread_id}': {response}")
 
             if response and "messages" in response and response["messages"]:
@@ -60,3 +95,98 @@ class ObsiQueryBot:
         except Exception as e:
             log.exception(f"Error invoking graph for thread '{thread_id}': {e}")
             return {"error": str(e), " -- full_response -- ": None}
+
+    async def ainvoke_graph(self, user_input: str, thread_id: str, mode: Optional[str] = None):
+        """Async version of `invoke_graph`, so many threads can be served from one event loop."""
+
+        if not user_input or not thread_id:
+            log.error("User input and thread_id are required for graph invocation.")
+            return {"error": "Missing user input or thread ID."}
+
+        config = self.get_thread_config(thread_id)
+        log.debug(f"Invoking graph (async) for thread '{thread_id}' with input: '{user_input}'")
+
+        try:
+            response = await self.select_graph(mode).ainvoke({"messages": [HumanMessage(content=user_input)]}, config=config) # type: ignore
+            log.debug(f"Graph response for thread '{thread_id}': {response}")
+
+            if response and "messages" in response and response["messages"]:
+                return {"reply": response["messages"][-1].content, " -- full_response -- ": response}
+            return {"reply": "No message found in graph's response.", " -- full_response --": response}
+        except Exception as e:
+            log.exception(f"Error invoking graph for thread '{thread_id}': {e}")
+            return {"error": str(e), " -- full_response -- ": None}
+
+    def stream_graph(self, user_input: str, thread_id: str, mode: Optional[str] = None) -> Iterator[dict]:
+        """
+        Runs the graph for a specific thread and yields events as they happen, instead of one reply at the end:
+        - {"type": "progress", "stage": ..., "message": ...} when the RAG tool plans, searches or synthesizes
+        - {"type": "token", "source": "agent" | "synthesizer", "content": ...} for every LLM token
+        - {"type": "final", "reply": ..., "artifact": ...} once the agent has answered
+        - {"type": "error", "error": ...} if the run fails
+        Agent tokens streamed before a tool call are the agent's own reasoning; the reply is the text after the last tool call.
+        `mode` picks the graph ('agent' or 'fast', see `select_graph`).
+        """
+        if not user_input or not thread_id:
+            log.error("User input and thread_id are required for graph invocation.")
+            yield {"type": "error", "error": "Missing user input or thread ID."}
+            return
+
+        config = self.get_thread_config(thread_id)
+        log.debug(f"Streaming graph for thread '{thread_id}' with input: '{user_input}'")
+
+        result: dict = {"reply": "", "artifact": None}
+        try:
+            for stream_mode, chunk in self.select_graph(mode).stream(
+                {"messages": [HumanMessage(content=user_input)]}, config=config, stream_mode=self.STREAM_MODES # type: ignore
+            ):
+                yield from self._stream_events(stream_mode, chunk, result)
+            yield self._final_event(result)
+        except Exception as e:
+            log.exception(f"Error streaming graph for thread '{thread_id}': {e}")
+            yield {"type": "error", "error": str(e)}
+
+    async def astream(self, user_input: str, thread_id: str, mode: Optional[str] = None) -> AsyncIterator[dict]:
+        """Async version of `stream_graph`, yielding the same events."""
+        if not user_input or not thread_id:
+            log.error("User input and thread_id are required for graph invocation.")
+            yield {"type": "error", "error": "Missing user input or thread ID."}
+            return
+
+        config = self.get_thread_config(thread_id)
+        log.debug(f"Streaming graph (async) for thread '{thread_id}' with input: '{user_input}'")
+
+        result: dict = {"reply": "", "artifact": None}
+        try:
+            async for stream_mode, chunk in self.select_graph(mode).astream(
+                {"messages": [HumanMessage(content=user_input)]}, config=config, stream_mode=self.STREAM_MODES # type: ignore
+            ):
+                for event in self._stream_events(stream_mode, chunk, result):
+                    yield event
+            yield self._final_event(result)
+        except Exception as e:
+            log.exception(f"Error streaming graph for thread '{thread_id}': {e}")
+            yield {"type": "error", "error": str(e)}
+
+    @staticmethod
+    def _stream_events(mode: str, chunk, result: dict) -> list[dict]:
+        """Maps one (mode, chunk) item of a multi-mode graph stream to UI events, and records the reply / artifact in `result`."""
+        if mode == "messages":
+            event = token_event(*chunk)
+            return [event] if event else []
+        if mode == "custom":
+            return [{"type": "progress", **chunk}]
+        if mode == "updates":
+            for update in chunk.values():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, ToolMessage) and message.artifact:
+                        result["artifact"] = message.artifact
+                    elif isinstance(message, AIMessage) and not message.tool_calls:
+                        result["reply"] = message.content
+                        if message.response_metadata.get("sources"):  # fast mode answers carry their sources
+                            result["artifact"] = message.response_metadata["sources"]
+        return []
+
+    @staticmethod
+    def _final_event(result: dict) -> dict:
+        return {"type": "final", "reply": result["reply"] or "No message found in graph's response.", "artifact": result["artifact"]}
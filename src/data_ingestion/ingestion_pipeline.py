@@ -1,9 +1,15 @@
-from typing import List
-from src.utils import setup_logger,is_valid_metadata,Status
+import json
+import random
+from typing import List, Tuple
+from langchain_core.documents import Document
+from src.utils import setup_logger,is_valid_metadata,Status,config
 from src.models import FileMetadata
 from src.data_ingestion.md_file_processor import load_markdown_file, chunk_documents
-from src.vector_store import upload_documents_to_vector_store
+from src.data_ingestion.note_properties import extract_note_properties
+from src.vector_store import upload_documents_to_vector_store, save_note_centroids, refresh_filename_index
 from src.data_ingestion import SQLiteDB
+from src.embedding import embedding_model_instance, ReducedDimensionEmbeddings
+import numpy as np
 
 log = setup_logger(__name__)
 
@@ -11,6 +17,8 @@ def ingest_md_files_to_vector_database(files: List[FileMetadata]):
     """
     Ingests a list of Markdown files from log table by loading, chunking, and uploading them to the vector DB.
     Skips files with invalid metadata or ingestion issues, but continues processing others.
+    Files stream through chunk → upload one at a time. Only an unfitted PCA projection changes that: the first
+    files are chunked until there are EMBEDDING_PCA_FIT_SAMPLES chunks to fit it on, then uploaded.
     """
     if not files:
         log.warning("No files available for ingestion. Please check logs.")
@@ -19,53 +27,114 @@ def ingest_md_files_to_vector_database(files: List[FileMetadata]):
     log.info(f" -----  Starting ingestion of {len(files)} markdown files. ----- ")
     # need to think about implementing batch processing.
 
-    for file in files:
-        log.info(f"Processing file: {file.file_path}")
-        # sqlite db to be updated with status started.
-        try:
-            with SQLiteDB() as db:
-                db.update_file_status(file.id, Status.PROCESSING.value)
-            process_single_file(file)
-        except Exception as e:
-            with SQLiteDB() as db:
-                db.update_file_status(file.id, Status.FAILED.value, error_message=str(e))
-            log.error(f"Failed to process file {file.file_path}. Continuing with next. Error: {e}", exc_info=True)
+    fit_sample: List[Tuple[FileMetadata, List[Document]]] = []
+    if needs_dimension_reduction_fit():
+        sampled_chunks = 0
+        for file in files:
+            if sampled_chunks >= config.EMBEDDING_PCA_FIT_SAMPLES:
+                break
+            chunks = start_file(file)
+            fit_sample.append((file, chunks))
+            sampled_chunks += len(chunks)
+        fit_dimension_reduction([chunk for _, chunks in fit_sample for chunk in chunks])
 
+    for file, chunks in fit_sample:
+        finish_file(file, chunks)
+    for file in files[len(fit_sample):]:
+        finish_file(file, start_file(file))
+
+    save_note_centroids()
+    refresh_filename_index()
     log.info("Ingestion pipeline completed.")
 
 
-def process_single_file(file: FileMetadata):
+def start_file(file: FileMetadata) -> List[Document]:
+    """Marks the file as processing and chunks it. A failure marks it failed and returns no chunks."""
+    log.info(f"Processing file: {file.file_path}")
+    # sqlite db to be updated with status started.
+    try:
+        with SQLiteDB() as db:
+            db.update_file_status(file.id, Status.PROCESSING.value)
+        return chunk_single_file(file)
+    except Exception as e:
+        mark_file_failed(file, e)
+        return []
+
+
+def finish_file(file: FileMetadata, chunks: List[Document]):
+    """Uploads the file's chunks, if any. A failure marks it failed, and ingestion continues with the next file."""
+    if not chunks:
+        return
+    try:
+        upload_single_file(file, chunks)
+    except Exception as e:
+        mark_file_failed(file, e)
+
+
+def mark_file_failed(file: FileMetadata, error: Exception):
+    with SQLiteDB() as db:
+        db.update_final_ingestion_status(file.id, 0, Status.FAILED.value, error_message=str(error))
+    log.error(f"Failed to process file {file.file_path}. Continuing with next. Error: {error}", exc_info=True)
+
+
+def chunk_single_file(file: FileMetadata) -> List[Document]:
     """
-    Full ingestion pipeline for a single file: validation → load → chunk → vector upload.
+    First half of the ingestion of a single file: validation → load → chunk.
+    Returns no chunks when there is nothing to upload.
     """
     if not is_valid_metadata(file):
         log.warning(f"Skipping invalid file metadata: {file.file_path}")
-        return
+        return []
     
     log.debug(f"Processing file: {file.file_path}")
 
-    try: 
-        documents = load_markdown_file(file)    
-        if not documents:
-            log.warning(f"No documents loaded from file: {file.file_path}")
-            return
-        # log.info(f"Loaded {len(documents)} documents from file: {file.file_path}")
-        
-        chunks = chunk_documents(documents, file)
-        if not chunks:
-            log.warning(f"No chunks formed from file: {file.file_path}")
-            return
-        log.info(f"Formed {len(chunks)} chunks from file: {file.file_path}")
-
-        upload_documents_to_vector_store(chunks,file.id)
+    documents = load_markdown_file(file)    
+    if not documents:
+        log.warning(f"No documents loaded from file: {file.file_path}")
+        return []
+    # log.info(f"Loaded {len(documents)} documents from file: {file.file_path}")
 
-        with SQLiteDB() as db:
-            db.update_final_ingestion_status(file.id, len(chunks), Status.COMPLETED.value)
-        log.info(f"Successfully processed and uploaded chunks for file: {file.file_path}")
+    # frontmatter, tags and wikilinks are parsed once here and reused for the log table and chunk metadata
+    note_properties = extract_note_properties(documents[0].page_content)
+    with SQLiteDB() as db:
+        db.update_file_metadata_json(file.id, json.dumps(note_properties, default=str))
+        db.replace_note_links(file.id, note_properties["wikilinks"])
+    
+    chunks = chunk_documents(documents, file, note_properties)
+    if not chunks:
+        log.warning(f"No chunks formed from file: {file.file_path}")
+        return []
+    log.info(f"Formed {len(chunks)} chunks from file: {file.file_path}")
+    return chunks
+
+
+def upload_single_file(file: FileMetadata, chunks: List[Document]):
+    """Second half of the ingestion of a single file: vector upload → completed status."""
+    upload_documents_to_vector_store(chunks,file.id)
+
+    with SQLiteDB() as db:
+        db.update_final_ingestion_status(file.id, len(chunks), Status.COMPLETED.value)
+    log.info(f"Successfully processed and uploaded chunks for file: {file.file_path}")
 
-    except Exception as e:
-        log.error(f"Error processing file {file.file_path}: {e}", exc_info=True)
-        with SQLiteDB() as db:
-            db.update_final_ingestion_status(file.id, 0, Status.FAILED.value, error_message=str(e))
-        raise 
 
+def needs_dimension_reduction_fit() -> bool:
+    return isinstance(embedding_model_instance, ReducedDimensionEmbeddings) and not embedding_model_instance.reducer.is_fitted
+
+
+def fit_dimension_reduction(chunks: List[Document]):
+    """
+    Fits the PCA projection once over the corpus before the first ingestion that needs it.
+    Samples up to EMBEDDING_PCA_FIT_SAMPLES of the chunks about to be uploaded, embeds them
+    with the full-dimension base model and persists the projection for ingestion and search.
+    Never raises: a failed fit leaves the projection unfitted and only the uploads that need it fail.
+    """
+    log.info("Fitting embedding dimension reduction over the corpus.")
+    texts = [chunk.page_content for chunk in chunks]
+    if len(texts) > config.EMBEDDING_PCA_FIT_SAMPLES:
+        texts = random.Random(0).sample(texts, config.EMBEDDING_PCA_FIT_SAMPLES)
+
+    try:
+        vectors = np.asarray(embedding_model_instance.base_embeddings.embed_documents(texts), dtype=np.float32)
+        embedding_model_instance.reducer.fit(vectors)
+    except Exception as e:
+        log.error(f"Could not fit the embedding dimension reduction: {e}", exc_info=True)
@@ -1,10 +1,13 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from src.utils import setup_logger,config
 from src.models import FileMetadata
 from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
 from src.models import FileMetadata
 from markdown_it import MarkdownIt
+from .note_properties import (
+    NoteProperties, split_frontmatter, build_chunk_metadata, build_folder_metadata, build_heading_metadata, build_time_metadata
+)
 
 
 log = setup_logger(__name__)
@@ -33,12 +36,13 @@ def load_markdown_file(file: FileMetadata) -> List[Document]:
 
     return documents
 
-def chunk_documents(documents: List[Document], file_metadata: FileMetadata ) -> List[Document]:
+def chunk_documents(documents: List[Document], file_metadata: FileMetadata, note_properties: Optional[NoteProperties] = None) -> List[Document]:
     """
     Orchestrates the Markdown chunking process:
-    1. Consume raw text from the TextLoader Document.
+    1. Consume raw text from the TextLoader Document and blank out the YAML frontmatter.
     2. Get semantic blocks using markdown-it-py.
     3. Assemble blocks into LangChain Document chunks with overlap and metadata.
+    4. Attach the folder scope, the note-level properties (tags, frontmatter) and the note timestamps to every chunk.
     Assumes input 'documents' is a list containing a single Document from TextLoader. idk why but langchain load method emits a list of Documents containing a single Document.
     Returns a list of Document chunks.
     """
@@ -47,8 +51,9 @@ def chunk_documents(documents: List[Document], file_metadata: FileMetadata ) ->
          return []
 
     raw_text = documents[0].page_content # Get raw text from TextLoader Document
+    _, body_text = split_frontmatter(raw_text) # frontmatter goes into metadata, not into chunks
 
-    semantic_blocks = get_semantic_blocks(raw_text)
+    semantic_blocks = get_semantic_blocks(body_text)
     log.info(f"Extracted {len(semantic_blocks)} semantic blocks from {file_metadata.file_path}")
 
     if not semantic_blocks:
@@ -64,6 +69,15 @@ def chunk_documents(documents: List[Document], file_metadata: FileMetadata ) ->
         file_metadata.id,    # Pass log_id
         file_metadata.file_name
     )
+    note_metadata = build_folder_metadata(file_metadata.file_path, config.OBSIDIAN_VAULT_PATH)
+    if note_properties:
+        note_metadata.update(build_chunk_metadata(note_properties))
+    note_metadata.update(build_time_metadata(
+        file_metadata.file_name, file_metadata.file_path, file_metadata.last_modified, note_metadata.get("note_date")
+    ))
+    for chunk in final_chunks:
+        chunk.metadata.update(note_metadata)
+
     # for chunk in final_chunks:
     #     log.info(f'Final Chunk:{chunk}')
     #     log.info('_______________________________________---------------------________________________________________')
@@ -85,6 +99,7 @@ def assemble_chunks_from_semantic_blocks(
     final_chunks: List[Document] = []
     current_chunk_strings: List[str] = [] # Stores raw content strings for the current chunk
     current_chunk_blocks: List[SemanticBlock] = [] # Stores block objects for metadata lookup (first block's header)
+    current_overlap_blocks: List[SemanticBlock] = [] # Overlap blocks carried into the current chunk, only used for char offsets
 
     # Store blocks from the *previous* finalized chunk to generate overlap for the *next* chunk.
     # store the actual blocks because we need their content and header 
@@ -95,16 +110,28 @@ def assemble_chunks_from_semantic_blocks(
         """Calculates length of joined string with '\n\n' separators."""
         return len("\n\n".join(parts)) if parts else 0
 
+    # Helper to build chunk metadata. chunk_index is the chunk's ordinal within the file and char_start / char_end
+    # its span in the raw file text (overlap included), both used to look up neighbouring chunks later.
+    def create_chunk_metadata(blocks_in_chunk: List[SemanticBlock], span_blocks: List[SemanticBlock]) -> Dict[str, Any]:
+         first_block = blocks_in_chunk[0] if blocks_in_chunk else {}
+         return {
+             'source': source, 'file_name': file_name, 'log_id': log_id,
+             'section_title': first_block.get('header', ""),
+             'heading_path': first_block.get('heading_path', ""),
+             **build_heading_metadata(first_block.get('heading_trail', [])),
+             'chunk_index': len(final_chunks),
+             'char_start': span_blocks[0].get('start', 0) if span_blocks else 0,
+             'char_end': span_blocks[-1].get('end', 0) if span_blocks else 0,
+         }
+
     # Helper to create a chunk Document
-    def create_chunk_document(content_parts: List[str], blocks_in_chunk: List[SemanticBlock]):
+    def create_chunk_document(content_parts: List[str], blocks_in_chunk: List[SemanticBlock], overlap_blocks: List[SemanticBlock]):
          """Creates a LangChain Document from content parts and block metadata."""
          page_content = "\n\n".join(content_parts).strip() # Strip final chunk content
 
-         section_title = blocks_in_chunk[0]['header'] if blocks_in_chunk else ""
-
          return Document(
              page_content=page_content,
-             metadata={'source': source, 'file_name': file_name, 'log_id': log_id, 'section_title': section_title}
+             metadata=create_chunk_metadata(blocks_in_chunk, overlap_blocks + blocks_in_chunk)
          )
 
     for i, block in enumerate(semantic_blocks):
@@ -126,7 +153,7 @@ def assemble_chunks_from_semantic_blocks(
              final_chunks.append(
                  Document(
                      page_content=block_text.strip(), # Strip content of the single block chunk
-                     metadata={'source': source, 'file_name': file_name, 'log_id': log_id, 'section_title': block_header}
+                     metadata=create_chunk_metadata([block], [block])
                  )
              )
              # previous_chunk_blocks remains unchanged from before this oversized block.
@@ -137,13 +164,14 @@ def assemble_chunks_from_semantic_blocks(
         elif potential_len > chunk_size:
             log.debug(f"Chunk size exceeded ({potential_len} > {chunk_size}) by block type: {block_type}. Finalizing current chunk.")
             # Finalize the current chunk (excluding the block that would exceed)
-            final_chunks.append(create_chunk_document(current_chunk_strings, current_chunk_blocks))
+            final_chunks.append(create_chunk_document(current_chunk_strings, current_chunk_blocks, current_overlap_blocks))
 
             # Save blocks from this just-finalized chunk for potential overlap in the *next* chunk
             previous_chunk_blocks = current_chunk_blocks[:] # Shallow copy
 
             current_chunk_strings = []
             current_chunk_blocks = []
+            current_overlap_blocks = []
 
             overlap_parts: List[str] = [] # Stores the string content parts for the overlap
 
@@ -173,6 +201,7 @@ def assemble_chunks_from_semantic_blocks(
                  # If overlap was generated add it to the new chunk buffer
                  if overlap_parts:
                       current_chunk_strings.extend(overlap_parts)
+                      current_overlap_blocks = temp_overlap_blocks
                       # current_chunk_blocks DON'T include overlap blocks for the purpose of section_title 
 
             current_chunk_strings.append(block_text)
@@ -184,7 +213,7 @@ def assemble_chunks_from_semantic_blocks(
 
     if current_chunk_strings:
         log.debug(f"Finalizing last chunk with {len(current_chunk_strings)} parts.")
-        final_chunks.append(create_chunk_document(current_chunk_strings, current_chunk_blocks))
+        final_chunks.append(create_chunk_document(current_chunk_strings, current_chunk_blocks, current_overlap_blocks))
 
     # log.info(f"Assembled {len(final_chunks)} chunks.")
     return final_chunks
@@ -196,13 +225,24 @@ def get_semantic_blocks(raw_markdown_text: str) -> List[SemanticBlock]:
     (headings, paragraphs, code, lists, etc.) with associated headers.
     Uses token.map for precise text extraction from original lines.
     Headers are included as distinct 'heading' blocks.
+    Every block also carries its char span ('start', 'end') in the raw text and its full
+    heading breadcrumb ('heading_path', e.g. "Project > Design > API", and as a list in 'heading_trail').
     """
     md = MarkdownIt()
     tokens = md.parse(raw_markdown_text)
     lines = raw_markdown_text.split('\n')
 
+    # char offset at which every line starts, plus one sentinel for the end of the text
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line) + 1)
+
+    def char_span(start_line: int, end_line_exclusive: int) -> Dict[str, int]:
+        return {'start': line_starts[start_line], 'end': min(line_starts[end_line_exclusive] - 1, len(raw_markdown_text))}
+
     semantic_blocks: List[SemanticBlock] = []
     current_header_text: str = ""
+    heading_stack: List[tuple] = [] # (level, text) of the enclosing headings
     i = 0 # Token index
 
     while i < len(tokens):
@@ -219,6 +259,12 @@ def get_semantic_blocks(raw_markdown_text: str) -> List[SemanticBlock]:
                  header_text_stripped = next_token.content.strip()
             current_header_text = header_text_stripped # Update tracker
 
+            level = int(token.tag[1]) if token.tag.startswith('h') and token.tag[1:].isdigit() else 1
+            while heading_stack and heading_stack[-1][0] >= level:
+                heading_stack.pop()
+            heading_stack.append((level, header_text_stripped))
+            current_heading_trail = [text for _, text in heading_stack if text]
+
             # Now extract the raw markdown header line(s) using token.map
             header_content = ""
             if token.map: # Ensure map exists for this token
@@ -231,7 +277,10 @@ def get_semantic_blocks(raw_markdown_text: str) -> List[SemanticBlock]:
                  semantic_blocks.append({
                      'type': 'heading', # Explicitly label this block as a heading
                      'content': header_content, # Raw markdown header text 
-                     'header': header_text_stripped # Store stripped text as well
+                     'header': header_text_stripped, # Store stripped text as well
+                     'heading_path': " > ".join(current_heading_trail),
+                     'heading_trail': current_heading_trail,
+                     **char_span(*token.map), # type: ignore
                  })
 
             i += 3
@@ -268,7 +317,10 @@ def get_semantic_blocks(raw_markdown_text: str) -> List[SemanticBlock]:
                   semantic_blocks.append({
                      'type': block_type,
                      'content': block_content,
-                     'header': current_header_text 
+                     'header': current_header_text,
+                     'heading_path': " > ".join(text for _, text in heading_stack if text),
+                     'heading_trail': [text for _, text in heading_stack if text],
+                     **char_span(start_line, end_line_exclusive),
                   })
 
              if token_type in ['fence', 'code_block', 'hr', 'html_block']:
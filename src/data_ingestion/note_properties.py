@@ -0,0 +1,229 @@
+import os
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import yaml
+from src.utils import setup_logger, to_unix_timestamp
+
+log = setup_logger(__name__)
+
+NoteProperties = Dict[str, Any]
+
+FRONTMATTER_PATTERN = re.compile(r"\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+FENCED_CODE_PATTERN = re.compile(r"^(```|~~~).*?^\1", re.DOTALL | re.MULTILINE)
+INLINE_CODE_PATTERN = re.compile(r"`[^`\n]*`")
+INLINE_TAG_PATTERN = re.compile(r"(?<![\w/#&\[])#([A-Za-z_][\w\-/]*)")
+WIKILINK_PATTERN = re.compile(r"!?\[\[([^\]\|#\^]+)(?:[#\^][^\]\|]*)?(?:\|[^\]]*)?\]\]")
+
+# Frontmatter keys whose value is the note's own date, in order of preference.
+NOTE_DATE_KEYS = ("date", "created", "created_at", "creation_date", "day")
+# Embedded attachments are links too, but not to notes.
+NON_NOTE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".pdf", ".mp3", ".mp4", ".canvas", ".excalidraw")
+# Daily notes are named after their day, e.g. '2024-05-17.md' or 'Journal 2024_05_17.md'.
+FILENAME_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})[-_.](\d{2})[-_.](\d{2})(?!\d)")
+# Number of folder levels / heading levels stored as separate `folder_<i>` / `heading_<i>` metadata keys.
+MAX_SCOPE_DEPTH = 6
+
+
+def split_frontmatter(raw_text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Splits YAML frontmatter from the note body.
+    The frontmatter is blanked out (not removed) in the returned body so char offsets still match the raw file.
+    """
+    match = FRONTMATTER_PATTERN.match(raw_text)
+    if not match:
+        return {}, raw_text
+
+    frontmatter: Dict[str, Any] = {}
+    try:
+        loaded = yaml.safe_load(match.group(1))
+        if isinstance(loaded, dict):
+            frontmatter = {str(key): value for key, value in loaded.items()}
+    except yaml.YAMLError as e:
+        log.warning(f"Could not parse frontmatter, treating it as empty: {e}")
+
+    blanked = re.sub(r"[^\n]", " ", match.group(0))
+    return frontmatter, blanked + raw_text[match.end():]
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value if v is not None]
+    return [part for part in re.split(r"[,\s]+", str(value)) if part]
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip("#").lower()
+
+
+def extract_note_properties(raw_text: str) -> NoteProperties:
+    """
+    Parses the note-level metadata once at ingestion:
+    frontmatter properties, tags (frontmatter `tags` / `tag` plus inline #tags) and [[wikilink]] targets.
+    """
+    frontmatter, body = split_frontmatter(raw_text)
+    searchable_body = INLINE_CODE_PATTERN.sub("", FENCED_CODE_PATTERN.sub("", body))
+
+    tags = [normalize_tag(t) for t in _as_list(frontmatter.get("tags")) + _as_list(frontmatter.get("tag"))]
+    tags += [normalize_tag(t) for t in INLINE_TAG_PATTERN.findall(searchable_body)]
+
+    wikilinks = []
+    for target in WIKILINK_PATTERN.findall(searchable_body):
+        target = target.strip()
+        if target and not target.lower().endswith(NON_NOTE_EXTENSIONS):
+            wikilinks.append(target)
+
+    return {
+        "frontmatter": frontmatter,
+        "tags": list(dict.fromkeys(t for t in tags if t)),
+        "wikilinks": list(dict.fromkeys(wikilinks)),
+    }
+
+
+def property_value_for_filter(value: Any) -> str:
+    """Canonical string form of a property value, shared by ingestion and the search filters."""
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(property_value_for_filter(v) for v in value)
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return str(value).strip().lower()
+
+
+def property_key(name: str) -> str:
+    """Metadata key of a property's canonical value: 'Status' -> 'prop:status'."""
+    return f"prop:{name.strip().lower()}"
+
+
+def property_element_key(name: str, value: Any) -> str:
+    """Metadata key flagging one element of a list property: ('Authors', 'Ada') -> 'prop:authors:ada'."""
+    return f"{property_key(name)}:{property_value_for_filter(value)}"
+
+
+def filename_date(file_name: str) -> Optional[float]:
+    """Unix timestamp of the date in a daily-note style file name, or None."""
+    match = FILENAME_DATE_PATTERN.search(file_name)
+    if not match:
+        return None
+    try:
+        return to_unix_timestamp(date(*(int(part) for part in match.groups())))
+    except ValueError:  # e.g. 2024-13-45
+        return None
+
+
+def file_created_time(file_path: str) -> Optional[float]:
+    """Creation time of the file where the OS records one (st_birthtime on macOS / BSD, st_ctime on Windows)."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    if hasattr(stat, "st_birthtime"):
+        return stat.st_birthtime
+    return stat.st_ctime if os.name == "nt" else None
+
+
+def build_time_metadata(file_name: str, file_path: str, last_modified: float, note_date: Optional[float]) -> Dict[str, Any]:
+    """
+    Timestamps of a note for date-range pre-filters and recency ranking:
+    - `last_modified` = file modification time
+    - `created` = file creation time, when the OS records one
+    - `filename_date` = date in a daily-note file name
+    - `note_date` = the note's own date: frontmatter date, else file name date, else creation time,
+      else modification time, so every chunk can be matched by a date range.
+    """
+    metadata: Dict[str, Any] = {"last_modified": float(last_modified)}
+    created = file_created_time(file_path)
+    if created is not None:
+        metadata["created"] = created
+    named_date = filename_date(file_name)
+    if named_date is not None:
+        metadata["filename_date"] = named_date
+
+    for candidate in (note_date, named_date, created, float(last_modified)):
+        if candidate is not None:
+            metadata["note_date"] = candidate
+            break
+    return metadata
+
+
+def scope_key(component: str) -> str:
+    """Canonical form of a folder or heading name in the scope metadata, shared by ingestion and the search filters."""
+    return " ".join(component.split()).lower()
+
+
+def split_folder_scope(folder: str) -> List[str]:
+    """'Projects/Alpha/' or 'Projects/Alpha/**' -> ['projects', 'alpha']. A glob part ends the prefix."""
+    parts = []
+    for part in re.split(r"[\\/]+", folder):
+        if "*" in part:
+            break
+        if part.strip() and part.strip() != ".":
+            parts.append(scope_key(part))
+    return parts
+
+
+def split_heading_scope(heading_path: str) -> List[str]:
+    """'Design > API' -> ['design', 'api']"""
+    return [scope_key(part) for part in heading_path.split(">") if part.strip()]
+
+
+def build_folder_metadata(file_path: str, vault_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Folder scope of a note relative to the vault root:
+    `folder_path` (readable, e.g. 'Projects/Alpha') plus one `folder_<i>` key per level, so a search
+    under 'Projects/Alpha/**' is a plain equality pre-filter on folder_0 and folder_1.
+    """
+    folder = os.path.dirname(file_path)
+    if vault_path:
+        try:
+            folder = os.path.relpath(folder, vault_path)
+        except ValueError:  # different drive on Windows
+            pass
+    folder = "" if folder == "." else folder.replace("\\", "/")
+
+    metadata: Dict[str, Any] = {"folder_path": folder}
+    for depth, part in enumerate(split_folder_scope(folder)[:MAX_SCOPE_DEPTH]):
+        metadata[f"folder_{depth}"] = part
+    return metadata
+
+
+def build_heading_metadata(heading_trail: List[str]) -> Dict[str, Any]:
+    """One `heading_<i>` key per level of the chunk's heading breadcrumb, outermost heading first."""
+    return {
+        f"heading_{depth}": scope_key(text)
+        for depth, text in enumerate([text for text in heading_trail if text.strip()][:MAX_SCOPE_DEPTH])
+    }
+
+
+def build_chunk_metadata(properties: NoteProperties) -> Dict[str, Any]:
+    """
+    Flattens note properties into scalar chunk metadata that every vector backend can pre-filter on:
+    - `tag:<tag>` = True for every tag, plus a readable `tags` string
+    - `prop:<key>` = canonical string value for every frontmatter property
+    - `prop:<key>:<element>` = True for every element of a list property, so filtering on one element matches
+    - `note_date` = Unix timestamp of the note's own date, when the frontmatter has one
+    """
+    metadata: Dict[str, Any] = {}
+    tags = properties.get("tags") or []
+    for tag in tags:
+        metadata[f"tag:{tag}"] = True
+    if tags:
+        metadata["tags"] = ", ".join(tags)
+
+    frontmatter = properties.get("frontmatter") or {}
+    for key, value in frontmatter.items():
+        if key.lower() in ("tags", "tag") or value is None or isinstance(value, dict):
+            continue
+        metadata[property_key(key)] = property_value_for_filter(value)
+        if isinstance(value, (list, tuple, set)):
+            for element in value:
+                if element is not None:
+                    metadata[property_element_key(key, element)] = True
+
+    for key in NOTE_DATE_KEYS:
+        note_date = to_unix_timestamp(frontmatter.get(key))
+        if note_date is not None:
+            metadata["note_date"] = note_date
+            break
+    return metadata
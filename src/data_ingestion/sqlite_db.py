@@ -1,6 +1,6 @@
 import sqlite3
 import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 
 from numpy import insert
 from src.utils import setup_logger,config,Status
@@ -21,6 +21,9 @@ class SQLiteDB:
         self.cursor = self.connection.cursor()
         self.create_file_log_table_if_not_exists() # this will create the table if it doesn't exist
         self.create_chunk_log_table_if_not_exists() # this will create the chunk log table if it doesn't exist
+        self.create_note_link_table_if_not_exists() # wikilink adjacency between notes
+        self.create_answer_cache_tables_if_not_exists() # cached answers and the chunks they came from
+        self.create_index_settings_table_if_not_exists() # settings the vector index was built with
         log.info(f"Connected to SQLite database at {self.db_file}")
 
 
@@ -36,12 +39,108 @@ class SQLiteDB:
                 file_id INTEGER NOT NULL, -- Foreign key to obq_log.id
                 chunk_id TEXT NOT NULL,
                 created_at REAL DEFAULT (STRFTIME('%s', 'now')), -- Unix epoch timestamp
+                ordinal INTEGER,                    -- Position of the chunk within its file, NULLABLE for old rows
+                char_start INTEGER,                 -- Char span of the chunk in the raw file text
+                char_end INTEGER,
+                heading_path TEXT,                  -- Heading breadcrumb, e.g. "Project > Design > API"
+                content TEXT,                       -- Chunk text, so neighbours can be served without the vector store
+                sentence_embeddings BLOB,           -- float16 embedding per sentence of content, for context compression
                 FOREIGN KEY (file_id) REFERENCES obq_log(id)
             )
             """
         )
+        # tables created before these columns existed get them added in place
+        self._add_missing_columns("obq_chunk_log", {
+            "ordinal": "INTEGER", "char_start": "INTEGER", "char_end": "INTEGER", "heading_path": "TEXT", "content": "TEXT",
+            "sentence_embeddings": "BLOB",
+        })
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_chunk_log_chunk_id ON obq_chunk_log (chunk_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_chunk_log_file_ordinal ON obq_chunk_log (file_id, ordinal)")
         self.connection.commit()
 
+    def create_note_link_table_if_not_exists(self):
+        """
+        Creates the 'obq_note_link' table if it doesn't already exist.
+        One row per [[wikilink]] from a note to another note's file name; backlinks are the same rows read
+        the other way round. Both directions are indexed, and obq_log.file_name gets a case-insensitive
+        index so link targets resolve to files without a scan.
+        """
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS obq_note_link (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_file_id INTEGER NOT NULL,   -- Foreign key to obq_log.id of the linking note
+                target_file_name TEXT NOT NULL,    -- File name the link points to, e.g. 'Project Alpha.md'
+                FOREIGN KEY (source_file_id) REFERENCES obq_log(id)
+            )
+            """
+        )
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_note_link_source ON obq_note_link (source_file_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_note_link_target ON obq_note_link (target_file_name COLLATE NOCASE)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_log_file_name_nocase ON obq_log (file_name COLLATE NOCASE)")
+        self.connection.commit()
+
+    def create_answer_cache_tables_if_not_exists(self):
+        """
+        Creates the answer cache tables if they don't already exist.
+        'obq_answer_cache' holds one synthesized answer per normalized task briefing (with the briefing's embedding
+        for near-duplicate lookups), 'obq_answer_cache_chunk' the chunks each answer was synthesized from, indexed by
+        chunk so replacing or deleting a chunk drops exactly the answers built on it.
+        """
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS obq_answer_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                briefing_key TEXT NOT NULL UNIQUE,  -- Normalized task briefing
+                embedding BLOB NOT NULL,            -- float32 embedding of briefing_key
+                answer TEXT NOT NULL,
+                artifact_json TEXT,                 -- JSON of the tool artifact returned with the answer
+                created_at REAL NOT NULL,           -- Unix epoch timestamp
+                last_hit_at REAL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS obq_answer_cache_chunk (
+                cache_id INTEGER NOT NULL,          -- Foreign key to obq_answer_cache.id
+                chunk_id TEXT NOT NULL,             -- obq_chunk_log.chunk_id the answer was synthesized from
+                FOREIGN KEY (cache_id) REFERENCES obq_answer_cache(id)
+            )
+            """
+        )
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_answer_cache_chunk_chunk_id ON obq_answer_cache_chunk (chunk_id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_obq_answer_cache_chunk_cache_id ON obq_answer_cache_chunk (cache_id)")
+        self.connection.commit()
+
+    def create_index_settings_table_if_not_exists(self):
+        """
+        Creates the 'obq_index_settings' table if it doesn't already exist.
+        Records, per index, the settings its stored vectors depend on (backend, embedding model and dimension)
+        as JSON, so files are not left 'completed' against an index built with different settings.
+        """
+        self.cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS obq_index_settings (
+                name TEXT PRIMARY KEY,              -- e.g. 'vector_index'
+                settings_json TEXT NOT NULL,
+                updated_at REAL NOT NULL            -- Unix epoch timestamp
+            )
+            """
+        )
+        self.connection.commit()
+
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """
+        Adds the given columns to an existing table if they are not there yet (lightweight migration).
+        """
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row["name"] for row in self.cursor.fetchall()}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
 # TODO: Might have to make the table name configurable in future if required.
     def create_file_log_table_if_not_exists(self):
         """
@@ -210,21 +309,44 @@ class SQLiteDB:
             log.error(f"Failed to update final ingestion status for file log entry {id}: {e}", exc_info=True)
             self.connection.rollback()
 
-    def update_chunk_log(self, file_id: int, chunk_id: list[str]):
+    def update_file_metadata_json(self, id: int, metadata_json: Optional[str]):
+        """
+        Stores the extracted note metadata (frontmatter, tags, wikilinks) as JSON for a file log entry.
+        """
+        try:
+            self.cursor.execute("UPDATE obq_log SET metadata_json = ? WHERE id = ?", (metadata_json, id))
+            self.connection.commit()
+        except Exception as e:
+            log.error(f"Failed to update metadata_json for file log entry {id}: {e}", exc_info=True)
+            self.connection.rollback()
+
+    def update_chunk_log(self, file_id: int, chunk_id: list[str], chunks: Optional[List[Any]] = None,
+                         sentence_embeddings: Optional[List[bytes]] = None):
         """
         Inserts or updates chunk log entries for a file.
         :param file_id: List of file IDs to associate with the chunks.
         :param chunk_id: List of chunk IDs to log.
+        :param chunks: Optional chunk Documents aligned with chunk_id; their position, char span,
+                       heading path and text are stored for neighbour lookups.
+        :param sentence_embeddings: Optional blobs aligned with chunk_id holding each chunk's sentence embeddings.
         """
         try:
             with self.connection:
-                for cid in chunk_id:
+                for i, cid in enumerate(chunk_id):
+                    chunk = chunks[i] if chunks else None
+                    meta = chunk.metadata if chunk is not None else {}
                     self.cursor.execute(
                         """
-                        INSERT INTO obq_chunk_log (file_id, chunk_id)
-                        VALUES (?, ?)
+                        INSERT INTO obq_chunk_log (file_id, chunk_id, ordinal, char_start, char_end, heading_path, content, sentence_embeddings)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                         """,
-                        (file_id, cid)
+                        (
+                            file_id, cid,
+                            meta.get("chunk_index", i if chunk is not None else None),
+                            meta.get("char_start"), meta.get("char_end"), meta.get("heading_path"),
+                            chunk.page_content if chunk is not None else None,
+                            sentence_embeddings[i] if sentence_embeddings else None,
+                        )
                     )
             log.info(f"Inserted {len(chunk_id)} chunk log entries for file ID(s): {file_id}")
         except Exception as e:
@@ -256,6 +378,7 @@ class SQLiteDB:
             chunk_ids = [row[0] for row in self.cursor.fetchall()]
             if chunk_ids:
                 self.cursor.execute("DELETE FROM obq_chunk_log WHERE file_id = ?", (file_id,))
+                self._delete_cached_answers_for_chunks(chunk_ids)
             self.connection.commit()
             log.info(f"Deleted chunk logs for file_id {file_id}: {chunk_ids}")
         except Exception as e:
@@ -264,6 +387,232 @@ class SQLiteDB:
             raise e
         return chunk_ids
 
+    def replace_note_links(self, file_id: int, link_targets: List[str]):
+        """
+        Replaces the outgoing wikilinks of a note. Targets are note names as written in the link
+        ('Folder/Note' or 'Note'); they are stored as the file name they resolve to ('Note.md').
+        """
+        target_file_names = []
+        for target in link_targets:
+            name = target.replace("\\", "/").split("/")[-1].strip()
+            if name:
+                target_file_names.append(name if name.lower().endswith(".md") else f"{name}.md")
+        try:
+            with self.connection:
+                self.cursor.execute("DELETE FROM obq_note_link WHERE source_file_id = ?", (file_id,))
+                self.cursor.executemany(
+                    "INSERT INTO obq_note_link (source_file_id, target_file_name) VALUES (?, ?)",
+                    [(file_id, name) for name in dict.fromkeys(target_file_names)]
+                )
+        except Exception as e:
+            log.error(f"Failed to update note links for file ID {file_id}: {e}", exc_info=True)
+
+    def get_linked_file_ids(self, file_ids: List[int]) -> List[int]:
+        """
+        Returns the ids of the ingested notes one hop away from the given notes, following both
+        their outgoing links and their backlinks. The given notes themselves are excluded.
+        """
+        if not file_ids:
+            return []
+        placeholders = ",".join("?" for _ in file_ids)
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT f.id FROM obq_note_link l
+                JOIN obq_log f ON f.file_name = l.target_file_name COLLATE NOCASE
+                WHERE l.source_file_id IN ({placeholders}) AND f.is_enabled = 1 AND f.status = 'completed'
+                UNION
+                SELECT l.source_file_id FROM obq_log h
+                JOIN obq_note_link l ON l.target_file_name = h.file_name COLLATE NOCASE
+                JOIN obq_log s ON s.id = l.source_file_id AND s.is_enabled = 1 AND s.status = 'completed'
+                WHERE h.id IN ({placeholders})
+                """,
+                (*file_ids, *file_ids)
+            )
+            return [row[0] for row in self.cursor.fetchall() if row[0] not in file_ids]
+        except Exception as e:
+            log.error(f"Failed to fetch linked notes: {e}", exc_info=True)
+            return []
+
+    def get_neighbour_chunks(self, chunk_ids: List[str], window: int) -> List[sqlite3.Row]:
+        """
+        Fetches every chunk within `window` positions of the given chunks in the same file,
+        through the (file_id, ordinal) index. Each row carries the hit it was found for (hit_chunk_id).
+        Chunks logged without an ordinal (older ingestions) yield no rows.
+        """
+        if not chunk_ids:
+            return []
+        placeholders = ",".join("?" for _ in chunk_ids)
+        try:
+            self.cursor.execute(
+                f"""
+                SELECT n.chunk_id, n.file_id, n.ordinal, n.char_start, n.char_end, n.heading_path, n.content,
+                       h.chunk_id AS hit_chunk_id
+                FROM obq_chunk_log h
+                JOIN obq_chunk_log n
+                  ON n.file_id = h.file_id AND n.ordinal BETWEEN h.ordinal - ? AND h.ordinal + ?
+                WHERE h.chunk_id IN ({placeholders})
+                ORDER BY n.file_id, n.ordinal
+                """,
+                (window, window, *chunk_ids)
+            )
+            return self.cursor.fetchall()
+        except Exception as e:
+            log.error(f"Failed to fetch neighbour chunks: {e}", exc_info=True)
+            return []
+
+    def get_chunk_sentence_embeddings(self, spans: List[tuple]) -> List[sqlite3.Row]:
+        """
+        Fetches content and cached sentence embeddings of the chunks in the given (file_id, first ordinal, last ordinal)
+        spans through the (file_id, ordinal) index.
+        """
+        if not spans:
+            return []
+        clauses = " OR ".join("(file_id = ? AND ordinal BETWEEN ? AND ?)" for _ in spans)
+        try:
+            self.cursor.execute(
+                f"SELECT chunk_id, content, sentence_embeddings FROM obq_chunk_log WHERE {clauses}",
+                [value for span in spans for value in span]
+            )
+            return self.cursor.fetchall()
+        except Exception as e:
+            log.error(f"Failed to fetch chunk sentence embeddings: {e}", exc_info=True)
+            return []
+
+    def update_chunk_sentence_embeddings(self, blobs: List[tuple]):
+        """Stores sentence embeddings computed after ingestion, given as (chunk_id, blob) pairs."""
+        try:
+            with self.connection:
+                self.cursor.executemany(
+                    "UPDATE obq_chunk_log SET sentence_embeddings = ? WHERE chunk_id = ?",
+                    [(blob, chunk_id) for chunk_id, blob in blobs]
+                )
+        except Exception as e:
+            log.error(f"Failed to store chunk sentence embeddings: {e}", exc_info=True)
+
+    def _delete_cached_answers_for_chunks(self, chunk_ids: List[str]) -> int:
+        """Deletes the cached answers synthesized from any of the chunks. Runs inside the caller's transaction."""
+        placeholders = ",".join("?" for _ in chunk_ids)
+        self.cursor.execute(
+            f"SELECT DISTINCT cache_id FROM obq_answer_cache_chunk WHERE chunk_id IN ({placeholders})", chunk_ids
+        )
+        cache_ids = [row[0] for row in self.cursor.fetchall()]
+        self._delete_cached_answers(cache_ids)
+        if cache_ids:
+            log.info(f"Invalidated {len(cache_ids)} cached answers built on replaced chunks.")
+        return len(cache_ids)
+
+    def _delete_cached_answers(self, cache_ids: List[int]):
+        if not cache_ids:
+            return
+        placeholders = ",".join("?" for _ in cache_ids)
+        self.cursor.execute(f"DELETE FROM obq_answer_cache_chunk WHERE cache_id IN ({placeholders})", cache_ids)
+        self.cursor.execute(f"DELETE FROM obq_answer_cache WHERE id IN ({placeholders})", cache_ids)
+
+    def get_cached_answer_by_key(self, briefing_key: str) -> Optional[sqlite3.Row]:
+        self.cursor.execute("SELECT * FROM obq_answer_cache WHERE briefing_key = ?", (briefing_key,))
+        return self.cursor.fetchone()
+
+    def get_cached_answer(self, cache_id: int) -> Optional[sqlite3.Row]:
+        self.cursor.execute("SELECT * FROM obq_answer_cache WHERE id = ?", (cache_id,))
+        return self.cursor.fetchone()
+
+    def get_answer_cache_embeddings(self, created_after: float) -> List[sqlite3.Row]:
+        """Ids and briefing embeddings of the cached answers created after the given timestamp."""
+        self.cursor.execute("SELECT id, embedding FROM obq_answer_cache WHERE created_at > ?", (created_after,))
+        return self.cursor.fetchall()
+
+    def record_answer_cache_hit(self, cache_id: int):
+        try:
+            with self.connection:
+                self.cursor.execute(
+                    "UPDATE obq_answer_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE id = ?",
+                    (time.time(), cache_id)
+                )
+        except Exception as e:
+            log.error(f"Failed to record answer cache hit: {e}", exc_info=True)
+
+    def insert_cached_answer(self, briefing_key: str, embedding: bytes, answer: str, artifact_json: Optional[str],
+                             chunk_ids: List[str]) -> bool:
+        """
+        Stores an answer with the chunks it was synthesized from, replacing any entry for the same briefing.
+        Nothing is stored if one of the chunks was deleted meanwhile (e.g. by a concurrent ingestion),
+        since such an answer could never be invalidated. Returns whether the answer was stored.
+        """
+        chunk_ids = list(dict.fromkeys(chunk_ids))
+        if not chunk_ids:
+            return False
+        placeholders = ",".join("?" for _ in chunk_ids)
+        try:
+            with self.connection:
+                self.cursor.execute(
+                    f"SELECT COUNT(DISTINCT chunk_id) FROM obq_chunk_log WHERE chunk_id IN ({placeholders})", chunk_ids
+                )
+                if self.cursor.fetchone()[0] != len(chunk_ids):
+                    return False
+                existing = self.get_cached_answer_by_key(briefing_key)
+                if existing is not None:
+                    self._delete_cached_answers([existing["id"]])
+                self.cursor.execute(
+                    """
+                    INSERT INTO obq_answer_cache (briefing_key, embedding, answer, artifact_json, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (briefing_key, embedding, answer, artifact_json, time.time())
+                )
+                cache_id = self.cursor.lastrowid
+                self.cursor.executemany(
+                    "INSERT INTO obq_answer_cache_chunk (cache_id, chunk_id) VALUES (?, ?)",
+                    [(cache_id, chunk_id) for chunk_id in chunk_ids]
+                )
+            return True
+        except Exception as e:
+            log.error(f"Failed to store cached answer: {e}", exc_info=True)
+            return False
+
+    def prune_answer_cache(self, max_entries: int, created_before: float):
+        """Deletes cached answers older than `created_before` and the least recently used ones beyond `max_entries`."""
+        try:
+            with self.connection:
+                self.cursor.execute(
+                    """
+                    SELECT id FROM obq_answer_cache
+                    WHERE created_at <= ?
+                       OR id NOT IN (
+                           SELECT id FROM obq_answer_cache ORDER BY COALESCE(last_hit_at, created_at) DESC LIMIT ?
+                       )
+                    """,
+                    (created_before, max_entries)
+                )
+                self._delete_cached_answers([row[0] for row in self.cursor.fetchall()])
+        except Exception as e:
+            log.error(f"Failed to prune the answer cache: {e}", exc_info=True)
+
+    def get_index_settings(self, name: str) -> Optional[str]:
+        """The settings JSON recorded for the index, or None if none were recorded yet."""
+        self.cursor.execute("SELECT settings_json FROM obq_index_settings WHERE name = ?", (name,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def set_index_settings(self, name: str, settings_json: str, requeue_files: bool = False) -> int:
+        """
+        Records the settings the index is built with. With `requeue_files`, every file is marked 'pending'
+        in the same transaction so the next ingestion rebuilds the whole index. Returns the number of requeued files.
+        """
+        with self.connection:
+            requeued = 0
+            if requeue_files:
+                self.cursor.execute("UPDATE obq_log SET status = 'pending', num_chunks = NULL WHERE status != 'pending'")
+                requeued = self.cursor.rowcount
+            self.cursor.execute(
+                """
+                INSERT INTO obq_index_settings (name, settings_json, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET settings_json = excluded.settings_json, updated_at = excluded.updated_at
+                """,
+                (name, settings_json, time.time())
+            )
+        return requeued
+
     def get_files_by_status(self, status1: str, status2: str) -> List[sqlite3.Row]:
         """
         Retrieves all file log entries with a specific status.
@@ -285,6 +634,17 @@ class SQLiteDB:
             log.error(f"Failed to fetch enabled and completed filenames: {e}", exc_info=True)
             return []
 
+    def count_enabled_completed_files(self) -> int:
+        """
+        Counts the enabled files that were ingested successfully.
+        """
+        try:
+            self.cursor.execute("SELECT COUNT(*) FROM obq_log WHERE is_enabled = 1 AND status = 'completed'")
+            return self.cursor.fetchone()[0]
+        except Exception as e:
+            log.error(f"Failed to count enabled and completed files: {e}", exc_info=True)
+            return 0
+
     def get_all_tracked_files(self) -> Dict[str, sqlite3.Row]:
         """
         Retrieves all file paths and their log entries currently tracked in the database.
@@ -1 +1,2 @@
 from .embedding_model import embedding_model_instance,test_embedding_model
+from .dimension_reduction import DimensionReducer, ReducedDimensionEmbeddings
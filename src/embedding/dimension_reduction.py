@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.utils.logger import setup_logger
+
+log = setup_logger(__name__)
+
+
+class DimensionReducer:
+    """
+    Reduces embedding dimensionality for storage and search.
+
+    - 'matryoshka': keeps the first `target_dim` components and re-normalizes. Needs no fitting,
+      but only makes sense for models trained with Matryoshka loss (e.g. nomic-embed-text v1.5).
+    - 'pca': projects onto the top `target_dim` principal components of the corpus. The projection
+      is fitted once, persisted to `projection_path` and reused for both chunks and queries.
+    """
+
+    def __init__(self, mode: str, target_dim: int, projection_path: str):
+        if mode not in ("matryoshka", "pca"):
+            raise ValueError(f"Unsupported dimension reduction mode: {mode}")
+        if target_dim <= 0:
+            raise ValueError("Reduced embedding dimension must be a positive integer.")
+        self.mode = mode
+        self.target_dim = target_dim
+        self.projection_path = Path(projection_path)
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (target_dim, full_dim)
+        if mode == "pca":
+            self.load()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.mode == "matryoshka" or self.components is not None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Fits the PCA projection on a sample of full-dimension corpus embeddings and persists it."""
+        if self.mode != "pca":
+            return
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+        if matrix.shape[0] < 2:
+            log.warning(f"PCA needs at least 2 sample vectors, got {matrix.shape[0]}. The projection stays unfitted.")
+            return
+        self.mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+        # a small corpus (or model) has fewer components than target_dim; the missing ones are zero rows,
+        # so stored vectors keep target_dim dims and the cosine scores are unaffected
+        fitted_dim = min(matrix.shape[0], matrix.shape[1], self.target_dim)
+        self.components = np.zeros((self.target_dim, matrix.shape[1]))
+        self.components[:fitted_dim] = vt[:fitted_dim]
+        self.save()
+        if fitted_dim < self.target_dim:
+            log.warning(f"Only {matrix.shape[0]} sample vectors of {matrix.shape[1]} dims, so the PCA projection keeps {fitted_dim} of {self.target_dim} dims.")
+        log.info(f"Fitted PCA projection {matrix.shape[1]} -> {fitted_dim} dims on {matrix.shape[0]} vectors.")
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Projects (n, d) full-dimension vectors to (n, target_dim) unit vectors."""
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self.mode == "matryoshka":
+            reduced = matrix[:, : self.target_dim]
+        else:
+            if self.components is None or self.mean is None:
+                raise ValueError("PCA projection is not fitted yet. Run the ingestion pipeline to fit it over the corpus.")
+            reduced = (matrix - self.mean.astype(np.float32)) @ self.components.T.astype(np.float32)
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (reduced / norms).astype(np.float32)
+
+    def reset(self) -> None:
+        """Drops the fitted projection, so the next ingestion fits a new one over the rebuilt corpus."""
+        self.mean, self.components = None, None
+        self.projection_path.unlink(missing_ok=True)
+
+    def save(self) -> None:
+        self.projection_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.projection_path, "wb") as f:
+            np.savez(f, mean=self.mean, components=self.components) # type: ignore
+
+    def load(self) -> None:
+        if not self.projection_path.exists():
+            return
+        with np.load(self.projection_path) as data:
+            if data["components"].shape[0] != self.target_dim:
+                log.warning(f"Stored projection has {data['components'].shape[0]} dims, expected {self.target_dim}. Refit required.")
+                return
+            self.mean, self.components = data["mean"], data["components"]
+        log.info(f"Loaded PCA projection from {self.projection_path}")
+
+
+class ReducedDimensionEmbeddings(Embeddings):
+    """Embeddings wrapper that applies a DimensionReducer to everything the base model returns."""
+
+    def __init__(self, base_embeddings: Embeddings, reducer: DimensionReducer):
+        self.base_embeddings = base_embeddings
+        self.reducer = reducer
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.reducer.transform(np.asarray(self.base_embeddings.embed_documents(texts))).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.reducer.transform(np.asarray([self.base_embeddings.embed_query(text)]))[0].tolist()
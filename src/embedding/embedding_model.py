@@ -1,6 +1,8 @@
 from src.utils import config
 from langchain_ollama import OllamaEmbeddings
 from src.utils.logger import setup_logger
+from .dimension_reduction import DimensionReducer, ReducedDimensionEmbeddings
+import os
 
 log = setup_logger(__name__)
 
@@ -10,10 +12,19 @@ class EmbeddingModel:
     def __init__(self):
         """Initializes the embedding model based on the configuration."""
         self.embedding_model = OllamaEmbeddings(model=config.OLLAMA_EMBEDDING_MODEL) # type: ignore
+        if config.EMBEDDING_REDUCTION != "none":
+            reducer = DimensionReducer(
+                mode=config.EMBEDDING_REDUCTION,
+                target_dim=config.EMBEDDING_REDUCED_DIM,
+                projection_path=os.path.join(config.VECTOR_STORE_DIR, "embedding_projection.npz"),
+            )
+            self.embedding_model = ReducedDimensionEmbeddings(self.embedding_model, reducer)
 
     def get_embedding_model(self):
         """Returns the initialized embedding model."""
         log.info(f"Using OLLAMA embedding model: {config.OLLAMA_EMBEDDING_MODEL}")
+        if config.EMBEDDING_REDUCTION != "none":
+            log.info(f"Embeddings reduced to {config.EMBEDDING_REDUCED_DIM} dims ({config.EMBEDDING_REDUCTION})")
         return self.embedding_model
 
 # Singleton instance of the embedding model.
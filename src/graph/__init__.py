@@ -1 +1,2 @@
-from .base_graph import create_simple_graph
\ No newline at end of file
+from .base_graph import create_simple_graph
+from .fast_graph import create_fast_graph
@@ -1,18 +1,51 @@
+import asyncio
+from typing import Any, Optional
 from .agent_state import AgentState
 from langgraph.graph import StateGraph, START
-from src.nodes import react_agent_node
+from src.nodes import react_agent_node, areact_agent_node
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import tools_condition, ToolNode
-from ..utils import setup_logger
+from langgraph.store.base import BaseStore
+from ..utils import config, setup_logger
 
 log = setup_logger(__name__)
 
+
+class BoundedToolNode(ToolNode):
+    """
+    ToolNode whose async path runs at most `max_concurrency` tool calls of one AI message at once.
+    The stock async path gathers every call unbounded (the sync path already honours the run's max_concurrency);
+    the semaphore is created per message, so concurrent conversations never share or throttle each other's slots.
+    """
+
+    def __init__(self, tools: list, max_concurrency: int, **kwargs):
+        super().__init__(tools, **kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def _afunc(self, input: Any, config: RunnableConfig, *, store: Optional[BaseStore]) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(call):
+            async with slots:
+                return await self._arun_one(call, input_type, config)
+
+        outputs = await asyncio.gather(*(run_one(call) for call in tool_calls))
+        return self._combine_tool_outputs(outputs, input_type)
+
+
 def create_simple_graph(llm_with_tools, memory, tools: list ) -> CompiledStateGraph:
 
-    tools_node = ToolNode(tools)
+    tools_node = BoundedToolNode(tools, max_concurrency=config.TOOL_CALL_CONCURRENCY)
 
     workflow = StateGraph(AgentState)
-    workflow.add_node("reAct_agent_node", lambda state: react_agent_node(state, llm_with_tools))
+    # sync and async bodies, so the same compiled graph serves invoke/stream and ainvoke/astream
+    workflow.add_node("reAct_agent_node", RunnableLambda(
+        lambda state: react_agent_node(state, llm_with_tools),
+        afunc=lambda state: areact_agent_node(state, llm_with_tools),
+        name="reAct_agent_node",
+    ))
     workflow.add_node("tools", tools_node)
     workflow.add_edge(START, "reAct_agent_node")
     workflow.add_conditional_edges(
@@ -0,0 +1,25 @@
+from .agent_state import AgentState
+from langgraph.graph import StateGraph, START, END
+from src.nodes.fast_answer_node import fast_answer_node, afast_answer_node
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph.state import CompiledStateGraph
+from ..utils import setup_logger
+
+log = setup_logger(__name__)
+
+def create_fast_graph(llm, memory) -> CompiledStateGraph:
+    """
+    Fast mode: one node that retrieves from the user's message and answers in a single LLM call.
+    Shares the AgentState (and checkpointer) with the agent graph, so a conversation can switch modes between turns.
+    """
+    workflow = StateGraph(AgentState)
+    workflow.add_node("fast_answer_node", RunnableLambda(
+        lambda state: fast_answer_node(state, llm),
+        afunc=lambda state: afast_answer_node(state, llm),
+        name="fast_answer_node",
+    ))
+    workflow.add_edge(START, "fast_answer_node")
+    workflow.add_edge("fast_answer_node", END)
+    graph = workflow.compile(checkpointer=memory, debug=False)
+    log.info("Fast Graph compiled successfully.")
+    return graph
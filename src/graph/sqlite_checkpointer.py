@@ -0,0 +1,366 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from src.utils import setup_logger
+
+log = setup_logger(__name__)
+
+
+class BoundedSQLiteSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer that keeps conversation state in a SQLite file instead of process memory,
+    so threads survive restarts and a long-running instance does not grow without bound.
+
+    Every checkpoint is stored whole (channel values included), so resuming a thread is one indexed
+    row read. Periodic maintenance (at most every `maintenance_interval` seconds, run from `put`):
+    - compaction: only the newest `keep_per_thread` checkpoints of each thread are kept, with their writes
+    - TTL: threads idle for longer than `ttl_seconds` are deleted
+    - size bound: while the stored state exceeds `max_bytes`, the least recently used threads are deleted
+    Freed pages are returned to the file system with an incremental vacuum.
+    Time travel is therefore limited to the kept checkpoints.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 2**20,
+        keep_per_thread: int = 5,
+        maintenance_interval: float = 300,
+    ):
+        super().__init__()
+        self.db_file = db_file
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.keep_per_thread = max(keep_per_thread, 1)
+        self.maintenance_interval = maintenance_interval
+        self._last_maintenance = 0.0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._create_tables()
+        log.info(f"Checkpointer connected to SQLite database at {db_file}")
+
+    def _create_tables(self) -> None:
+        with self._lock, self.connection:
+            # must be set before the first table exists to take effect
+            self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS obq_checkpoint (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    type TEXT,
+                    checkpoint BLOB,
+                    metadata_type TEXT,
+                    metadata BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                )
+                """
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS obq_checkpoint_write (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT,
+                    value BLOB,
+                    task_path TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                )
+                """
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS obq_checkpoint_thread (
+                    thread_id TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL   -- Unix timestamp of the last checkpoint written
+                )
+                """
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_obq_checkpoint_thread_last_access ON obq_checkpoint_thread (last_access)")
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
+
+    # --- reads -------------------------------------------------------------------------------
+
+    def _row_to_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self.connection.execute(
+            """
+            SELECT task_id, channel, type, value FROM obq_checkpoint_write
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+            ORDER BY task_id, idx
+            """,
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value))) for task_id, channel, value_type, value in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Returns the requested checkpoint of a thread, or its latest one when the config has no checkpoint_id."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.connection.execute(
+                    f"SELECT {columns} FROM obq_checkpoint WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    f"SELECT {columns} FROM obq_checkpoint WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._row_to_tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Lists checkpoints newest first, optionally restricted to a thread / namespace, metadata values and a `before` checkpoint."""
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self.connection.execute(
+                f"""
+                SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata
+                FROM obq_checkpoint {where} ORDER BY checkpoint_id DESC
+                """,
+                params,
+            ).fetchall()
+            tuples = []
+            for row in rows:
+                if limit is not None and len(tuples) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[6], row[7]))
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                tuples.append(self._row_to_tuple(row))
+        yield from tuples
+
+    # --- writes ------------------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Stores a checkpoint, marks its thread as used now and runs maintenance when it is due."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO obq_checkpoint VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    type_, serialized_checkpoint, metadata_type, serialized_metadata,
+                ),
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO obq_checkpoint_thread (thread_id, last_access) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+        self.maintain_if_due()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Stores the pending writes of a task. Special channels (errors, interrupts) overwrite, regular writes are kept once."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, serialized_value = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                channel, value_type, serialized_value, task_path,
+            ))
+        with self._lock, self.connection:
+            self.connection.executemany(f"{verb} INTO obq_checkpoint_write VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self.connection:
+            self._delete_threads([thread_id])
+
+    def _delete_threads(self, thread_ids: Sequence[str]) -> None:
+        for table in ("obq_checkpoint", "obq_checkpoint_write", "obq_checkpoint_thread"):
+            self.connection.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,) for thread_id in thread_ids])
+
+    # --- maintenance -------------------------------------------------------------------------
+
+    def maintain_if_due(self) -> None:
+        if time.time() - self._last_maintenance >= self.maintenance_interval:
+            self.maintain()
+
+    def maintain(self) -> None:
+        """Compacts old checkpoints, evicts expired and least recently used threads and vacuums the freed pages."""
+        self._last_maintenance = time.time()
+        try:
+            with self._lock:
+                with self.connection:
+                    compacted = self.connection.execute(
+                        """
+                        DELETE FROM obq_checkpoint WHERE rowid IN (
+                            SELECT rowid FROM (
+                                SELECT rowid, ROW_NUMBER() OVER (
+                                    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                                ) AS position
+                                FROM obq_checkpoint
+                            ) WHERE position > ?
+                        )
+                        """,
+                        (self.keep_per_thread,),
+                    ).rowcount
+                    self.connection.execute(
+                        """
+                        DELETE FROM obq_checkpoint_write WHERE NOT EXISTS (
+                            SELECT 1 FROM obq_checkpoint c
+                            WHERE c.thread_id = obq_checkpoint_write.thread_id
+                              AND c.checkpoint_ns = obq_checkpoint_write.checkpoint_ns
+                              AND c.checkpoint_id = obq_checkpoint_write.checkpoint_id
+                        )
+                        """
+                    )
+
+                    expired = [
+                        row[0] for row in self.connection.execute(
+                            "SELECT thread_id FROM obq_checkpoint_thread WHERE last_access < ?",
+                            (time.time() - self.ttl_seconds,),
+                        )
+                    ]
+                    self._delete_threads(expired)
+
+                    evicted = self._evict_least_recently_used()
+                # after the commit, but still under the lock: the connection is shared across threads
+                self.connection.execute("PRAGMA incremental_vacuum")
+            if compacted or expired or evicted:
+                log.info(f"Checkpointer maintenance: {compacted} old checkpoints compacted, {len(expired)} expired and {evicted} least recently used threads evicted.")
+        except Exception as e:
+            log.error(f"Checkpointer maintenance failed: {e}", exc_info=True)
+
+    def _evict_least_recently_used(self) -> int:
+        """Deletes the least recently used threads until the stored state fits into `max_bytes`. Returns how many were deleted."""
+        sizes = self.connection.execute(
+            """
+            SELECT t.thread_id,
+                   COALESCE((SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM obq_checkpoint c WHERE c.thread_id = t.thread_id), 0)
+                 + COALESCE((SELECT SUM(LENGTH(value)) FROM obq_checkpoint_write w WHERE w.thread_id = t.thread_id), 0)
+            FROM obq_checkpoint_thread t
+            ORDER BY t.last_access ASC
+            """
+        ).fetchall()
+        total = sum(size for _, size in sizes)
+        evict = []
+        # the most recently used thread (the one being written) is never evicted
+        for thread_id, size in sizes[:-1]:
+            if total <= self.max_bytes:
+                break
+            evict.append(thread_id)
+            total -= size
+        self._delete_threads(evict)
+        return len(evict)
+
+    # --- async -------------------------------------------------------------------------------
+    # SQLite calls are short and serialized by the lock; they run in a worker thread so the event loop stays free.
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint_tuple in tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,38 @@
+from typing import Any, Optional
+from langchain_core.messages import AIMessageChunk
+from langgraph.config import get_stream_writer
+from langgraph.constants import TAG_NOSTREAM
+
+# Run tags that tell the streaming consumer where LLM tokens come from.
+SYNTHESIZER_TAG = "synthesizer"
+# LLM calls carrying this tag (e.g. the structured JSON of the filter agent) are not streamed as tokens.
+NO_STREAM_TAG = TAG_NOSTREAM
+
+
+def emit_progress(stage: str, message: str) -> None:
+    """
+    Sends a progress event ({'stage', 'message'}) to graph consumers streaming in 'custom' mode.
+    A no-op when called outside a running graph, so nodes and tools stay usable on their own.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"stage": stage, "message": message})
+
+
+def token_event(message_chunk: Any, metadata: dict) -> Optional[dict]:
+    """
+    Turns one item of a 'messages' mode stream into a token event, or None for anything that is not
+    user-visible text (tool call arguments, empty chunks, non-LLM messages).
+    Tokens are labelled 'synthesizer' (the RAG tool's synthesis) or 'agent' (the ReAct agent).
+    """
+    if not isinstance(message_chunk, AIMessageChunk) or message_chunk.tool_call_chunks:
+        return None
+    content = message_chunk.content
+    if isinstance(content, list):  # providers that stream content blocks
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    if not content:
+        return None
+    source = "synthesizer" if SYNTHESIZER_TAG in (metadata.get("tags") or []) else "agent"
+    return {"type": "token", "source": source, "content": content}
@@ -33,8 +33,12 @@ class LLMFactory:
                     raise ValueError("OLLAMA_MODEL_NAME must be set in the environment variables")
                 
                 try:
-                    log.info(f"Initializing OLLAMA model: {config.OLLAMA_MODEL_NAME}")
-                    return ChatOllama(model=config.OLLAMA_MODEL_NAME)
+                    log.info(f"Initializing OLLAMA model: {config.OLLAMA_MODEL_NAME} (keep_alive={config.OLLAMA_KEEP_ALIVE}, num_ctx={config.OLLAMA_NUM_CTX or 'server default'})")
+                    return ChatOllama(
+                        model=config.OLLAMA_MODEL_NAME,
+                        keep_alive=config.OLLAMA_KEEP_ALIVE,
+                        num_ctx=config.OLLAMA_NUM_CTX or None,
+                    )
                 except Exception as e:
                     raise LLMInitializationError(f"Failed to initialize Ollama model: {str(e)}")
 
@@ -1,2 +1,2 @@
 from .file_meta_data import FileMetadata
-from .rag_agent_output_model import VectorSearchOutputSchema
\ No newline at end of file
+from .rag_agent_output_model import VectorSearchOutputSchema, PropertyFilter, SubQuery
@@ -1,5 +1,35 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
+
+
+class PropertyFilter(BaseModel):
+    """A single frontmatter property the retrieved notes must have."""
+
+    name: str = Field(..., description="The frontmatter property name, e.g. 'status' or 'project'.")
+    value: str = Field(..., description="The required value of the property, e.g. 'active'.")
+
+
+class SubQuery(BaseModel):
+    """One angle of a briefing that needs evidence from several directions, searched on its own."""
+
+    query: str = Field(..., description="A focused query for semantic vector search covering one part of the briefing.")
+    filenames_filter: Optional[List[str]] = Field(
+        default=None,
+        description="Exact filenames for this sub-query only. `null` to use the main filenames filter.",
+    )
+    tags_filter: Optional[List[str]] = Field(
+        default=None,
+        description="Tags (without '#') for this sub-query only. `null` to use the main tags filter.",
+    )
+    folder_scope: Optional[str] = Field(
+        default=None,
+        description="Vault folder for this sub-query only. `null` to use the main folder scope.",
+    )
+    heading_scope: Optional[str] = Field(
+        default=None,
+        description="Section heading for this sub-query only. `null` to use the main heading scope.",
+    )
+
 
 class VectorSearchOutputSchema(BaseModel):
     """
@@ -23,6 +53,65 @@ class VectorSearchOutputSchema(BaseModel):
         )
     )
 
+    tags_filter: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            "Obsidian tags (without '#') the notes must carry; a note matching any of them qualifies. "
+            "Only use tags the briefing explicitly mentions. Otherwise return `null`."
+        )
+    )
+
+    properties_filter: Optional[List[PropertyFilter]] = Field(
+        default=None,
+        description=(
+            "Frontmatter properties the notes must have, e.g. status = active. "
+            "Only use properties the briefing explicitly mentions. Otherwise return `null`."
+        )
+    )
+
+    folder_scope: Optional[str] = Field(
+        default=None,
+        description=(
+            "Vault folder to search in, including its subfolders, e.g. 'Projects/Alpha'. "
+            "Only use it when the briefing explicitly points at a folder. Otherwise return `null`."
+        )
+    )
+
+    heading_scope: Optional[str] = Field(
+        default=None,
+        description=(
+            "Section heading to search under, e.g. 'Action Items', or a breadcrumb from the top heading "
+            "such as 'Design > API'. Only use it when the briefing explicitly names a section. Otherwise return `null`."
+        )
+    )
+
+    date_from: Optional[str] = Field(
+        default=None,
+        description="Earliest note date to include as YYYY-MM-DD, only when the briefing asks for a time range. Otherwise `null`."
+    )
+
+    date_to: Optional[str] = Field(
+        default=None,
+        description="Latest note date to include as YYYY-MM-DD, only when the briefing asks for a time range. Otherwise `null`."
+    )
+
+    date_field: Optional[Literal["note_date", "last_modified"]] = Field(
+        default=None,
+        description=(
+            "Which date `date_from` / `date_to` apply to: 'note_date' for when a note was written (the default), "
+            "'last_modified' when the briefing asks about recently edited or updated notes."
+        )
+    )
+
+    sub_queries: Optional[List[SubQuery]] = Field(
+        default=None,
+        description=(
+            "Up to 3 additional queries when the briefing needs evidence from clearly different angles "
+            "(e.g. two projects to compare, or a decision and its later outcome), each with its own filters. "
+            "They are searched together with the main query and their results merged. Otherwise return `null`."
+        )
+    )
+
     filter_rationale: str = Field(
         ...,
         description=(
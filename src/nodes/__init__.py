@@ -1,2 +1,3 @@
-from .react_agent_node import react_agent_node
-from .rag_agent_tool_node import retrieve_notes_tool
\ No newline at end of file
+from .react_agent_node import react_agent_node, areact_agent_node
+from .rag_agent_tool_node import retrieve_notes_tool
+from .fast_answer_node import fast_answer_node, afast_answer_node
@@ -0,0 +1,102 @@
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+from src.data_ingestion import SQLiteDB
+from src.embedding import embedding_model_instance
+from src.utils import config, setup_logger
+
+log = setup_logger(__name__)
+
+
+@dataclass
+class AnswerCacheLookup:
+    """Result of an answer cache lookup. The key and embedding are kept to store the answer on a miss."""
+    briefing_key: str
+    embedding: Optional[np.ndarray] = None
+    answer: Optional[str] = None
+    artifact: Any = None
+
+    @property
+    def hit(self) -> bool:
+        return self.answer is not None
+
+
+def normalize_briefing(task_briefing: str) -> str:
+    """Lower-cases the briefing and strips markdown emphasis, list markers and punctuation so rewordings in layout match."""
+    text = re.sub(r"[*_`#>\[\]]", " ", task_briefing.lower())
+    text = re.sub(r"^\s*(?:[-+]|\d+[.)])\s+", " ", text, flags=re.MULTILINE)
+    text = re.sub(r"[^\w\s:]", " ", text)
+    return " ".join(text.split())
+
+
+def lookup_answer(task_briefing: str) -> AnswerCacheLookup:
+    """
+    Looks for a cached answer to the briefing: first the exact normalized briefing, then the most similar
+    cached briefing by embedding, accepted at ANSWER_CACHE_SIMILARITY or above. Entries older than
+    ANSWER_CACHE_TTL_HOURS are ignored. Never raises; a failed lookup is a miss.
+    """
+    lookup = AnswerCacheLookup(briefing_key=normalize_briefing(task_briefing))
+    created_after = time.time() - config.ANSWER_CACHE_TTL_HOURS * 3600
+    try:
+        with SQLiteDB() as db:
+            row = db.get_cached_answer_by_key(lookup.briefing_key)
+            if row is None or row["created_at"] <= created_after:
+                row = None
+                lookup.embedding = np.asarray(embedding_model_instance.embed_query(lookup.briefing_key), dtype=np.float32)
+                lookup.embedding /= max(float(np.linalg.norm(lookup.embedding)), 1e-12)
+                candidates = [
+                    candidate for candidate in db.get_answer_cache_embeddings(created_after)
+                    if len(candidate["embedding"]) == lookup.embedding.nbytes
+                ]
+                if candidates:
+                    matrix = np.stack([np.frombuffer(candidate["embedding"], dtype=np.float32) for candidate in candidates])
+                    similarities = matrix @ lookup.embedding
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= config.ANSWER_CACHE_SIMILARITY:
+                        row = db.get_cached_answer(candidates[best]["id"])
+                        log.info(f" -- Answer cache: similar briefing found (cosine {similarities[best]:.3f}).")
+            if row is not None:
+                db.record_answer_cache_hit(row["id"])
+                lookup.answer = row["answer"]
+                lookup.artifact = json.loads(row["artifact_json"]) if row["artifact_json"] else None
+    except Exception as e:
+        log.error(f"Answer cache lookup failed: {e}", exc_info=True)
+    log.info(f" -- Answer cache {'hit' if lookup.hit else 'miss'}.")
+    return lookup
+
+
+def source_chunk_ids(documents: List[Document]) -> List[str]:
+    """Ids of every chunk behind the documents, including the sibling chunks merged into neighbour-expanded ones."""
+    chunk_ids: List[str] = []
+    for doc in documents:
+        chunk_ids.extend(doc.metadata.get("chunk_ids") or ([doc.id] if doc.id else []))
+    return chunk_ids
+
+
+def store_answer(lookup: AnswerCacheLookup, answer: str, artifact: Any, documents: List[Document]) -> None:
+    """
+    Caches a synthesized answer together with the ids of the chunks it was built from, so re-ingesting
+    or deleting any of them invalidates it. Answers whose sources cannot all be identified are not cached.
+    """
+    chunk_ids = source_chunk_ids(documents)
+    if not answer or not chunk_ids or len(chunk_ids) < len(documents):
+        return
+    try:
+        embedding = lookup.embedding
+        if embedding is None:
+            embedding = np.asarray(embedding_model_instance.embed_query(lookup.briefing_key), dtype=np.float32)
+            embedding /= max(float(np.linalg.norm(embedding)), 1e-12)
+        with SQLiteDB() as db:
+            stored = db.insert_cached_answer(
+                lookup.briefing_key, embedding.astype(np.float32).tobytes(), answer,
+                json.dumps(artifact, default=str) if artifact is not None else None, chunk_ids,
+            )
+            db.prune_answer_cache(config.ANSWER_CACHE_MAX_ENTRIES, time.time() - config.ANSWER_CACHE_TTL_HOURS * 3600)
+        if stored:
+            log.info(f" -- Answer cached with {len(set(chunk_ids))} source chunks.")
+    except Exception as e:
+        log.error(f"Failed to cache answer: {e}", exc_info=True)
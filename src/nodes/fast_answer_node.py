@@ -0,0 +1,94 @@
+import asyncio
+from typing import List
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage
+from src.graph.streaming import emit_progress
+from src.utils import config, setup_logger, budget_agent_messages, get_system_time_info, pack_context
+from src.models import VectorSearchOutputSchema
+from src.prompts import get_fast_answer_prompt_template
+from src.vector_store import find_mentioned_filenames
+from . import rag_agent_tool_node  # a module reference, since importing src.nodes first reaches this module mid-cycle
+from .react_agent_node import NO_MESSAGES_RESPONSE
+from .search_filter_fast_path import AMBIGUOUS_FILENAME_SCORE
+
+log = setup_logger(__name__)
+
+FOLLOW_UP_MAX_WORDS = 6  # shorter messages ("and the budget?") are searched together with the previous question
+
+
+def fast_search_filters(messages: List[BaseMessage]) -> VectorSearchOutputSchema:
+    """
+    Search parameters straight from the user's message, without the filter LLM: the message is the query
+    (prefixed with the previous question for short follow-ups) and notes it names outright become the filename filter.
+    When a title is only loosely matched there is no filter LLM to settle it, so the whole vault is searched instead.
+    """
+    questions = [message.content for message in messages if isinstance(message, HumanMessage) and isinstance(message.content, str)]
+    query = questions[-1] if questions else ""
+    if len(query.split()) < FOLLOW_UP_MAX_WORDS and len(questions) > 1:
+        query = f"{questions[-2]} {query}"
+    mentioned = find_mentioned_filenames(query, AMBIGUOUS_FILENAME_SCORE)
+    confident = [name for name, score in mentioned if score >= config.FILTER_FAST_PATH_FILENAME_SCORE]
+    return VectorSearchOutputSchema(
+        refined_query_for_vector_search=" ".join(query.split()),
+        filenames_filter=confident if confident and len(confident) == len(mentioned) else None,
+        filter_rationale="Fast mode: searched with the user's message.",
+    )
+
+
+def build_fast_answer_prompt(state: dict, retrieved_context: List[Document]):
+    """
+    The earlier conversation goes right after the static system prompt and the latest message last, with its
+    notes, so consecutive turns share a prompt prefix the local model has already processed.
+    """
+    messages = budget_agent_messages(state["messages"])
+    question = ""
+    if messages and isinstance(messages[-1], HumanMessage):
+        question = messages.pop().content
+    prompt_variables = get_system_time_info() | {
+        "user_notes": pack_context(retrieved_context) if retrieved_context else "No matching notes were found.",
+        "messages": messages,
+        "question": question,
+    }
+    return get_fast_answer_prompt_template().invoke(prompt_variables)
+
+
+def fast_answer_node(state: dict, llm: BaseChatModel):
+    """
+    Single-call answer pipeline: retrieves from the user's message directly and answers with one
+    combined prompt (conversation + retrieved notes), instead of agent, filter agent and synthesizer calls.
+    """
+    if not state.get("messages"):
+        log.warning("No messages found in the state at FastAnswerNode.")
+        return NO_MESSAGES_RESPONSE
+
+    emit_progress("searching_notes", "Searching your notes")
+    query_filters = fast_search_filters(state["messages"])
+    retrieved_context = rag_agent_tool_node.retrieve_context(query_filters, None)
+
+    emit_progress("synthesizing", f"Reading {len(retrieved_context)} matching passages")
+    response = llm.invoke(build_fast_answer_prompt(state, retrieved_context))
+    return {"messages": [with_sources(response, retrieved_context)]}
+
+
+async def afast_answer_node(state: dict, llm: BaseChatModel):
+    """Async version of `fast_answer_node`, used when the graph runs with `ainvoke` / `astream`."""
+    if not state.get("messages"):
+        log.warning("No messages found in the state at FastAnswerNode.")
+        return NO_MESSAGES_RESPONSE
+
+    emit_progress("searching_notes", "Searching your notes")
+    query_filters = fast_search_filters(state["messages"])
+    retrieved_context = await asyncio.to_thread(rag_agent_tool_node.retrieve_context, query_filters, None)
+
+    emit_progress("synthesizing", f"Reading {len(retrieved_context)} matching passages")
+    prompt = build_fast_answer_prompt(state, retrieved_context)
+    response = await llm.ainvoke(prompt)
+    return {"messages": [with_sources(response, retrieved_context)]}
+
+
+def with_sources(response: BaseMessage, retrieved_context: List[Document]) -> BaseMessage:
+    """Records the source notes in the reply's response_metadata, which is never sent back to the model."""
+    sources = list(dict.fromkeys(doc.metadata.get("file_name") for doc in retrieved_context if doc.metadata.get("file_name")))
+    response.response_metadata = {**response.response_metadata, "sources": sources}
+    return response
@@ -1,23 +1,28 @@
+import asyncio
 from typing import Annotated
 from src.graph.agent_state import AgentState
+from src.graph.streaming import NO_STREAM_TAG, SYNTHESIZER_TAG, emit_progress
 from src.utils import *
 from src.llm import llm_instance
 from src.models import VectorSearchOutputSchema
 from src.prompts import get_rag_agent_prompt_template,get_synthesizer_agent_prompt_template
-from src.vector_store import similarity_search
+from src.vector_store import similarity_search, batch_similarity_search, sub_query_searches, compress_documents, suggest_filenames, start_speculative_search, similarity_search_from_speculation, SpeculativeSearch
+from .answer_cache import lookup_answer, store_answer
+from .search_filter_fast_path import briefing_search_text, derive_search_filters, record_filter_path
 from langgraph.prebuilt import InjectedState
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from langchain_core.documents import Document
-from src.data_ingestion.ingestion_logging import fetch_available_notes
 
 log= setup_logger(__name__)
 
 llm_with_structured_output = llm_instance.with_structured_output(schema=VectorSearchOutputSchema)
 
-available_notes = fetch_available_notes()
+NO_RESULTS_RESPONSE = (
+    "summary: I couldn't find any specific information in your notes related to that query.Maybe, we should retry with a more different query",
+    [])
 
-@tool(name_or_callable= 'rag_agent_tool',response_format="content_and_artifact" )
-def retrieve_notes_tool(task_briefing: str, state: Annotated[AgentState, InjectedState]) -> tuple:
+
+def retrieve_notes(task_briefing: str, state: Annotated[AgentState, InjectedState]) -> tuple:
     """
     Orchestrates sub-agents to retrieve and synthesize information from user notes.
 
@@ -37,57 +42,155 @@ def retrieve_notes_tool(task_briefing: str, state: Annotated[AgentState, Injecte
     # log.info(state)
     log.info(f" -- ReAct Agent has requested the Rag_agent_tool with task_briefing: {task_briefing} -- ")
 
+    cached = lookup_answer(task_briefing) if config.ANSWER_CACHE else None
+    if cached is not None and cached.hit:
+        emit_progress("answer_cache", "Answered from earlier results")
+        return cached.answer, cached.artifact
+
     formatted_history = get_formatted_convo_history(state)
     # log.info(f"formatted_history: ---  {formatted_history} " )
     # log.info("----------------------------------------------------------------------------------------------------------------------------------------------")
-    
-    query_filters: VectorSearchOutputSchema = get_vector_search_filters_from_llm(task_briefing,formatted_history )
+
+    emit_progress("planning_search", "Planning the search")
+    query_filters, speculation = plan_search(task_briefing)
+    if query_filters is None:
+        query_filters = get_vector_search_filters_from_llm(task_briefing,formatted_history, speculation)
+        record_filter_path("llm")
 
     log.info(f" -- Output From the Vector Search Filter LLM : {query_filters} -- ")
 
-    retrieved_context: Optional[list[Document]] = similarity_search(query_filter=query_filters)
+    emit_progress("searching_notes", "Searching your notes")
+    retrieved_context: Optional[list[Document]] = retrieve_context(query_filters, speculation)
+
+    if not retrieved_context:
+        log.warning("No chunks retrieved from vector store.")
+        return NO_RESULTS_RESPONSE
+
+    log.info(" -- Synthesis LLM invoked by Rag_agent_tool --")
+    emit_progress("synthesizing", f"Reading {len(retrieved_context)} matching passages")
+
+    synthesizer_prompt = build_synthesizer_prompt(task_briefing, formatted_history, retrieved_context)
+    response = llm_instance.invoke(synthesizer_prompt, config={"tags": [SYNTHESIZER_TAG]})
 
-    # retrieved_context = None
+    log.debug( f" --- Response Received from synthesizer Agent : {response.content} ")
+
+    if cached is not None:
+        store_answer(cached, response.content, query_filters.filenames_filter, retrieved_context)
+    return response, query_filters.filenames_filter
+
+
+async def aretrieve_notes(task_briefing: str, state: Annotated[AgentState, InjectedState]) -> tuple:
+    """
+    Async twin of `retrieve_notes`, used when the graph runs with `ainvoke` / `astream`.
+    LLM calls are awaited and the blocking embedding / vector search steps run in worker threads,
+    so many conversations can share one event loop. The graph's BoundedToolNode caps the calls of one AI message.
+    """
+    log.info(f" -- ReAct Agent has requested the Rag_agent_tool (async) with task_briefing: {task_briefing} -- ")
+
+    cached = await asyncio.to_thread(lookup_answer, task_briefing) if config.ANSWER_CACHE else None
+    if cached is not None and cached.hit:
+        emit_progress("answer_cache", "Answered from earlier results")
+        return cached.answer, cached.artifact
+
+    formatted_history = get_formatted_convo_history(state)
+
+    emit_progress("planning_search", "Planning the search")
+    query_filters, speculation = await asyncio.to_thread(plan_search, task_briefing)
+    if query_filters is None:
+        query_filters = await aget_vector_search_filters_from_llm(task_briefing, formatted_history, speculation)
+        record_filter_path("llm")
+
+    log.info(f" -- Output From the Vector Search Filter LLM : {query_filters} -- ")
+
+    emit_progress("searching_notes", "Searching your notes")
+    retrieved_context: Optional[list[Document]] = await asyncio.to_thread(retrieve_context, query_filters, speculation)
 
     if not retrieved_context:
         log.warning("No chunks retrieved from vector store.")
-        return (
-            "summary: I couldn't find any specific information in your notes related to that query.Maybe, we should retry with a more different query",
-            [])
-        
-    
-    else:
-        log.info(" -- Synthesis LLM invoked by Rag_agent_tool --")
+        return NO_RESULTS_RESPONSE
 
-        context_string = "\n\n---\n\n".join([doc.page_content for doc in retrieved_context])
+    log.info(" -- Synthesis LLM invoked by Rag_agent_tool --")
+    emit_progress("synthesizing", f"Reading {len(retrieved_context)} matching passages")
 
-        synthesizer_prompt_template = get_synthesizer_agent_prompt_template()
+    synthesizer_prompt = build_synthesizer_prompt(task_briefing, formatted_history, retrieved_context)
+    response = await llm_instance.ainvoke(synthesizer_prompt, config={"tags": [SYNTHESIZER_TAG]})
 
-        prompt_variables = {
-        "task_briefing_from_core_agent": task_briefing,
-        "conversation_history":formatted_history,
-        "user_notes": context_string
-        }
+    log.debug( f" --- Response Received from synthesizer Agent : {response.content} ")
 
-        synthesizer_prompt = synthesizer_prompt_template.invoke(prompt_variables)
+    if cached is not None:
+        await asyncio.to_thread(store_answer, cached, response.content, query_filters.filenames_filter, retrieved_context)
+    return response, query_filters.filenames_filter
 
-        response = llm_instance.invoke(synthesizer_prompt)
 
-        log.debug( f" --- Response Received from synthesizer Agent : {response.content} ")
+retrieve_notes_tool = StructuredTool.from_function(
+    func=retrieve_notes,
+    coroutine=aretrieve_notes,
+    name='rag_agent_tool',
+    response_format="content_and_artifact",
+)
 
-        return response, query_filters.filenames_filter
 
-def get_vector_search_filters_from_llm(query,formatted_history:str) -> VectorSearchOutputSchema :
+def plan_search(task_briefing: str) -> tuple[Optional[VectorSearchOutputSchema], Optional[SpeculativeSearch]]:
     """
-    Uses an LLM to derive structured search parameters (refined query, metadata filters)
-    from a natural language query and available filenames.
+    Tries the heuristic fast path first. When the filter LLM is still needed, returns no filters and,
+    if enabled, a speculative search of the raw briefing that runs while the filter agent is thinking.
     """
+    query_filters: Optional[VectorSearchOutputSchema] = derive_search_filters(task_briefing) if config.FILTER_FAST_PATH else None
+    if query_filters is not None:
+        record_filter_path("fast_path")
+        return query_filters, None
+    if config.SPECULATIVE_RETRIEVAL:
+        return None, start_speculative_search(briefing_search_text(task_briefing))
+    return None, None
 
-    log.info(" -- Vector Search Filter agent invoked by Rag_agent_tool --")
 
-    # log.info(f"------------- query : {query}, message_history: {message_history} ")
+def retrieve_context(query_filters: VectorSearchOutputSchema, speculation: Optional[SpeculativeSearch]) -> list[Document]:
+    """
+    Answers from the speculative candidates when they fit the final filters, else runs a regular search.
+    Briefings split into sub-queries are searched as one batch whose results are rank-fused.
+    With CONTEXT_COMPRESSION, only the sentences closest to the query are kept of every chunk.
+    """
+    retrieved_context: Optional[list[Document]] = None
+    if query_filters.sub_queries:
+        if speculation is not None:  # the batch embeds and searches its own queries
+            speculation.future.cancel()
+        # the main query and every sub-query in one batch, merged by reciprocal rank fusion
+        searches = sub_query_searches(query_filters)
+        log.info(f" -- Searching {len(searches)} queries: {[search.refined_query_for_vector_search for search in searches]}")
+        retrieved_context = batch_similarity_search(searches, fusion="rrf")
+    elif speculation is not None:
+        retrieved_context = similarity_search_from_speculation(speculation, query_filters)
+    if retrieved_context is None:
+        retrieved_context = similarity_search(query_filter=query_filters)
+    if config.CONTEXT_COMPRESSION and retrieved_context:
+        retrieved_context = compress_documents(query_filters.refined_query_for_vector_search, retrieved_context)
+    return retrieved_context
+
+
+def build_synthesizer_prompt(task_briefing: str, formatted_history: str, retrieved_context: list[Document]):
+    context_string = pack_context(retrieved_context)
+
+    synthesizer_prompt_template = get_synthesizer_agent_prompt_template()
+
+    prompt_variables = {
+    "task_briefing_from_core_agent": task_briefing,
+    "conversation_history":formatted_history,
+    "user_notes": context_string
+    }
+
+    return synthesizer_prompt_template.invoke(prompt_variables)
+
 
-    available_file_names = available_notes
+def build_vector_search_filter_prompt(query, formatted_history: str, speculation: Optional[SpeculativeSearch] = None):
+    """
+    Builds the filter agent's prompt around the filenames most likely to matter for the query.
+    Filenames are compared with the briefing's search text, reusing the speculative search's vector when there is one.
+    """
+    available_file_names = suggest_filenames(
+        query,
+        query_embedding=speculation.query_vector if speculation is not None else None,
+        embedding_text=briefing_search_text(query),
+    )
     # available_file_names_list = ["ObsiQuery - PRD.md", "sample_prd_project_alpha.md", "tech_notes_kafka.md", "meeting_notes_2023_10.md"] # Hardcoded for now
     
     # Format filenames for the prompt
@@ -98,13 +201,36 @@ def get_vector_search_filters_from_llm(query,formatted_history:str) -> VectorSea
     prompt_variables = {
         "file_names": formatted_file_names,
         "task_briefing_from_core_agent": query,
-        "conversation_history": formatted_history
+        "conversation_history": formatted_history,
+        "current_date": get_system_time_info()["current_date"],
     }
 
-    prompt = prompt_template.invoke(prompt_variables)
+    return prompt_template.invoke(prompt_variables)
+
+
+def get_vector_search_filters_from_llm(query,formatted_history:str, speculation: Optional[SpeculativeSearch] = None) -> VectorSearchOutputSchema :
+    """
+    Uses an LLM to derive structured search parameters (refined query, metadata filters)
+    from a natural language query and the filenames most likely to matter for it.
+    """
+
+    log.info(" -- Vector Search Filter agent invoked by Rag_agent_tool --")
+
+    prompt = build_vector_search_filter_prompt(query, formatted_history, speculation)
 
     # log.info(f"final prompt --------------------------- : {prompt}")
 
-    response: VectorSearchOutputSchema = llm_with_structured_output.invoke(prompt) # type: ignore
+    # the structured JSON is of no use to a streaming UI
+    response: VectorSearchOutputSchema = llm_with_structured_output.invoke(prompt, config={"tags": [NO_STREAM_TAG]}) # type: ignore
     return response
 
+
+async def aget_vector_search_filters_from_llm(query, formatted_history: str, speculation: Optional[SpeculativeSearch] = None) -> VectorSearchOutputSchema:
+    """Async version of `get_vector_search_filters_from_llm`."""
+
+    log.info(" -- Vector Search Filter agent invoked by Rag_agent_tool (async) --")
+
+    prompt = await asyncio.to_thread(build_vector_search_filter_prompt, query, formatted_history, speculation)
+
+    response: VectorSearchOutputSchema = await llm_with_structured_output.ainvoke(prompt, config={"tags": [NO_STREAM_TAG]}) # type: ignore
+    return response
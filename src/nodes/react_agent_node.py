@@ -1,10 +1,19 @@
-from src.utils import setup_logger, get_system_time_info
+from src.utils import setup_logger, get_system_time_info, budget_agent_messages
 from src.prompts import get_react_agent_prompt_template
 from langchain_core.language_models.chat_models import BaseChatModel
 
 
 log = setup_logger(__name__)
 
+NO_MESSAGES_RESPONSE = {
+    "messages": [
+        {
+            "role": "assistant",
+            "content": "No messages to process in graph's state at ChatAgentNode.",
+        }
+    ]
+}
+
 
 def react_agent_node(state:dict, llm_with_tools:BaseChatModel):
     """
@@ -15,21 +24,34 @@ def react_agent_node(state:dict, llm_with_tools:BaseChatModel):
     messages = state.get("messages")
     if not messages:
         log.warning("No messages found in the state at ChatAgentNode.")
-        return {
-            "messages": [
-                {
-                    "role": "assistant",
-                    "content": "No messages to process in graph's state at ChatAgentNode.",
-                }
-            ]
-        }
+        return NO_MESSAGES_RESPONSE
 
-    system_time_info = get_system_time_info()
-    prompt_variables = state | system_time_info
-
-    prompt_template  = get_react_agent_prompt_template()
-    prompt = prompt_template.invoke(prompt_variables)
+    prompt = build_react_agent_prompt(state)
 
     response = llm_with_tools.invoke(prompt)
     # log.debug(f" ---  Response from REACT AGENT {response}")
-    return {"messages" : [response]}
\ No newline at end of file
+    return {"messages" : [response]}
+
+
+async def areact_agent_node(state:dict, llm_with_tools:BaseChatModel):
+    """
+    Async version of `react_agent_node`, used when the graph runs with `ainvoke` / `astream`.
+    """
+    if not state.get("messages"):
+        log.warning("No messages found in the state at ChatAgentNode.")
+        return NO_MESSAGES_RESPONSE
+
+    prompt = build_react_agent_prompt(state)
+
+    response = await llm_with_tools.ainvoke(prompt)
+    return {"messages" : [response]}
+
+
+def build_react_agent_prompt(state: dict):
+    # day-granular, so the system prompt stays byte-identical (and cached by the local model) all day
+    system_time_info = get_system_time_info()
+    # a constant-size window plus a running summary, instead of the whole conversation
+    prompt_variables = state | system_time_info | {"messages": budget_agent_messages(state["messages"])}
+
+    prompt_template  = get_react_agent_prompt_template()
+    return prompt_template.invoke(prompt_variables)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, Optional
+from src.utils import config, setup_logger
+from src.models import VectorSearchOutputSchema
+from src.vector_store import find_mentioned_filenames
+
+log = setup_logger(__name__)
+
+BRIEFING_SECTIONS = ("User Intent", "Information Required", "Contextual Nuances")
+SECTION_PATTERN = re.compile(
+    r"\**\s*(User Intent|Information Required|Contextual Nuances)\s*:?\s*\**\s*:?(.*?)(?=\**\s*(?:User Intent|Information Required|Contextual Nuances)\s*:?\s*\**|\Z)",
+    re.DOTALL | re.IGNORECASE,
+)
+# Briefings asking for dates, tags, properties, folders or sections need the filters only the LLM fills in.
+NEEDS_LLM_PATTERN = re.compile(
+    r"#\w|\d{4}-\d{2}-\d{2}|\b(today|yesterday|tomorrow|last|past|recent(ly)?|since|between|week|month|year|daily notes?|"
+    r"tag(ged|s)?|propert(y|ies)|status|folder|director(y|ies)|section|heading|updated|edited|modified)\b",
+    re.IGNORECASE,
+)
+LIST_MARKER_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+", re.MULTILINE)
+# Phrase score band in which a filename is probably, but not clearly, meant. The LLM decides those.
+AMBIGUOUS_FILENAME_SCORE = 0.6
+
+_counter_lock = threading.Lock()
+filter_path_counters: Counter = Counter()
+
+
+def record_filter_path(path: str) -> None:
+    """Counts which path ('fast_path' or 'llm') produced the search filters and logs the running totals."""
+    with _counter_lock:
+        filter_path_counters[path] += 1
+        total = sum(filter_path_counters.values())
+        log.info(f" -- Search filter path: {path} (fast path {filter_path_counters['fast_path']}/{total}, llm {filter_path_counters['llm']}/{total})")
+
+
+def get_filter_path_counters() -> Dict[str, int]:
+    with _counter_lock:
+        return dict(filter_path_counters)
+
+
+def parse_briefing_sections(task_briefing: str) -> Dict[str, str]:
+    """Splits the core agent's briefing into its 'User Intent', 'Information Required' and 'Contextual Nuances' sections."""
+    sections = {}
+    for name, body in SECTION_PATTERN.findall(task_briefing):
+        canonical = next(section for section in BRIEFING_SECTIONS if section.lower() == name.lower())
+        sections[canonical] = LIST_MARKER_PATTERN.sub("", body).strip().strip("[]").strip()
+    return sections
+
+
+def briefing_search_text(task_briefing: str) -> str:
+    """The briefing's intent and required information as one search string, or the whole briefing if it has no sections."""
+    sections = parse_briefing_sections(task_briefing)
+    text = " ".join(part for part in (sections.get("User Intent", ""), sections.get("Information Required", "")) if part)
+    return " ".join((text or task_briefing).split())
+
+
+def derive_search_filters(task_briefing: str) -> Optional[VectorSearchOutputSchema]:
+    """
+    Derives the search parameters from the briefing without an LLM call:
+    the query is the briefing's intent and required information, and the filename filter holds the notes
+    whose names are spelled out in the briefing. Returns None (use the LLM) when the briefing is not in the
+    expected shape, asks for date / tag / property / scope filters, or mentions a filename only vaguely.
+    """
+    sections = parse_briefing_sections(task_briefing)
+    information = sections.get("Information Required", "")
+    if not information:
+        return None
+
+    query = " ".join(part for part in (sections.get("User Intent", ""), information) if part)
+    nuances = sections.get("Contextual Nuances", "")
+    if nuances.rstrip(".").lower() in ("none", "n/a", ""):
+        nuances = ""
+    if NEEDS_LLM_PATTERN.search(f"{query}\n{nuances}"):
+        return None
+
+    mentioned = find_mentioned_filenames(f"{nuances}\n{information}", AMBIGUOUS_FILENAME_SCORE)
+    confident = [name for name, score in mentioned if score >= config.FILTER_FAST_PATH_FILENAME_SCORE]
+    if len(confident) != len(mentioned):
+        return None
+
+    return VectorSearchOutputSchema(
+        refined_query_for_vector_search=" ".join(query.split()),
+        filenames_filter=confident or None,
+        filter_rationale=(
+            f"Fast path: the briefing names {', '.join(confident)}." if confident
+            else "Fast path: the briefing names no specific files."
+        ),
+    )
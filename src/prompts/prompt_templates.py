@@ -1,5 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from .system_prompts import VECTOR_SEARCH_FILTER_AGENT_PROMPT,REACT_AGENT_SYSTEM_PROMPT,SYNTHESIS_AGENT_SYSTEM_PROMPT
+from .system_prompts import (
+    VECTOR_SEARCH_FILTER_AGENT_PROMPT, VECTOR_SEARCH_FILTER_AGENT_INPUT_PROMPT, REACT_AGENT_SYSTEM_PROMPT,
+    SYNTHESIS_AGENT_SYSTEM_PROMPT, SYNTHESIS_AGENT_INPUT_PROMPT, FAST_ANSWER_SYSTEM_PROMPT, FAST_ANSWER_INPUT_PROMPT,
+)
 
 
 def get_react_agent_prompt_template() -> ChatPromptTemplate:
@@ -20,8 +23,8 @@ def get_rag_agent_prompt_template() -> ChatPromptTemplate:
     system_prompt = VECTOR_SEARCH_FILTER_AGENT_PROMPT
     return ChatPromptTemplate.from_messages(
         [
-            ("system", system_prompt) # this has files, conversation history for context and task briefing
-            # ("assistant", "task_briefing_from_core_agent: {task_briefing_from_core_agent}") 
+            ("system", system_prompt), # static, so the local model's prompt cache covers it
+            ("human", VECTOR_SEARCH_FILTER_AGENT_INPUT_PROMPT), # date, history, files and task briefing
         ]
     )
 
@@ -30,6 +33,22 @@ def get_synthesizer_agent_prompt_template() -> ChatPromptTemplate:
     system_prompt = SYNTHESIS_AGENT_SYSTEM_PROMPT
     return ChatPromptTemplate.from_messages(
         [
-            ("system", system_prompt)
+            ("system", system_prompt),
+            ("human", SYNTHESIS_AGENT_INPUT_PROMPT),
         ]
-    )
\ No newline at end of file
+    )
+
+
+def get_fast_answer_prompt_template() -> ChatPromptTemplate:
+    """
+    Returns the ChatPromptTemplate of the fast mode graph, which answers from notes retrieved
+    for the user's message in a single LLM call. The earlier conversation goes in `messages`; the
+    latest message goes last, together with its notes, so the prefix stays cacheable.
+    """
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", FAST_ANSWER_SYSTEM_PROMPT),
+            MessagesPlaceholder(variable_name="messages"),
+            ("human", FAST_ANSWER_INPUT_PROMPT),
+        ]
+    )
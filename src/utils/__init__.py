@@ -1,4 +1,6 @@
 from .config import config
 from .logger import setup_logger
 from .common_utils import *
+from .message_history import *
+from .context_packing import *
 from .enums import *
\ No newline at end of file
@@ -1,7 +1,6 @@
-from langchain_core.messages import BaseMessage
-from typing import List, Optional
+from typing import Optional
 from src.models import FileMetadata
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
 
 def is_valid_metadata(metadata: FileMetadata) -> bool:
@@ -18,32 +17,37 @@ def is_valid_metadata(metadata: FileMetadata) -> bool:
         return False
     return True
 
+def to_unix_timestamp(value) -> Optional[float]:
+    """
+    Converts a date, datetime or ISO-8601 string into a Unix timestamp.
+    Naive values are treated as UTC. Returns None for anything that is not a recognizable date.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
 def get_system_time_info()-> dict:
-    utc_now =  datetime.now(timezone.utc)
-    local_tz = datetime.now().astimezone().tzinfo
-    day_of_week = datetime.now().strftime("%A")
+    """
+    Date information for the prompts, at day granularity: a timestamp would change the prompt
+    on every call and defeat the local model's prompt prefix cache.
+    """
+    local_now = datetime.now().astimezone()
 
     return {
-        "current_utc_datetime": utc_now,
-        "local_timezone": str(local_tz),
-        "day_of_week": day_of_week,
+        "current_date": local_now.date().isoformat(),
+        "local_timezone": str(local_now.tzinfo),
+        "day_of_week": local_now.strftime("%A"),
     }
-
-def format_recent_history(messages: List[BaseMessage], last_n: int = 5) -> str:
-    """Formats the last N messages into a string for the prompt."""
-    if not messages:
-        return "No recent conversation history."
-    
-    recent_messages = messages[ -last_n :]
-    formatted_lines = []
-    for msg in recent_messages:
-        role = "User" if msg.type == "human" else "Assistant" if msg.type == "ai" else "tool Response" if msg.type == "tool" else msg.type
-        formatted_lines.append(f"{role}: {msg.content}")
-    return "\n".join(formatted_lines)
-
-def get_formatted_convo_history(state):
-    message_history: Optional[List[BaseMessage]] = state["messages"]
-    formatted_history: str = "No recent conversation history provided."
-    if message_history:
-        formatted_history = format_recent_history(message_history, last_n=5)
-    return formatted_history
\ No newline at end of file
@@ -10,6 +10,12 @@ class Config:
         raise ValueError("LLM_PROVIDER must be set in the environment variables.")
 
     OLLAMA_MODEL_NAME = os.getenv("OLLAMA_MODEL_NAME")
+    # How long Ollama keeps the model (and its prompt cache) loaded after a request: a duration ("30m") or seconds (-1 = forever)
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m").strip()
+    if OLLAMA_KEEP_ALIVE.lstrip("-").isdigit():
+        OLLAMA_KEEP_ALIVE = int(OLLAMA_KEEP_ALIVE)
+    # Context window in tokens (0 = server default). Keep it fixed: a different value per request reloads the model.
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", 8192))
 
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
@@ -18,14 +24,86 @@ class Config:
     if not OLLAMA_EMBEDDING_MODEL:
         raise ValueError("OLLAMA_EMBEDDING_MODEL must be set in the environment variables.")
 
+    EMBEDDING_REDUCTION = os.getenv("EMBEDDING_REDUCTION", "none").lower()  # none | matryoshka | pca
+    if EMBEDDING_REDUCTION not in ("none", "matryoshka", "pca"):
+        raise ValueError("EMBEDDING_REDUCTION must be one of 'none', 'matryoshka' or 'pca'.")
+
+    EMBEDDING_REDUCED_DIM = int(os.getenv("EMBEDDING_REDUCED_DIM", 256))
+    EMBEDDING_PCA_FIT_SAMPLES = int(os.getenv("EMBEDDING_PCA_FIT_SAMPLES", 2000))  # chunks embedded to fit the projection
+
     VECTOR_STORE_COLLECTION = os.getenv("VECTOR_STORE_COLLECTION")
+
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "./data")
+
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()  # chroma | numpy
+    if VECTOR_BACKEND not in ("chroma", "numpy"):
+        raise ValueError("VECTOR_BACKEND must be either 'chroma' or 'numpy'.")
+
+    VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()  # none | int8 | binary (numpy backend only)
+    if VECTOR_QUANTIZATION not in ("none", "int8", "binary"):
+        raise ValueError("VECTOR_QUANTIZATION must be one of 'none', 'int8' or 'binary'.")
+
+    VECTOR_RESCORE_FACTOR = int(os.getenv("VECTOR_RESCORE_FACTOR", 4))  # candidates rescored in full precision = k * factor
+
+    RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", 3))  # chunks handed to the synthesizer
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "similarity").lower()  # similarity | mmr
+    if RETRIEVAL_MODE not in ("similarity", "mmr"):
+        raise ValueError("RETRIEVAL_MODE must be either 'similarity' or 'mmr'.")
+    RETRIEVAL_SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", 0.0))  # minimum cosine similarity
+    MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", 20))  # candidates over-fetched for MMR
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.5))  # 1 = pure relevance, 0 = pure diversity
+    RETRIEVAL_FUSED_K = int(os.getenv("RETRIEVAL_FUSED_K", 6))  # chunks kept after rank-fusing a briefing's sub-queries
+    RETRIEVAL_NEIGHBOUR_WINDOW = int(os.getenv("RETRIEVAL_NEIGHBOUR_WINDOW", 0))  # expand hits with +-N sibling chunks
+
+    COARSE_TO_FINE_TOP_NOTES = int(os.getenv("COARSE_TO_FINE_TOP_NOTES", 0))  # 0 disables the note centroid pre-selection
+    GRAPH_EXPANSION_K = int(os.getenv("GRAPH_EXPANSION_K", 0))  # extra chunks from wikilinked notes, 0 disables
+    GRAPH_EXPANSION_SEED_HITS = int(os.getenv("GRAPH_EXPANSION_SEED_HITS", 2))  # top hits whose notes' links are followed
+    FILENAME_CANDIDATES = int(os.getenv("FILENAME_CANDIDATES", 50))  # filenames shown to the filter agent
+    FILTER_FAST_PATH = os.getenv("FILTER_FAST_PATH", "false").lower() in ("1", "true", "yes")  # skip the filter LLM when confident
+    FILTER_FAST_PATH_FILENAME_SCORE = float(os.getenv("FILTER_FAST_PATH_FILENAME_SCORE", 0.9))  # phrase score of a mentioned filename
+    SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() in ("1", "true", "yes")  # search the briefing during the filter LLM call
+    SPECULATIVE_FETCH_K = int(os.getenv("SPECULATIVE_FETCH_K", 50))  # unfiltered candidates fetched speculatively
+    SPECULATIVE_MIN_QUERY_OVERLAP = float(os.getenv("SPECULATIVE_MIN_QUERY_OVERLAP", 0.5))  # word overlap needed to reuse them
+    RECENCY_HALF_LIFE_DAYS = float(os.getenv("RECENCY_HALF_LIFE_DAYS", 0))  # 0 disables recency-aware ranking
+    RECENCY_WEIGHT = float(os.getenv("RECENCY_WEIGHT", 0.3))  # share of the score subject to the recency decay
+    if not 0.0 <= RECENCY_WEIGHT <= 1.0:
+        raise ValueError("RECENCY_WEIGHT must be between 0 and 1.")
     
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", 3000))  # retrieved notes packed into the synthesizer prompt
+    GRAPH_MODE = os.getenv("GRAPH_MODE", "agent").lower()  # agent (ReAct + RAG tool team) | fast (one LLM call per message)
+    if GRAPH_MODE not in ("agent", "fast"):
+        raise ValueError("GRAPH_MODE must be either 'agent' or 'fast'.")
+    TOOL_CALL_CONCURRENCY = int(os.getenv("TOOL_CALL_CONCURRENCY", 3))  # tool calls of one agent turn run in parallel, up to this many
+    ANSWER_CACHE = os.getenv("ANSWER_CACHE", "false").lower() in ("1", "true", "yes")  # reuse answers to repeated briefings
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))  # cosine between briefings to count as the same question
+    ANSWER_CACHE_TTL_HOURS = float(os.getenv("ANSWER_CACHE_TTL_HOURS", 72))  # also bounds staleness from notes added since
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 500))
+    CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "false").lower() in ("1", "true", "yes")  # keep only query-relevant sentences
+    COMPRESSION_CHUNK_MAX_TOKENS = int(os.getenv("COMPRESSION_CHUNK_MAX_TOKENS", 150))  # sentences kept per chunk
+    HISTORY_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", 3000))  # conversation window of the ReAct agent, older turns are summarized
+    HISTORY_TOOL_MESSAGE_MAX_TOKENS = int(os.getenv("HISTORY_TOOL_MESSAGE_MAX_TOKENS", 300))  # tool outputs of earlier turns are cut to this
+    HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", 400))  # running summary of turns outside the window
+    SUB_AGENT_HISTORY_MAX_TOKENS = int(os.getenv("SUB_AGENT_HISTORY_MAX_TOKENS", 800))  # history pasted into the filter / synthesizer prompts
+
     DEBUG = os.getenv("DEBUG", False) == True
 
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", 8000))
+    API_MAX_CONCURRENT_RUNS = int(os.getenv("API_MAX_CONCURRENT_RUNS", 4))  # graph runs executing at once in api_server.py
+
     SQLITE_DB_FILE = os.getenv("SQLITE_DB_FILE")
     if not SQLITE_DB_FILE:
         raise ValueError("SQLITE_DB_FILE must be set in the environment variables.")
 
+    CHECKPOINTER = os.getenv("CHECKPOINTER", "memory").lower()  # memory | sqlite (conversations survive restarts)
+    if CHECKPOINTER not in ("memory", "sqlite"):
+        raise ValueError("CHECKPOINTER must be either 'memory' or 'sqlite'.")
+    CHECKPOINT_DB_FILE = os.getenv("CHECKPOINT_DB_FILE", "./data/checkpoints.db")
+    CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", 168))  # idle threads older than this are deleted
+    CHECKPOINT_MAX_DB_MB = float(os.getenv("CHECKPOINT_MAX_DB_MB", 256))  # least recently used threads are evicted above this
+    CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", 5))  # newest checkpoints kept per thread
+    CHECKPOINT_MAINTENANCE_INTERVAL = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL", 300))  # seconds between maintenance runs
+
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 1000))
     if not CHUNK_SIZE or not isinstance(CHUNK_SIZE, int) or CHUNK_SIZE <= 0:
         raise ValueError("CHUNK_SIZE must be a valid integer.")
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from langchain_core.documents import Document
+from .config import config
+from .message_history import estimate_tokens, truncate_to_tokens
+
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+MIN_TRUNCATED_SEGMENT_TOKENS = 80  # a passage is only cut to fit when at least this much of it survives
+
+
+@dataclass
+class ContextSegment:
+    """A contiguous span of one note, built from one or more retrieved chunks."""
+    file_name: str
+    heading_path: str
+    text: str
+    score: float
+    char_start: Optional[int]
+    char_end: Optional[int]
+    first_chunk: Optional[int]
+    last_chunk: Optional[int]
+
+    @classmethod
+    def from_document(cls, doc: Document) -> "ContextSegment":
+        metadata = doc.metadata or {}
+        first_chunk = last_chunk = metadata.get("chunk_index")
+        if chunk_range := metadata.get("chunk_index_range"):  # neighbour-expanded runs
+            first_chunk, last_chunk = (int(part) for part in str(chunk_range).split("-"))
+        return cls(
+            file_name=metadata.get("file_name") or metadata.get("source") or "unknown note",
+            heading_path=metadata.get("heading_path") or metadata.get("section_title") or "",
+            text=doc.page_content.strip(),
+            score=float(metadata.get("relevance_score", 0.0)),
+            char_start=metadata.get("char_start"),
+            char_end=metadata.get("char_end"),
+            first_chunk=first_chunk,
+            last_chunk=last_chunk,
+        )
+
+    @property
+    def has_position(self) -> bool:
+        return self.char_start is not None and self.char_end is not None
+
+    def touches(self, other: "ContextSegment") -> bool:
+        """True when `other` (starting at or after this segment) overlaps it or is the very next chunk."""
+        if other.char_start <= self.char_end:  # type: ignore[operator]
+            return True
+        return self.last_chunk is not None and other.first_chunk is not None and other.first_chunk == self.last_chunk + 1
+
+    def absorb(self, other: "ContextSegment") -> None:
+        if other.char_end > self.char_end:  # type: ignore[operator]
+            self.text = join_without_overlap(self.text, other.text)
+        # otherwise `other` lies inside this span and adds no text
+        if other.score > self.score:
+            self.score, self.heading_path = other.score, other.heading_path or self.heading_path
+        self.char_end = max(self.char_end, other.char_end)  # type: ignore[type-var]
+        if other.last_chunk is not None:
+            self.last_chunk = other.last_chunk if self.last_chunk is None else max(self.last_chunk, other.last_chunk)
+
+    def header(self, number: int) -> str:
+        return f"[{number}] {self.file_name}" + (f" › {self.heading_path}" if self.heading_path else "")
+
+
+def join_without_overlap(first: str, second: str) -> str:
+    """
+    Appends `second` to `first`, dropping the leading blocks of `second` that `first` already ends with.
+    Chunks overlap by whole blocks joined with blank lines, so only block boundaries are tried, longest first.
+    """
+    if second in first:
+        return first
+    boundaries = [index for index in range(len(second)) if second.startswith("\n\n", index)]
+    for boundary in reversed(boundaries):
+        overlap = second[:boundary].strip()
+        if overlap and first.endswith(overlap):
+            return first + second[boundary:]
+    return f"{first}\n\n{second}"
+
+
+def merge_segments(documents: List[Document]) -> List[ContextSegment]:
+    """Deduplicates and merges overlapping or adjacent chunks of the same note into single segments."""
+    by_file: dict = {}
+    unpositioned: List[ContextSegment] = []
+    seen_texts: set = set()
+    for doc in documents:
+        segment = ContextSegment.from_document(doc)
+        if not segment.text or segment.text in seen_texts:
+            continue
+        seen_texts.add(segment.text)
+        if segment.has_position:
+            by_file.setdefault(segment.file_name, []).append(segment)
+        else:
+            unpositioned.append(segment)
+
+    merged: List[ContextSegment] = []
+    for segments in by_file.values():
+        segments.sort(key=lambda segment: (segment.char_start, -segment.char_end))
+        current = segments[0]
+        for segment in segments[1:]:
+            if current.touches(segment):
+                current.absorb(segment)
+            else:
+                merged.append(current)
+                current = segment
+        merged.append(current)
+    return merged + unpositioned
+
+
+def pack_context(documents: List[Document], max_tokens: Optional[int] = None) -> str:
+    """
+    Turns retrieved chunks into the synthesizer's `user_notes`: overlapping and adjacent chunks of a note
+    are merged without repeating their shared text, and the resulting passages are added best score first,
+    each under a compact source header, until the token budget is spent. A passage that does not fit is
+    truncated if enough of it survives, otherwise skipped in favour of smaller ones further down.
+    """
+    max_tokens = config.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+    segments = sorted(merge_segments(documents), key=lambda segment: segment.score, reverse=True)
+
+    packed: List[str] = []
+    used_tokens = 0
+    for segment in segments:
+        header = segment.header(len(packed) + 1)
+        cost = estimate_tokens(header) + estimate_tokens(CONTEXT_SEPARATOR) + 1
+        available = max_tokens - used_tokens - cost
+        text = segment.text
+        if estimate_tokens(text) > available:
+            if available < MIN_TRUNCATED_SEGMENT_TOKENS:
+                continue
+            text = truncate_to_tokens(text, available)
+        packed.append(f"{header}\n{text}")
+        used_tokens += cost + estimate_tokens(text)
+    return CONTEXT_SEPARATOR.join(packed)
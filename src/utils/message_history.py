@@ -0,0 +1,167 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from .config import config
+
+CHARS_PER_TOKEN = 4  # same estimate as langchain's count_tokens_approximately
+SUMMARY_LINE_TOKENS = 60  # each rolled-up message is cut to this before entering the summary
+SUMMARY_CACHE_SIZE = 256  # conversations whose running summary is kept
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast token estimate (about 4 characters per token), good enough for prompt budgeting."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to roughly `max_tokens`, on a word boundary where possible, marking the cut."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    if " " in cut[max_chars // 2:]:
+        cut = cut[:cut.rindex(" ")]
+    return f"{cut.rstrip()} …[truncated]"
+
+
+def message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, list):  # content blocks
+        content = " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return " ".join(str(content).split())
+
+
+def _with_content(message: BaseMessage, content: str) -> BaseMessage:
+    return message.model_copy(update={"content": content})
+
+
+class RunningSummary:
+    """
+    Rolls messages that fell out of the agent's history window into a compact, extractive summary
+    (one truncated line per user / assistant message, oldest lines dropped beyond the budget).
+
+    Summaries are cached per conversation, keyed by the id of its first message, and extended
+    incrementally: a turn is summarized once, when it leaves the window, never again.
+    """
+
+    def __init__(self, max_tokens: int):
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        # first message id -> (number of messages summarized, id of the last one, summary lines)
+        self._cache: "OrderedDict[str, tuple[int, Optional[str], List[str]]]" = OrderedDict()
+
+    def summarize(self, dropped: Sequence[BaseMessage]) -> str:
+        if not dropped:
+            return ""
+        key = dropped[0].id
+        with self._lock:
+            covered, last_id, lines = self._cache.get(key, (0, None, [])) if key else (0, None, [])
+            if covered > len(dropped) or (covered and dropped[covered - 1].id != last_id):
+                covered, lines = 0, []  # history was edited, start over
+            lines = lines + [line for line in map(self._summary_line, dropped[covered:]) if line]
+            while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.max_tokens:
+                lines.pop(0)
+            if key:
+                self._cache[key] = (len(dropped), dropped[-1].id, lines)
+                self._cache.move_to_end(key)
+                while len(self._cache) > SUMMARY_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _summary_line(message: BaseMessage) -> Optional[str]:
+        # tool outputs are left out: the assistant's reply that follows them carries their gist
+        text = message_text(message)
+        if isinstance(message, HumanMessage) and text:
+            return f"User: {truncate_to_tokens(text, SUMMARY_LINE_TOKENS)}"
+        if isinstance(message, AIMessage):
+            if text:
+                return f"Assistant: {truncate_to_tokens(text, SUMMARY_LINE_TOKENS)}"
+            if message.tool_calls:
+                return "Assistant: (searched the notes)"
+        return None
+
+
+running_summary = RunningSummary(config.HISTORY_SUMMARY_MAX_TOKENS)
+
+
+def _current_turn_start(messages: Sequence[BaseMessage]) -> int:
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    return 0
+
+
+def budget_agent_messages(
+    messages: Sequence[BaseMessage],
+    max_tokens: Optional[int] = None,
+    tool_message_max_tokens: Optional[int] = None,
+) -> List[BaseMessage]:
+    """
+    Fits the conversation into a constant token budget for the ReAct agent's prompt:
+    - the current turn (latest user message onwards) is always kept whole
+    - tool outputs of earlier turns are truncated, the assistant already answered from them
+    - earlier turns are kept newest first while they fit, starting on a user message so tool calls stay paired
+    - whatever does not fit is rolled into the cached running summary, prepended as one message
+    """
+    max_tokens = config.HISTORY_MAX_TOKENS if max_tokens is None else max_tokens
+    tool_message_max_tokens = config.HISTORY_TOOL_MESSAGE_MAX_TOKENS if tool_message_max_tokens is None else tool_message_max_tokens
+    messages = list(messages)
+    turn_start = _current_turn_start(messages)
+    earlier, current = messages[:turn_start], messages[turn_start:]
+    if not earlier:
+        return current
+
+    earlier = [
+        _with_content(message, truncate_to_tokens(message_text(message), tool_message_max_tokens))
+        if isinstance(message, ToolMessage) else message
+        for message in earlier
+    ]
+    remaining = max_tokens - count_tokens_approximately(current)
+    kept = trim_messages(
+        earlier,
+        max_tokens=max(remaining, 0),
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+        allow_partial=False,
+    ) if remaining > 0 else []
+
+    dropped = messages[:turn_start - len(kept)]
+    summary = running_summary.summarize(dropped)
+    if summary:
+        kept = [HumanMessage(content=f"[Summary of the earlier conversation]\n{summary}")] + kept
+    return kept + current
+
+
+def format_recent_history(messages: List[BaseMessage], last_n: int = 5, max_tokens: Optional[int] = None) -> str:
+    """
+    Formats the last N messages into a string for the prompt, newest kept first, within a token budget.
+    Each message is truncated to its share of the budget so one long tool output cannot crowd out the rest.
+    """
+    if not messages:
+        return "No recent conversation history."
+
+    max_tokens = config.SUB_AGENT_HISTORY_MAX_TOKENS if max_tokens is None else max_tokens
+    recent_messages = messages[-last_n:]
+    per_message_tokens = max(max_tokens // len(recent_messages), 1)
+    formatted_lines = []
+    used_tokens = 0
+    for msg in reversed(recent_messages):
+        role = "User" if msg.type == "human" else "Assistant" if msg.type == "ai" else "tool Response" if msg.type == "tool" else msg.type
+        line = f"{role}: {truncate_to_tokens(message_text(msg), per_message_tokens)}"
+        used_tokens += estimate_tokens(line)
+        if used_tokens > max_tokens and formatted_lines:
+            break
+        formatted_lines.append(line)
+    return "\n".join(reversed(formatted_lines))
+
+
+def get_formatted_convo_history(state):
+    message_history: Optional[List[BaseMessage]] = state["messages"]
+    formatted_history: str = "No recent conversation history provided."
+    if message_history:
+        formatted_history = format_recent_history(message_history, last_n=5)
+    return formatted_history
@@ -1 +1,6 @@
-from .vector_storage import vector_store_instance ,upload_documents_to_vector_store,similarity_search
\ No newline at end of file
+from .vector_storage import vector_store_instance ,upload_documents_to_vector_store,similarity_search,batch_similarity_search,save_note_centroids
+from .vector_storage import refresh_filename_index, suggest_filenames, find_mentioned_filenames, sub_query_searches
+from .vector_storage import start_speculative_search, similarity_search_from_speculation, SpeculativeSearch
+from .vector_storage import reset_index_if_settings_changed
+from .sentence_compression import compress_documents
+from .base_backend import VectorBackend, SearchHit
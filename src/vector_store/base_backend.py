@@ -0,0 +1,60 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import numpy as np
+from langchain_core.documents import Document
+
+# Chroma style metadata filter, e.g. {"file_name": {"$in": ["a.md", "b.md"]}}
+WhereFilter = Dict[str, Any]
+
+
+@dataclass
+class SearchHit:
+    """A single chunk returned by a vector backend."""
+    id: str
+    document: str
+    metadata: Dict[str, Any]
+    score: float  # cosine similarity to the query, higher is better
+    embedding: Optional[np.ndarray] = None  # only populated when the caller asked for embeddings
+
+    def to_document(self) -> Document:
+        """Converts the hit into a LangChain Document, carrying the relevance score in its metadata."""
+        metadata = dict(self.metadata)
+        metadata["relevance_score"] = self.score
+        return Document(id=self.id, page_content=self.document, metadata=metadata)
+
+
+class VectorBackend(ABC):
+    """
+    Interface every vector store implementation has to provide.
+    Backends work on pre-computed, L2 normalized embeddings; embedding the text is done by the caller.
+    """
+
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Stores the given chunks. `embeddings` is a (n, d) float32 matrix aligned with `ids`."""
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """Removes the chunks with the given ids. Unknown ids are ignored."""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        where: Optional[WhereFilter] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[SearchHit]]:
+        """
+        Runs a batched top-k search. `query_embeddings` is a (b, d) matrix.
+        Returns one list of hits per query, sorted by descending score.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Returns the number of chunks currently stored."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Removes every stored chunk, e.g. before re-ingesting the vault with a different embedding dimension."""
@@ -0,0 +1,125 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from src.utils import setup_logger
+from .vector_math import l2_normalize, top_k_indices
+
+log = setup_logger(__name__)
+
+
+class NoteCentroidIndex:
+    """
+    One summary vector per note (the normalized mean of its chunk embeddings), keyed by the note's log_id.
+
+    Used as the coarse stage of a two-stage search: the query is scored against every centroid in one
+    matrix product, and chunk search then runs only inside the top-M notes. Centroids are replaced
+    in memory whenever a file is re-ingested and written to disk once per ingestion run via `save()`.
+    Rows live in buffers that grow by doubling, and a removed row is filled with the last one, so
+    ingesting n notes copies O(n) rows in total.
+    """
+
+    def __init__(self, persist_path: str):
+        self.persist_path = Path(persist_path)
+        self._lock = threading.RLock()
+        self._size = 0
+        self._log_ids = np.zeros(0, dtype=np.int64)  # buffers; the first `_size` rows are in use
+        self._centroids: Optional[np.ndarray] = None
+        self._row_by_log_id: dict = {}
+        self._dirty = False
+        self._loaded_mtime: Optional[float] = None
+        self.load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self) -> None:
+        if not self.persist_path.exists():
+            return
+        with self._lock:
+            with np.load(self.persist_path) as data:
+                self._log_ids = data["log_ids"].astype(np.int64)
+                self._centroids = data["centroids"].astype(np.float32)
+            self._size = int(self._log_ids.size)
+            self._row_by_log_id = {int(log_id): row for row, log_id in enumerate(self._log_ids)}
+            self._loaded_mtime = self.persist_path.stat().st_mtime
+        log.info(f"Loaded {len(self)} note centroids from {self.persist_path}")
+
+    def reload_if_changed(self) -> bool:
+        """
+        Picks up centroids saved by another process (e.g. a separate ingestion run).
+        Unsaved in-process updates win over the file. Returns whether the centroids were reloaded.
+        """
+        with self._lock:
+            if self._dirty or not self.persist_path.exists() or self.persist_path.stat().st_mtime == self._loaded_mtime:
+                return False
+            self.load()
+            return True
+
+    def save(self) -> None:
+        """Persists the centroids if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                centroids = self._centroids[:self._size] if self._centroids is not None else np.zeros((0, 0), np.float32)
+                np.savez(f, log_ids=self._log_ids[:self._size], centroids=centroids)
+            os.replace(tmp_path, self.persist_path)
+            self._loaded_mtime = self.persist_path.stat().st_mtime
+            self._dirty = False
+            log.info(f"Saved {len(self)} note centroids to {self.persist_path}")
+
+    def update(self, log_id: int, chunk_embeddings: np.ndarray) -> None:
+        """Sets (or replaces) the centroid of a note from the embeddings of its current chunks."""
+        centroid = l2_normalize(np.asarray(chunk_embeddings, dtype=np.float32).mean(axis=0))
+        with self._lock:
+            row = self._row_by_log_id.get(log_id)
+            if self._centroids is None or self._centroids.shape[1] != centroid.shape[0]:
+                if self._centroids is not None and len(self):
+                    log.warning("Embedding dimension changed, dropping all stored note centroids.")
+                self._centroids = np.zeros((0, centroid.shape[0]), dtype=np.float32)
+                self._log_ids = np.zeros(0, dtype=np.int64)
+                self._row_by_log_id = {}
+                self._size = 0
+                row = None
+            if row is None:
+                if self._size == len(self._log_ids):
+                    self._grow(max(16, 2 * self._size))
+                row = self._size
+                self._row_by_log_id[log_id] = row
+                self._log_ids[row] = log_id
+                self._size += 1
+            self._centroids[row] = centroid
+            self._dirty = True
+
+    def _grow(self, capacity: int) -> None:
+        log_ids = np.zeros(capacity, dtype=np.int64)
+        log_ids[:self._size] = self._log_ids[:self._size]
+        centroids = np.zeros((capacity, self._centroids.shape[1]), dtype=np.float32)  # type: ignore
+        centroids[:self._size] = self._centroids[:self._size]  # type: ignore
+        self._log_ids, self._centroids = log_ids, centroids
+
+    def remove(self, log_id: int) -> None:
+        with self._lock:
+            row = self._row_by_log_id.pop(log_id, None)
+            if row is None or self._centroids is None:
+                return
+            last = self._size - 1
+            if row != last:  # the last row takes the removed row's place
+                self._log_ids[row] = self._log_ids[last]
+                self._centroids[row] = self._centroids[last]
+                self._row_by_log_id[int(self._log_ids[row])] = row
+            self._size = last
+            self._dirty = True
+
+    def top_notes(self, query_embeddings: np.ndarray, m: int) -> List[List[int]]:
+        """Returns the log_ids of the top-m notes by centroid similarity, for each query in the (b, d) batch."""
+        with self._lock:
+            if self._centroids is None or not len(self):
+                return [[] for _ in range(len(query_embeddings))]
+            scores = self._centroids[:self._size] @ l2_normalize(np.atleast_2d(query_embeddings)).T  # (notes, b)
+            top = top_k_indices(scores, m)
+            return [self._log_ids[top[:, q]].tolist() for q in range(scores.shape[1])]
@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional
+import chromadb
+import numpy as np
+from src.utils import setup_logger
+from .base_backend import SearchHit, VectorBackend, WhereFilter
+
+log = setup_logger(__name__)
+
+
+class ChromaVectorBackend(VectorBackend):
+    """
+    Vector backend backed by a persistent Chroma (HNSW) collection.
+    Uses the same collection the LangChain Chroma wrapper used to create, so existing data keeps working.
+    """
+
+    def __init__(self, collection_name: str, persist_directory: str):
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.collection_name = collection_name
+        # embeddings are always computed by the caller, chroma must not embed anything itself
+        self.collection = self.client.get_or_create_collection(name=collection_name, embedding_function=None)
+        space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        self.space = space
+        log.info(f"Chroma backend ready: collection '{collection_name}' ({space} space) at {persist_directory}")
+
+    def add(self, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        self.collection.upsert(
+            ids=ids,
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            documents=documents,
+            metadatas=metadatas, # type: ignore
+        )
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def query(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        where: Optional[WhereFilter] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[SearchHit]]:
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        result = self.collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+            n_results=k,
+            where=where or None,
+            include=include, # type: ignore
+        )
+
+        batched_hits: List[List[SearchHit]] = []
+        for q in range(len(result["ids"])):
+            hits = []
+            for j, chunk_id in enumerate(result["ids"][q]):
+                embedding = None
+                if include_embeddings and result.get("embeddings") is not None:
+                    embedding = np.asarray(result["embeddings"][q][j], dtype=np.float32) # type: ignore
+                hits.append(SearchHit(
+                    id=chunk_id,
+                    document=result["documents"][q][j] or "", # type: ignore
+                    metadata=dict(result["metadatas"][q][j] or {}), # type: ignore
+                    score=self._distance_to_similarity(result["distances"][q][j]), # type: ignore
+                    embedding=embedding,
+                ))
+            batched_hits.append(hits)
+        return batched_hits
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def reset(self) -> None:
+        # dropping the collection also resets its dimension, which chroma fixes on the first add
+        self.client.delete_collection(name=self.collection_name)
+        self.collection = self.client.get_or_create_collection(
+            name=self.collection_name, embedding_function=None, metadata={"hnsw:space": self.space}
+        )
+        log.info(f"Chroma collection '{self.collection_name}' cleared.")
+
+    def _distance_to_similarity(self, distance: float) -> float:
+        """Maps chroma's distance to cosine similarity. Stored vectors are unit length, so l2 (squared) = 2 - 2cos."""
+        if self.space == "l2":
+            return 1.0 - float(distance) / 2.0
+        return 1.0 - float(distance)  # cosine and ip distances are both 1 - dot
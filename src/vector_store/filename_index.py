@@ -0,0 +1,209 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.utils import setup_logger
+from .vector_math import l2_normalize, top_k_indices
+
+log = setup_logger(__name__)
+
+EmbedFunction = Callable[[List[str]], List[List[float]]]
+
+
+def filename_title(file_name: str) -> str:
+    """'project_alpha-PRD.md' -> 'project alpha PRD'"""
+    stem = file_name[:-3] if file_name.lower().endswith(".md") else file_name
+    return " ".join(re.split(r"[\s_\-.]+", stem)).strip()
+
+
+def phrase_words(text: str) -> List[str]:
+    """Lowercase words split the same way as note titles: 'project_alpha-PRD.md' -> ['project', 'alpha', 'prd', 'md']"""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def is_distinctive_title(words: Sequence[str]) -> bool:
+    """
+    Whether a title alone identifies a note in free text. A single plain word ('Notes', 'Meeting', 'Kafka')
+    is just as likely a topic as a note name, so it only counts when the text references the file explicitly.
+    """
+    return len(words) > 1 or (len(words) == 1 and any(char.isdigit() for char in words[0]))
+
+
+def references_file(text: str, file_name: str) -> bool:
+    """Whether the text names the file outright, as 'Kafka.md' or as a [[Kafka]] wikilink."""
+    stem = re.escape(file_name[:-3] if file_name.lower().endswith(".md") else file_name)
+    return re.search(rf"\[\[\s*{stem}\s*[\]|#]|(?<![\w/]){stem}\.md\b", text, re.IGNORECASE) is not None
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of every word, padded so short words and word starts count too."""
+    grams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def phrase_score(title: Sequence[str], word_grams: Sequence[set]) -> float:
+    """
+    How well the title's words appear as one contiguous, in-order run of the text's words (given as their
+    trigram sets): the best run's share of title trigrams found in the aligned words, between 0 and 1.
+    """
+    if not title or len(word_grams) < len(title):
+        return 0.0
+    title_grams = [trigrams(word) for word in title]
+    total = sum(len(grams) for grams in title_grams)
+    best = 0
+    for start in range(len(word_grams) - len(title) + 1):
+        found = sum(len(grams & word_grams[start + i]) for i, grams in enumerate(title_grams))
+        best = max(best, found)
+    return best / total
+
+
+class FilenameIndex:
+    """
+    Local index over the vault's note names, used to hand the filter agent a short list of likely
+    filenames instead of every note in the vault.
+
+    Each name is scored against a text two ways: trigram containment (the share of the title's
+    character trigrams that appear in the text, via an inverted index, so typos and partial names
+    still match) and cosine similarity between the text and the embedded title. The two are averaged.
+    Title embeddings are persisted, and `refresh()` only embeds names that are new since the last run.
+
+    `mentioned_names()` is stricter, since its result becomes a hard filename filter: the title's words
+    must appear in order as one phrase in the text, and single-word titles need an explicit reference.
+    """
+
+    def __init__(self, persist_path: str, embed: EmbedFunction):
+        self.persist_path = Path(persist_path)
+        self._embed = embed
+        self._lock = threading.RLock()
+        self._names: List[str] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._postings: Dict[str, np.ndarray] = {}
+        self._trigram_counts = np.zeros(0, dtype=np.float32)
+        self._title_words: List[List[str]] = []
+        self._loaded_mtime: Optional[float] = None
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def load(self) -> None:
+        """Loads the persisted index, if there is one."""
+        if not self.persist_path.exists():
+            return
+        with self._lock:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                names, embeddings = data["names"].tolist(), data["embeddings"].astype(np.float32)
+            self._set(names, embeddings if len(names) else None)
+            self._loaded_mtime = self.persist_path.stat().st_mtime
+        log.info(f"Loaded filename index with {len(self)} notes from {self.persist_path}")
+
+    def reload_if_changed(self) -> None:
+        """Picks up a refresh saved by another process (e.g. a separate ingestion run)."""
+        if self.persist_path.exists() and self.persist_path.stat().st_mtime != self._loaded_mtime:
+            self.load()
+
+    def refresh(self, current_names: Sequence[str]) -> None:
+        """
+        Brings the index in line with the current note names: embeds only the added names,
+        drops the removed ones and persists the result if anything changed.
+        """
+        current = list(dict.fromkeys(current_names))
+        with self._lock:
+            known = {name: row for row, name in enumerate(self._names)}
+            added = [name for name in current if name not in known]
+            if not added and len(current) == len(self._names):
+                return
+
+            added_embeddings = None
+            if added:
+                added_embeddings = l2_normalize(np.asarray(self._embed([filename_title(name) for name in added]), dtype=np.float32))
+            if self._embeddings is not None and added_embeddings is not None and self._embeddings.shape[1] != added_embeddings.shape[1]:
+                log.warning("Embedding dimension changed, re-embedding all note titles.")
+                known, added = {}, current
+                added_embeddings = l2_normalize(np.asarray(self._embed([filename_title(name) for name in current]), dtype=np.float32))
+
+            kept = [name for name in current if name in known]
+            parts = []
+            if kept and self._embeddings is not None:
+                parts.append(self._embeddings[[known[name] for name in kept]])
+            if added_embeddings is not None:
+                parts.append(added_embeddings)
+            self._set(kept + added, np.vstack(parts) if parts else None)
+            self._save()
+            log.info(f"Filename index refreshed: {len(added)} added, {len(known) - len(kept)} removed, {len(self)} total.")
+
+    def _set(self, names: List[str], embeddings: Optional[np.ndarray]) -> None:
+        postings: Dict[str, List[int]] = {}
+        counts = np.zeros(len(names), dtype=np.float32)
+        for row, name in enumerate(names):
+            grams = trigrams(filename_title(name))
+            counts[row] = max(len(grams), 1)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self._names = names
+        self._embeddings = embeddings
+        self._postings = {gram: np.asarray(rows, dtype=np.int64) for gram, rows in postings.items()}
+        self._trigram_counts = counts
+        self._title_words = [phrase_words(filename_title(name)) for name in names]
+
+    def _save(self) -> None:
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            embeddings = self._embeddings if self._embeddings is not None else np.zeros((0, 0), np.float32)
+            np.savez(f, names=np.asarray(self._names, dtype=str), embeddings=embeddings)
+        os.replace(tmp_path, self.persist_path)
+        self._loaded_mtime = self.persist_path.stat().st_mtime
+
+    def _trigram_scores(self, text: str) -> np.ndarray:
+        """Share of every title's trigrams found in the text, between 0 and 1."""
+        hits = np.zeros(len(self._names), dtype=np.float32)
+        for gram in trigrams(text):
+            rows = self._postings.get(gram)
+            if rows is not None:
+                hits[rows] += 1
+        return hits / self._trigram_counts
+
+    def mentioned_names(self, text: str, min_score: float) -> List[Tuple[str, float]]:
+        """
+        Note names whose title is (almost) spelled out as a phrase in the text, with their phrase score, best first.
+        The cheap whole-text trigram score is (up to trigrams repeated across title words) never below the
+        phrase score, so it narrows the titles that are aligned word by word.
+        """
+        with self._lock:
+            if not self._names:
+                return []
+            words = phrase_words(text)
+            word_grams = [trigrams(word) for word in words]
+            mentioned = []
+            for row in np.flatnonzero(self._trigram_scores(" ".join(words)) >= min_score):
+                name, title = self._names[row], self._title_words[row]
+                if not is_distinctive_title(title) and not references_file(text, name):
+                    continue
+                score = phrase_score(title, word_grams)
+                if score >= min_score:
+                    mentioned.append((name, score))
+            return sorted(mentioned, key=lambda item: item[1], reverse=True)
+
+    def top_matches(self, text: str, n: int, query_embedding: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Returns the n note names that best match the text, best first.
+        `query_embedding` (the embedded text) adds the semantic score; without it only trigrams are used.
+        """
+        with self._lock:
+            if not self._names or n <= 0:
+                return []
+            scores = self._trigram_scores(text)
+            if query_embedding is not None and self._embeddings is not None:
+                scores = 0.5 * scores + 0.5 * (self._embeddings @ l2_normalize(np.asarray(query_embedding, dtype=np.float32)).reshape(-1))
+            top = top_k_indices(scores[:, None], n)[:, 0]
+            return [self._names[row] for row in top]
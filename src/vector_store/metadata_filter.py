@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .base_backend import WhereFilter
+
+_RANGE_OPERATORS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def _value_key(value: Any) -> Tuple[bool, Any]:
+    """Dictionary key that keeps True and 1 apart (they hash the same in Python)."""
+    return (isinstance(value, bool), value)
+
+
+class MetadataColumns:
+    """
+    Columnar view over a list of chunk metadata dicts, used to turn Chroma style `where` filters
+    into boolean masks with vectorized NumPy comparisons instead of per-row Python checks.
+    Columns are built lazily per key and cached until the metadata list changes.
+    """
+
+    def __init__(self, metadatas: List[Dict[str, Any]]):
+        self.metadatas = metadatas
+        self.size = len(metadatas)
+        self._codes: Dict[str, Tuple[np.ndarray, Dict[Tuple[bool, Any], int]]] = {}
+        self._numbers: Dict[str, np.ndarray] = {}
+
+    def _code_column(self, key: str) -> Tuple[np.ndarray, Dict[Tuple[bool, Any], int]]:
+        """Dictionary encodes a column: every distinct value gets an int code, missing values are -1."""
+        if key not in self._codes:
+            vocabulary: Dict[Tuple[bool, Any], int] = {}
+            codes = np.full(self.size, -1, dtype=np.int32)
+            for row, metadata in enumerate(self.metadatas):
+                if key in metadata and metadata[key] is not None:
+                    codes[row] = vocabulary.setdefault(_value_key(metadata[key]), len(vocabulary))
+            self._codes[key] = (codes, vocabulary)
+        return self._codes[key]
+
+    def _number_column(self, key: str) -> np.ndarray:
+        """Float view of a column for range comparisons, NaN where the value is missing or not numeric."""
+        if key not in self._numbers:
+            numbers = np.full(self.size, np.nan, dtype=np.float64)
+            for row, metadata in enumerate(self.metadatas):
+                value = metadata.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numbers[row] = value
+            self._numbers[key] = numbers
+        return self._numbers[key]
+
+    def _isin(self, key: str, values: List[Any]) -> np.ndarray:
+        codes, vocabulary = self._code_column(key)
+        wanted = [vocabulary[_value_key(v)] for v in values if _value_key(v) in vocabulary]
+        if not wanted:
+            return np.zeros(self.size, dtype=bool)
+        return np.isin(codes, np.asarray(wanted, dtype=np.int32))
+
+    def _field_mask(self, key: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = np.ones(self.size, dtype=bool)
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                mask &= self._isin(key, [operand])
+            elif operator == "$in":
+                mask &= self._isin(key, list(operand))
+            elif operator == "$ne":
+                mask &= (self._code_column(key)[0] >= 0) & ~self._isin(key, [operand])
+            elif operator == "$nin":
+                mask &= (self._code_column(key)[0] >= 0) & ~self._isin(key, list(operand))
+            elif operator in _RANGE_OPERATORS:
+                numbers = self._number_column(key)
+                with np.errstate(invalid="ignore"):
+                    mask &= _RANGE_OPERATORS[operator](numbers, float(operand))  # NaN compares False
+            else:
+                raise ValueError(f"Unsupported metadata filter operator: {operator}")
+        return mask
+
+    def evaluate(self, where: WhereFilter) -> np.ndarray:
+        """Returns a boolean mask with True for every row matching the filter."""
+        mask = np.ones(self.size, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self.evaluate(clause)
+            elif key == "$or":
+                any_mask = np.zeros(self.size, dtype=bool)
+                for clause in condition:
+                    any_mask |= self.evaluate(clause)
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+
+def combine_filters(*clauses) -> Optional[WhereFilter]:
+    """AND-combines Chroma style filter clauses, skipping empty ones. Returns None when nothing is left."""
+    present = [clause for clause in clauses if clause]
+    if not present:
+        return None
+    if len(present) == 1:
+        return present[0]
+    return {"$and": present}
@@ -0,0 +1,382 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.utils import setup_logger
+from .base_backend import SearchHit, VectorBackend, WhereFilter
+from .metadata_filter import MetadataColumns
+from .quantization import binary_scores, int8_scores, quantize_binary, quantize_int8
+from .vector_math import l2_normalize, top_k_indices
+
+log = setup_logger(__name__)
+
+VECTORS_FILE = "vectors.f32"       # raw float32 rows, memory mapped for search
+DOCUMENTS_FILE = "documents.jsonl" # one JSON encoded chunk text per line, read lazily by byte offset
+RECORDS_FILE = "records.jsonl"     # append-only log of add / delete operations (ids + metadata)
+MANIFEST_FILE = "manifest.json"
+INT8_CODES_FILE = "codes.i8"       # int8 scalar-quantized rows (resident), used for the first pass
+INT8_SCALES_FILE = "scales.f32"    # per-row dequantization scale for the int8 codes
+BINARY_CODES_FILE = "codes.bin"    # packed sign bits (resident), used for the first pass
+
+
+class NumpyVectorBackend(VectorBackend):
+    """
+    In-process exact cosine search over a contiguous, memory-mapped float32 matrix.
+
+    Rows are only ever appended; deletes are tombstoned in an alive-mask and the files are
+    compacted once enough rows are dead. Metadata filters are evaluated as boolean masks before
+    scoring (pre-filtering), and top-k for a batch of queries is a single matrix product plus argpartition.
+    Meant for small and medium vaults where an exact scan beats HNSW on latency and predictability.
+
+    With `quantization` set to 'int8' or 'binary' only the compact codes are kept in memory; the first
+    pass scans the codes and the best `k * rescore_factor` candidates are rescored against the
+    full-precision rows, which stay on disk behind the memory map.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        persist_directory: str,
+        compact_ratio: float = 0.25,
+        quantization: str = "none",
+        rescore_factor: int = 4,
+    ):
+        if quantization not in ("none", "int8", "binary"):
+            raise ValueError(f"Unsupported quantization mode: {quantization}")
+        self.directory = Path(persist_directory) / "numpy_index" / collection_name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compact_ratio = compact_ratio
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self._lock = threading.RLock()
+
+        self.dim: Optional[int] = None
+        self._ids: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._doc_offsets: List[int] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors: Optional[np.ndarray] = None
+        self._columns: Optional[MetadataColumns] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+        self._load()
+        log.info(f"NumPy backend ready: {self.count()} chunks (dim={self.dim}, quantization={quantization}) at {self.directory}")
+
+    # ---------- persistence ----------
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load(self):
+        manifest_path = self._path(MANIFEST_FILE)
+        if manifest_path.exists():
+            self.dim = json.loads(manifest_path.read_text(encoding="utf-8")).get("dim")
+
+        alive: List[bool] = []
+        records_path = self._path(RECORDS_FILE)
+        if records_path.exists():
+            with open(records_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record["op"] == "add":
+                        self._append_row(record["id"], record["metadata"], record["doc_offset"], alive)
+                    elif record["op"] == "delete":
+                        for chunk_id in record["ids"]:
+                            row = self._row_by_id.pop(chunk_id, None)
+                            if row is not None:
+                                alive[row] = False
+        self._alive = np.asarray(alive, dtype=bool)
+        self._open_vectors()
+        self._load_codes()
+
+    def _append_row(self, chunk_id: str, metadata: Dict[str, Any], doc_offset: int, alive: List[bool]):
+        previous = self._row_by_id.get(chunk_id)
+        if previous is not None:  # re-adding an id behaves like an upsert
+            alive[previous] = False
+        self._row_by_id[chunk_id] = len(self._ids)
+        self._ids.append(chunk_id)
+        self._metadatas.append(metadata)
+        self._doc_offsets.append(doc_offset)
+        alive.append(True)
+
+    def _open_vectors(self):
+        """(Re)opens the read-only memory map over the vector file, sized by the number of logged rows."""
+        self._vectors = None
+        rows = len(self._ids)
+        if rows and self.dim:
+            self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def _load_codes(self):
+        """Loads the quantized codes into memory, (re)building any rows missing from the code files."""
+        if self.quantization == "none" or not self.dim:
+            return
+        rows = len(self._ids)
+        if self.quantization == "int8":
+            codes_path, scales_path = self._path(INT8_CODES_FILE), self._path(INT8_SCALES_FILE)
+            codes = np.fromfile(codes_path, dtype=np.int8).reshape(-1, self.dim) if codes_path.exists() else np.zeros((0, self.dim), np.int8)
+            scales = np.fromfile(scales_path, dtype=np.float32) if scales_path.exists() else np.zeros(0, np.float32)
+            have = min(len(codes), len(scales), rows)
+            self._codes, self._scales = codes[:have], scales[:have]
+        else:
+            codes_path = self._path(BINARY_CODES_FILE)
+            width = (self.dim + 7) // 8
+            codes = np.fromfile(codes_path, dtype=np.uint8).reshape(-1, width) if codes_path.exists() else np.zeros((0, width), np.uint8)
+            have = min(len(codes), rows)
+            self._codes = codes[:have]
+
+        if have < rows and self._vectors is not None:
+            log.info(f"Quantizing {rows - have} rows missing from the {self.quantization} code files.")
+            self._rewrite_codes()
+
+    def _encode(self, matrix: np.ndarray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.quantization == "int8":
+            return quantize_int8(matrix)
+        return quantize_binary(matrix), None
+
+    def _append_codes(self, matrix: np.ndarray, existing_rows: int):
+        """Quantizes newly added rows and appends them to the in-memory codes and the code files."""
+        if self.quantization == "none":
+            return
+        codes, scales = self._encode(matrix)
+        if self.quantization == "int8":
+            self._append_bytes(INT8_CODES_FILE, codes, existing_rows * codes.shape[1])
+            self._append_bytes(INT8_SCALES_FILE, scales, existing_rows * 4) # type: ignore
+            self._scales = scales if self._scales is None else np.concatenate([self._scales, scales]) # type: ignore
+        else:
+            self._append_bytes(BINARY_CODES_FILE, codes, existing_rows * codes.shape[1])
+        self._codes = codes if self._codes is None else np.concatenate([self._codes, codes])
+
+    def _rewrite_codes(self):
+        """Re-quantizes every row from the full-precision file (first use of a mode, or after compaction)."""
+        if self.quantization == "none":
+            return
+        for name in (INT8_CODES_FILE, INT8_SCALES_FILE, BINARY_CODES_FILE):
+            self._path(name).unlink(missing_ok=True)
+        self._codes, self._scales = None, None
+        if self._vectors is None:
+            return
+        block = 65536
+        for start in range(0, len(self._vectors), block):
+            self._append_codes(np.asarray(self._vectors[start:start + block]), start)
+
+    def _append_bytes(self, name: str, array: np.ndarray, expected_size: int):
+        """
+        Appends the array's bytes to a data file, first cutting off any tail left behind by an
+        add that crashed before its records were logged, so rows always stay aligned.
+        """
+        path = self._path(name)
+        with open(path, "ab") as f:
+            if f.tell() > expected_size:
+                f.truncate(expected_size)
+                f.seek(expected_size)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def _write_manifest(self):
+        self._path(MANIFEST_FILE).write_text(json.dumps({"dim": self.dim}), encoding="utf-8")
+
+    # ---------- VectorBackend ----------
+
+    def add(self, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        if not ids:
+            return
+        matrix = l2_normalize(embeddings)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("Embeddings must be a (n, d) matrix aligned with the given ids.")
+
+        with self._lock:
+            existing_rows = len(self._ids)
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                self._write_manifest()
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match the index dimension {self.dim}.")
+
+            self._vectors = None  # release the map before growing the file (required on Windows)
+            self._append_bytes(VECTORS_FILE, matrix, existing_rows * self.dim * 4)
+
+            offsets = []
+            with open(self._path(DOCUMENTS_FILE), "ab") as f:
+                for document in documents:
+                    offsets.append(f.tell())
+                    f.write((json.dumps(document) + "\n").encode("utf-8"))
+
+            # the records log is written last so a crash mid-add never references missing vectors
+            alive = self._alive.tolist()
+            with open(self._path(RECORDS_FILE), "a", encoding="utf-8") as f:
+                for chunk_id, metadata, offset in zip(ids, metadatas, offsets):
+                    f.write(json.dumps({"op": "add", "id": chunk_id, "metadata": metadata, "doc_offset": offset}) + "\n")
+                    self._append_row(chunk_id, metadata, offset, alive)
+
+            self._alive = np.asarray(alive, dtype=bool)
+            self._columns = None
+            self._open_vectors()
+            self._append_codes(matrix, existing_rows)
+
+    def delete(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            known = [chunk_id for chunk_id in ids if chunk_id in self._row_by_id]
+            if not known:
+                return
+            with open(self._path(RECORDS_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "delete", "ids": known}) + "\n")
+            for chunk_id in known:
+                self._alive[self._row_by_id.pop(chunk_id)] = False
+
+            dead = int((~self._alive).sum())
+            if dead > self.compact_ratio * len(self._ids):
+                self._compact()
+
+    def query(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        where: Optional[WhereFilter] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[SearchHit]]:
+        queries = l2_normalize(np.atleast_2d(query_embeddings))
+
+        with self._lock:
+            vectors = self._vectors
+            if vectors is None or k <= 0:
+                return [[] for _ in range(len(queries))]
+            mask = self._alive.copy()
+            if where:
+                mask &= self._metadata_columns().evaluate(where)
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return [[] for _ in range(len(queries))]
+
+            if self.quantization != "none" and self._codes is not None and rows.size > k * self.rescore_factor:
+                ranked = self._quantized_search(vectors, rows, queries, k)
+            else:
+                ranked = self._exact_search(vectors, rows, queries, k)
+
+            batched_hits: List[List[SearchHit]] = []
+            for picked_rows, picked_scores in ranked:
+                documents = self._read_documents(picked_rows)
+                batched_hits.append([
+                    SearchHit(
+                        id=self._ids[row],
+                        document=documents[i],
+                        metadata=dict(self._metadatas[row]),
+                        score=float(picked_scores[i]),
+                        embedding=np.array(vectors[row]) if include_embeddings else None,
+                    )
+                    for i, row in enumerate(picked_rows)
+                ])
+            return batched_hits
+
+    def _exact_search(self, vectors: np.ndarray, rows: np.ndarray, queries: np.ndarray, k: int) -> List[tuple]:
+        """Full-precision scan of the candidate rows. Returns (rows, scores) per query."""
+        candidates = vectors if rows.size == len(self._ids) else vectors[rows]
+        scores = candidates @ queries.T  # (rows, b)
+        top = top_k_indices(scores, k)
+        return [(rows[top[:, q]], scores[top[:, q], q]) for q in range(queries.shape[0])]
+
+    def _quantized_search(self, vectors: np.ndarray, rows: np.ndarray, queries: np.ndarray, k: int) -> List[tuple]:
+        """
+        First pass over the resident quantized codes, then rescoring of the best
+        `k * rescore_factor` candidates per query against the memory-mapped float32 rows.
+        """
+        all_rows = rows.size == len(self._ids)
+        codes = self._codes if all_rows else self._codes[rows] # type: ignore
+        if self.quantization == "int8":
+            scales = self._scales if all_rows else self._scales[rows] # type: ignore
+            first_pass = int8_scores(codes, scales, queries) # type: ignore
+        else:
+            first_pass = binary_scores(codes, queries) # type: ignore
+        shortlist = top_k_indices(first_pass, k * self.rescore_factor)
+
+        ranked = []
+        for q in range(queries.shape[0]):
+            candidate_rows = np.sort(rows[shortlist[:, q]])  # sorted rows keep memmap reads sequential
+            exact = vectors[candidate_rows] @ queries[q]
+            top = top_k_indices(exact[:, None], k)[:, 0]
+            ranked.append((candidate_rows[top], exact[top]))
+        return ranked
+
+    def count(self) -> int:
+        return int(self._alive.sum())
+
+    def ids(self) -> List[str]:
+        """Ids of the stored chunks, in storage order."""
+        with self._lock:
+            return [self._ids[row] for row in np.flatnonzero(self._alive)]
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Full-precision (n, d) embeddings of the given stored chunks, in the order of `ids`."""
+        with self._lock:
+            if self._vectors is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.array(self._vectors[[self._row_by_id[chunk_id] for chunk_id in ids]])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._vectors = None
+            for name in (VECTORS_FILE, DOCUMENTS_FILE, RECORDS_FILE, MANIFEST_FILE, INT8_CODES_FILE, INT8_SCALES_FILE, BINARY_CODES_FILE):
+                self._path(name).unlink(missing_ok=True)
+            self.dim = None
+            self._ids, self._metadatas, self._doc_offsets = [], [], []
+            self._row_by_id = {}
+            self._alive = np.zeros(0, dtype=bool)
+            self._columns, self._codes, self._scales = None, None, None
+            log.info(f"NumPy index at {self.directory} cleared.")
+
+    # ---------- helpers ----------
+
+    def _metadata_columns(self) -> MetadataColumns:
+        if self._columns is None:
+            self._columns = MetadataColumns(self._metadatas)
+        return self._columns
+
+    def _read_documents(self, rows: np.ndarray) -> List[str]:
+        """Reads the chunk texts for the given rows from the documents file by byte offset."""
+        documents = []
+        with open(self._path(DOCUMENTS_FILE), "rb") as f:
+            for row in rows:
+                f.seek(self._doc_offsets[row])
+                documents.append(json.loads(f.readline().decode("utf-8")))
+        return documents
+
+    def _compact(self):
+        """Rewrites all files keeping only alive rows, so tombstoned rows stop costing scan time and disk."""
+        keep = np.flatnonzero(self._alive)
+        log.info(f"Compacting NumPy index: keeping {keep.size} of {len(self._ids)} rows.")
+
+        vectors = np.array(self._vectors[keep]) if self._vectors is not None else np.zeros((0, self.dim or 0), np.float32)
+        documents = self._read_documents(keep)
+        ids = [self._ids[row] for row in keep]
+        metadatas = [self._metadatas[row] for row in keep]
+
+        self._vectors = None
+        tmp = {name: self._path(name + ".tmp") for name in (VECTORS_FILE, DOCUMENTS_FILE, RECORDS_FILE)}
+        with open(tmp[VECTORS_FILE], "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        offsets = []
+        with open(tmp[DOCUMENTS_FILE], "wb") as f:
+            for document in documents:
+                offsets.append(f.tell())
+                f.write((json.dumps(document) + "\n").encode("utf-8"))
+        with open(tmp[RECORDS_FILE], "w", encoding="utf-8") as f:
+            for chunk_id, metadata, offset in zip(ids, metadatas, offsets):
+                f.write(json.dumps({"op": "add", "id": chunk_id, "metadata": metadata, "doc_offset": offset}) + "\n")
+        for name, path in tmp.items():
+            os.replace(path, self._path(name))
+
+        self._ids, self._metadatas, self._doc_offsets = [], [], []
+        self._row_by_id = {}
+        alive: List[bool] = []
+        for chunk_id, metadata, offset in zip(ids, metadatas, offsets):
+            self._append_row(chunk_id, metadata, offset, alive)
+        self._alive = np.asarray(alive, dtype=bool)
+        self._columns = None
+        self._open_vectors()
+        self._rewrite_codes()
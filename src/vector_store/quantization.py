@@ -0,0 +1,57 @@
+import numpy as np
+
+# Rows are scored in blocks so the temporary float32 upcast of int8 codes stays small.
+SCORE_BLOCK_ROWS = 65536
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row scalar quantization of unit vectors.
+    Returns the int8 codes (n, d) and a float32 scale per row so that vector ~= codes * scale.
+    Per-row scales keep the codes valid when rows are appended incrementally.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    max_abs = np.abs(matrix).max(axis=1)
+    max_abs[max_abs == 0] = 1.0
+    scales = (max_abs / 127.0).astype(np.float32)
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Approximate cosine scores (n, b) of int8 coded rows against float32 queries (b, d)."""
+    queries_t = np.asarray(queries, dtype=np.float32).T
+    scores = np.empty((codes.shape[0], queries_t.shape[1]), dtype=np.float32)
+    for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+        end = start + SCORE_BLOCK_ROWS
+        scores[start:end] = (codes[start:end].astype(np.float32) @ queries_t) * scales[start:end, None]
+    return scores
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Sign-bit quantization: one bit per dimension, packed into uint8 (n, ceil(d / 8))."""
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def binary_scores(codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Similarity (n, b) between sign-bit coded rows and queries as the negated hamming distance,
+    computed with XOR + popcount on the packed bytes.
+    """
+    query_codes = quantize_binary(np.atleast_2d(queries))
+    scores = np.empty((codes.shape[0], query_codes.shape[0]), dtype=np.float32)
+    block = max(1, SCORE_BLOCK_ROWS // max(1, query_codes.shape[0]))
+    for start in range(0, codes.shape[0], block):
+        end = start + block
+        xor = codes[start:end, None, :] ^ query_codes[None, :, :]  # (rows, b, bytes)
+        scores[start:end] = -np.bitwise_count(xor).sum(axis=2, dtype=np.int32)
+    return scores
+
+
+def code_bytes_per_vector(dim: int, quantization: str) -> int:
+    """Resident bytes per stored vector for the given quantization mode."""
+    if quantization == "int8":
+        return dim + 4  # codes + float32 scale
+    if quantization == "binary":
+        return (dim + 7) // 8
+    return dim * 4
@@ -0,0 +1,105 @@
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from .base_backend import SearchHit
+from .vector_math import l2_normalize
+
+
+def maximal_marginal_relevance(
+    query_embedding: np.ndarray,
+    candidate_embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[np.ndarray] = None,
+) -> List[int]:
+    """
+    Greedy MMR selection over the candidates, returning the picked candidate indices in pick order.
+
+    The candidate-to-query relevance and the full candidate-to-candidate similarity matrix are computed
+    once with matrix products; each of the k greedy steps is then a vectorized update of the running
+    "max similarity to anything already selected", so there is no per-pair Python loop.
+    `lambda_mult` = 1 is pure relevance, 0 is pure diversity.
+    `relevance` replaces the cosine similarity to the query, e.g. with scores that include a recency decay.
+    """
+    candidates = l2_normalize(candidate_embeddings)
+    if candidates.shape[0] == 0 or k <= 0:
+        return []
+    k = min(k, candidates.shape[0])
+
+    if relevance is None:
+        relevance = candidates @ l2_normalize(query_embedding).reshape(-1)  # (n,)
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = candidates @ candidates.T                             # (n, n)
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity_to_selected = similarity[:, first].copy()
+    available = np.ones(candidates.shape[0], dtype=bool)
+    available[first] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity_to_selected
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity_to_selected, similarity[:, pick], out=max_similarity_to_selected)
+
+    return selected
+
+
+def apply_recency_decay(
+    hits: List[SearchHit],
+    half_life_days: float,
+    weight: float,
+    date_field: str = "note_date",
+    now: Optional[float] = None,
+) -> List[SearchHit]:
+    """
+    Blends an exponential recency decay into the similarity scores and re-sorts the hits:
+    score * ((1 - weight) + weight * 0.5 ** (age_days / half_life_days)).
+    A `weight` of 0 leaves the ranking untouched; hits without a date get no recency boost.
+    """
+    if not hits or half_life_days <= 0 or weight <= 0:
+        return hits
+    now = time.time() if now is None else now
+    dates = np.array([hit.metadata.get(date_field, np.nan) for hit in hits], dtype=np.float64)
+    age_days = np.clip((now - dates) / 86400.0, 0.0, None)
+    decay = np.nan_to_num(np.power(0.5, age_days / half_life_days), nan=0.0)
+    factors = (1.0 - weight) + weight * decay
+    for hit, factor in zip(hits, factors):
+        hit.score = float(hit.score * factor)
+    return sorted(hits, key=lambda hit: hit.score, reverse=True)
+
+
+def fuse_by_max_score(hit_lists: List[List[SearchHit]]) -> List[SearchHit]:
+    """
+    Fuses the hits of several queries into one list, de-duplicated by chunk id.
+    A chunk found by more than one query keeps its best score. Sorted by descending score.
+    """
+    best: Dict[str, SearchHit] = {}
+    for hits in hit_lists:
+        for hit in hits:
+            if hit.id not in best or hit.score > best[hit.id].score:
+                best[hit.id] = hit
+    return sorted(best.values(), key=lambda hit: hit.score, reverse=True)
+
+
+def reciprocal_rank_fusion(hit_lists: List[List[SearchHit]], limit: Optional[int] = None, rank_constant: int = 60) -> List[SearchHit]:
+    """
+    Fuses the ranked hits of several queries by reciprocal rank: a chunk scores sum(1 / (rank_constant + rank))
+    over the lists it appears in (rank starting at 1), so chunks that several queries rank well come first
+    and no single query's score scale dominates. Returns up to `limit` hits in fused order, de-duplicated by
+    chunk id; each keeps its best similarity as `score` and carries its fused score as metadata 'rrf_score'.
+    """
+    fused: Dict[str, float] = {}
+    best: Dict[str, SearchHit] = {}
+    for hits in hit_lists:
+        for rank, hit in enumerate(hits, start=1):
+            fused[hit.id] = fused.get(hit.id, 0.0) + 1.0 / (rank_constant + rank)
+            if hit.id not in best or hit.score > best[hit.id].score:
+                best[hit.id] = hit
+    order = sorted(fused, key=lambda chunk_id: (fused[chunk_id], best[chunk_id].score), reverse=True)[:limit]
+    for chunk_id in order:
+        best[chunk_id].metadata = {**best[chunk_id].metadata, "rrf_score": fused[chunk_id]}
+    return [best[chunk_id] for chunk_id in order]
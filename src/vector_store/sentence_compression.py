@@ -0,0 +1,192 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from src.data_ingestion import SQLiteDB
+from src.embedding import embedding_model_instance
+from src.utils import config, estimate_tokens, setup_logger
+from .vector_math import l2_normalize
+
+log = setup_logger(__name__)
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[*_]?[A-Z0-9])")
+LINE_UNIT_PATTERN = re.compile(r"^\s*(?:#{1,6}\s|[-*+]\s|\d+[.)]\s|>|\|)")  # headings, list items, quotes, table rows
+OMISSION_MARKER = "[…]"
+# half precision is plenty for ranking sentences and halves the blob size
+BLOB_DTYPE = np.float16
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """
+    Splits a chunk into (paragraph number, sentence) units. Paragraphs are separated by blank lines,
+    headings / list items / quotes / table rows are units of their own, and prose is split after . ! ?
+    Deterministic, so sentences split at ingestion and at query time line up with their cached embeddings.
+    """
+    units: List[Tuple[int, str]] = []
+    for paragraph_number, paragraph in enumerate(re.split(r"\n\s*\n", text)):
+        if paragraph.lstrip().startswith("```"):  # code blocks stay whole
+            if paragraph.strip():
+                units.append((paragraph_number, paragraph.strip()))
+            continue
+        prose: List[str] = []
+        for line in paragraph.splitlines():
+            if LINE_UNIT_PATTERN.match(line):
+                units.extend((paragraph_number, sentence) for sentence in _split_prose(" ".join(prose)))
+                prose = []
+                units.append((paragraph_number, line.strip()))
+            else:
+                prose.append(line.strip())
+        units.extend((paragraph_number, sentence) for sentence in _split_prose(" ".join(prose)))
+    return units
+
+
+def _split_prose(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_END_PATTERN.split(text) if sentence.strip()]
+
+
+def embed_sentences(sentences: Sequence[str]) -> np.ndarray:
+    if not sentences:
+        return np.zeros((0, 0), dtype=np.float32)
+    return l2_normalize(np.asarray(embedding_model_instance.embed_documents(list(sentences)), dtype=np.float32))
+
+
+def embed_chunk_sentences(texts: Sequence[str]) -> List[bytes]:
+    """
+    Embeds the sentences of every chunk in one batch and returns one blob per chunk
+    (its sentence embeddings, row per sentence) for the chunk log.
+    """
+    sentences_per_chunk = [[sentence for _, sentence in split_sentences(text)] for text in texts]
+    vectors = embed_sentences([sentence for sentences in sentences_per_chunk for sentence in sentences])
+    blobs, offset = [], 0
+    for sentences in sentences_per_chunk:
+        blobs.append(vectors[offset:offset + len(sentences)].astype(BLOB_DTYPE).tobytes())
+        offset += len(sentences)
+    return blobs
+
+
+def decode_sentence_embeddings(blob: Optional[bytes], sentences: Sequence[str]) -> Optional[np.ndarray]:
+    """The cached (n_sentences, dim) matrix of a chunk, or None when missing or out of step with its text."""
+    if not blob or not sentences:
+        return None
+    vectors = np.frombuffer(blob, dtype=BLOB_DTYPE)
+    if vectors.size % len(sentences):
+        return None
+    return vectors.reshape(len(sentences), -1).astype(np.float32)
+
+
+def cached_sentence_vectors(documents: Sequence[Document]) -> Dict[str, np.ndarray]:
+    """
+    Sentence -> embedding for the chunks behind the documents, read from the chunk log in one query.
+    Chunks logged before compression was enabled are embedded now and their blobs backfilled.
+    """
+    spans = []
+    for doc in documents:
+        metadata = doc.metadata or {}
+        first = last = metadata.get("chunk_index")
+        if chunk_range := metadata.get("chunk_index_range"):
+            first, last = (int(part) for part in str(chunk_range).split("-"))
+        if metadata.get("log_id") is not None and first is not None:
+            spans.append((int(metadata["log_id"]), int(first), int(last)))  # type: ignore[arg-type]
+
+    with SQLiteDB() as db:
+        rows = db.get_chunk_sentence_embeddings(spans)
+
+    lookup: Dict[str, np.ndarray] = {}
+    missing = []
+    for row in rows:
+        sentences = [sentence for _, sentence in split_sentences(row["content"] or "")]
+        vectors = decode_sentence_embeddings(row["sentence_embeddings"], sentences)
+        if vectors is None:
+            missing.append(row)
+            continue
+        lookup.update(zip(sentences, vectors))
+
+    if missing:
+        blobs = embed_chunk_sentences([row["content"] or "" for row in missing])
+        with SQLiteDB() as db:
+            db.update_chunk_sentence_embeddings([(row["chunk_id"], blob) for row, blob in zip(missing, blobs)])
+        for row, blob in zip(missing, blobs):
+            sentences = [sentence for _, sentence in split_sentences(row["content"] or "")]
+            vectors = decode_sentence_embeddings(blob, sentences)
+            if vectors is not None:
+                lookup.update(zip(sentences, vectors))
+        log.info(f"Backfilled sentence embeddings of {len(missing)} chunks.")
+    return lookup
+
+
+def compress_documents(query_text: str, documents: List[Document], max_tokens: Optional[int] = None) -> List[Document]:
+    """
+    Extractive compression: keeps only the sentences of each chunk most similar to the query.
+    Sentences are ranked by cosine similarity (one matrix product per chunk against cached embeddings)
+    and added best first until the chunk's budget of `max_tokens` (default COMPRESSION_CHUNK_MAX_TOKENS)
+    is spent; the kept ones are put back in their original order, with a marker where text was left out.
+    A sentence already kept from an overlapping chunk of the same note is not repeated.
+    Documents are expected best first, as returned by the search.
+    """
+    max_tokens = config.COMPRESSION_CHUNK_MAX_TOKENS if max_tokens is None else max_tokens
+    if not documents:
+        return documents
+    try:
+        lookup = cached_sentence_vectors(documents)
+        split_documents = [split_sentences(doc.page_content) for doc in documents]
+        uncached = list(dict.fromkeys(sentence for units in split_documents for _, sentence in units if sentence not in lookup))
+        if uncached:
+            lookup.update(zip(uncached, embed_sentences(uncached)))
+        query_vector = l2_normalize(np.asarray([embedding_model_instance.embed_query(query_text)], dtype=np.float32))[0]
+    except Exception as e:
+        log.error(f"Context compression skipped: {e}", exc_info=True)
+        return documents
+
+    kept_per_file: Dict[str, set] = {}
+    compressed = []
+    original_tokens = compressed_tokens = 0
+    for doc, units in zip(documents, split_documents):
+        seen = kept_per_file.setdefault(doc.metadata.get("file_name", ""), set())
+        text = doc.page_content if estimate_tokens(doc.page_content) <= max_tokens else _compress_units(units, lookup, query_vector, max_tokens, seen)
+        seen.update(sentence for _, sentence in units if sentence in text)
+        original_tokens += estimate_tokens(doc.page_content)
+        compressed_tokens += estimate_tokens(text)
+        compressed.append(Document(id=doc.id, page_content=text, metadata={**doc.metadata, "compressed": text != doc.page_content}))
+    log.info(f" -- Context compressed from ~{original_tokens} to ~{compressed_tokens} tokens.")
+    return compressed
+
+
+def _compress_units(
+    units: List[Tuple[int, str]],
+    lookup: Dict[str, np.ndarray],
+    query_vector: np.ndarray,
+    max_tokens: int,
+    already_kept: set,
+) -> str:
+    candidates = [index for index, (_, sentence) in enumerate(units) if sentence not in already_kept]
+    if not candidates:
+        return ""
+    scores = np.stack([lookup[units[index][1]] for index in candidates]) @ query_vector
+    chosen, used_tokens = [], 0
+    for position in np.argsort(-scores, kind="stable"):
+        index = candidates[position]
+        cost = estimate_tokens(units[index][1])
+        if chosen and used_tokens + cost > max_tokens:
+            continue
+        chosen.append(index)
+        used_tokens += cost
+
+    parts: List[str] = []
+    previous: Optional[int] = None
+    for index in sorted(chosen):
+        paragraph, sentence = units[index]
+        line_break = "\n" if LINE_UNIT_PATTERN.match(sentence) else " "
+        if previous is None:
+            if index > 0:
+                parts.append(f"{OMISSION_MARKER}{line_break}")
+        elif index != previous + 1:
+            parts.append(f" {OMISSION_MARKER}\n\n")
+        elif paragraph != units[previous][0]:
+            parts.append("\n\n")
+        else:
+            parts.append(line_break)
+        parts.append(sentence)
+        previous = index
+    if previous is not None and previous < len(units) - 1:
+        parts.append(f" {OMISSION_MARKER}")
+    return "".join(parts)
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Returns a float32 copy of the given vector(s) scaled to unit length.
+    Works on a single vector or on a (n, d) matrix (row-wise). Zero vectors are left as zeros.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Batched top-k over the first axis of a (n, b) score matrix using argpartition.
+    Returns a (k, b) array of row indices, sorted by descending score for every column.
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((0, scores.shape[1]), dtype=np.int64)
+
+    if k < n:
+        candidate_idx = np.argpartition(-scores, k - 1, axis=0)[:k]  # unordered top-k per column
+    else:
+        candidate_idx = np.broadcast_to(np.arange(n)[:, None], scores.shape).copy()
+
+    candidate_scores = np.take_along_axis(scores, candidate_idx, axis=0)
+    order = np.argsort(-candidate_scores, axis=0, kind="stable")
+    return np.take_along_axis(candidate_idx, order, axis=0)
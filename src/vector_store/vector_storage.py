@@ -1,38 +1,148 @@
-from src.utils import config, setup_logger
-from langchain_chroma import Chroma
-from src.embedding import embedding_model_instance
+from src.utils import config, setup_logger, to_unix_timestamp
+from src.embedding import embedding_model_instance, ReducedDimensionEmbeddings
 from src.data_ingestion import SQLiteDB
 from langchain_core.documents import Document
 from src.models import VectorSearchOutputSchema
+from src.data_ingestion.note_properties import (
+    MAX_SCOPE_DEPTH, normalize_tag, property_element_key, property_key, property_value_for_filter, split_folder_scope,
+    split_heading_scope,
+)
+from .base_backend import SearchHit, VectorBackend, WhereFilter
+from .centroid_index import NoteCentroidIndex
+from .filename_index import FilenameIndex
+from .metadata_filter import MetadataColumns, combine_filters
+from .sentence_compression import embed_chunk_sentences
+from .ranking import apply_recency_decay, fuse_by_max_score, maximal_marginal_relevance, reciprocal_rank_fusion
+from .vector_math import l2_normalize
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+import importlib.util
+import re
+import json
+import os
+import numpy as np
 
 log = setup_logger(__name__)
 
+MAX_SUB_QUERIES = 3  # sub-queries searched per briefing beyond the main query
+
 class VectorStorage:
     """
-    Base class for vector storage.
+    Selects and initializes the configured vector backend.
     """
 
-    def __init__(self, embedding_model_instance):
+    def __init__(self, backend: str):
         """
-        Initializes the vector storage with the given embedding model instance.
+        Initializes the vector storage with the given backend name ('chroma' or 'numpy').
+        Backends are imported lazily so the unused one never pays its import / startup cost.
         """
-        if embedding_model_instance is None:
-            raise ValueError("Embedding model instance must be provided.")
-        self.vector_store = Chroma(
-            collection_name=config.VECTOR_STORE_COLLECTION, # type: ignore
-            embedding_function=embedding_model_instance,
-            persist_directory="./data", # type: ignore
-        )
-
-    def get_vector_store(self):
+        if backend == "chroma":
+            if not importlib.util.find_spec("chromadb"):
+                raise ImportError("chromadb package is not installed. Please install it first.")
+            from .chroma_backend import ChromaVectorBackend
+            self.vector_store: VectorBackend = ChromaVectorBackend(
+                collection_name=config.VECTOR_STORE_COLLECTION, # type: ignore
+                persist_directory=config.VECTOR_STORE_DIR,
+            )
+            if config.VECTOR_QUANTIZATION != "none":
+                log.warning("VECTOR_QUANTIZATION is only supported by the numpy backend. Ignoring it for chroma.")
+        elif backend == "numpy":
+            from .numpy_backend import NumpyVectorBackend
+            self.vector_store = NumpyVectorBackend(
+                collection_name=config.VECTOR_STORE_COLLECTION, # type: ignore
+                persist_directory=config.VECTOR_STORE_DIR,
+                quantization=config.VECTOR_QUANTIZATION,
+                rescore_factor=config.VECTOR_RESCORE_FACTOR,
+            )
+        else:
+            raise ValueError(f"Unsupported vector backend: {backend}")
+
+    def get_vector_store(self) -> VectorBackend:
         """
         Returns the vector store instance.
         """
-        log.info(f"Using vector store: {config.VECTOR_STORE_COLLECTION}")
+        log.info(f"Using vector store: {config.VECTOR_STORE_COLLECTION} ({config.VECTOR_BACKEND} backend)")
         return self.vector_store
 
 
-vector_store_instance = VectorStorage(embedding_model_instance=embedding_model_instance).get_vector_store()
+vector_store_instance = VectorStorage(backend=config.VECTOR_BACKEND).get_vector_store()
+
+INDEX_SETTINGS_NAME = "vector_index"
+
+
+def current_index_settings() -> dict:
+    """The settings the stored vectors depend on. Changing any of them makes the existing index unusable."""
+    settings = {
+        "backend": config.VECTOR_BACKEND,
+        "collection": config.VECTOR_STORE_COLLECTION,
+        "embedding_model": config.OLLAMA_EMBEDDING_MODEL,
+    }
+    if config.EMBEDDING_REDUCTION != "none":  # left out otherwise, so indexes recorded before reduction existed stay valid
+        settings["embedding_reduction"] = config.EMBEDDING_REDUCTION
+        settings["embedding_reduced_dim"] = config.EMBEDDING_REDUCED_DIM
+    return settings
+
+
+def recorded_index_settings() -> Optional[dict]:
+    with SQLiteDB() as db:
+        settings_json = db.get_index_settings(INDEX_SETTINGS_NAME)
+    return json.loads(settings_json) if settings_json else None
+
+
+def reset_index_if_settings_changed() -> bool:
+    """
+    Runs before every ingestion. When the index settings differ from the ones the index was built with
+    (e.g. a new VECTOR_BACKEND, embedding model or EMBEDDING_REDUCTION), or the index is empty while files are marked ingested,
+    the configured backend is cleared and every file is queued for re-ingestion.
+    Returns whether the index was reset.
+    """
+    current = current_index_settings()
+    recorded = recorded_index_settings()
+    with SQLiteDB() as db:
+        stale = db.count_enabled_completed_files() > 0 and vector_store_instance.count() == 0
+        if recorded == current and not stale:
+            return False
+        if recorded is not None and recorded != current:
+            log.warning(f"Vector index settings changed from {recorded} to {current}. Rebuilding the index.")
+        elif stale:
+            log.warning("Vector index is empty but files are marked as ingested. Rebuilding the index.")
+        else:  # first run with settings tracking, the existing index was built with the current settings
+            db.set_index_settings(INDEX_SETTINGS_NAME, json.dumps(current, sort_keys=True))
+            return False
+        vector_store_instance.reset()
+        if isinstance(embedding_model_instance, ReducedDimensionEmbeddings):
+            embedding_model_instance.reducer.reset()
+        requeued = db.set_index_settings(INDEX_SETTINGS_NAME, json.dumps(current, sort_keys=True), requeue_files=True)
+    log.info(f"Queued {requeued} files for re-ingestion.")
+    return True
+
+
+def warn_if_index_settings_changed():
+    """Logs loudly at startup when the index was built with other settings, since searches would return nothing useful."""
+    try:
+        recorded = recorded_index_settings()
+        if recorded is not None and recorded != current_index_settings():
+            log.error(
+                f"The vector index was built with {recorded}, but the current settings are {current_index_settings()}. "
+                "Run an ingestion to rebuild it; searches use the stale index until then."
+            )
+    except Exception as e:
+        log.error(f"Could not check the vector index settings: {e}")
+
+
+warn_if_index_settings_changed()
+
+note_centroid_index = NoteCentroidIndex(
+    os.path.join(config.VECTOR_STORE_DIR, f"note_centroids_{config.VECTOR_STORE_COLLECTION}.npz")
+)
+_centroids_cover_corpus: Optional[bool] = None  # checked lazily, reset whenever centroids are saved or reloaded
+
+filename_index = FilenameIndex(
+    os.path.join(config.VECTOR_STORE_DIR, f"filename_index_{config.VECTOR_STORE_COLLECTION}.npz"),
+    embed=embedding_model_instance.embed_documents,
+)
+_filename_index_synced = False  # first lookup in a process syncs the index with the log table
 
 
 def upload_documents_to_vector_store(documents: list[Document], file_id: int):
@@ -50,11 +160,17 @@ def upload_documents_to_vector_store(documents: list[Document], file_id: int):
         import uuid
         ids = [str(uuid.uuid4()) for _ in range(len(documents))] 
         # log.info(f"Uploading {len(documents)} chunks to vector store.")
-        vector_store_instance.add_documents(documents=documents, ids=ids)
+        texts = [doc.page_content for doc in documents]
+        embeddings = l2_normalize(np.asarray(embedding_model_instance.embed_documents(texts), dtype=np.float32))
+        vector_store_instance.add(ids=ids, embeddings=embeddings, documents=texts, metadatas=[doc.metadata for doc in documents])
+        note_centroid_index.update(file_id, embeddings)
+        sentence_embeddings = embed_chunk_sentences(texts) if config.CONTEXT_COMPRESSION else None
         with SQLiteDB() as db:
             db.update_chunk_log(
                 file_id=file_id,
                 chunk_id=ids,
+                chunks=documents,
+                sentence_embeddings=sentence_embeddings,
             )
         log.info("Documents uploaded to vector store successfully.")
     except Exception as e:
@@ -85,24 +201,305 @@ def delete_existing_chunks(file_id: int):
         with SQLiteDB() as db:
             chunk_ids = db.fetch_and_delete_chunk_logs(file_id)
         vector_store_instance.delete(ids=chunk_ids)
+        note_centroid_index.remove(file_id)
         log.info(f"Deleted {len(chunk_ids)} chunks for file_id {file_id} from vector store.")
     except Exception as e:
         log.error(f"Failed to delete existing chunks: {str(e)}")
         raise e
     
 
-def similarity_search( query_filter: VectorSearchOutputSchema) -> list[Document]:
-    if not query_filter:
-        raise ValueError("No Query filter received for similarity Search")
-    
+def save_note_centroids():
+    """
+    Persists the note centroids updated during an ingestion run.
+    """
+    global _centroids_cover_corpus
+    note_centroid_index.save()
+    _centroids_cover_corpus = None
+
+
+def refresh_filename_index():
+    """
+    Syncs the filename index with the enabled, ingested notes. Only new note titles are embedded,
+    so this is cheap to run after every ingestion.
+    """
+    global _filename_index_synced
+    with SQLiteDB() as db:
+        filenames = db.get_enabled_completed_filenames()
+    filename_index.refresh(filenames)
+    _filename_index_synced = True
+
+
+def sync_filename_index():
+    """Syncs the index on first use in this process, afterwards only picks up refreshes saved by other processes."""
+    if not _filename_index_synced:
+        refresh_filename_index()
+    else:
+        filename_index.reload_if_changed()
+
+
+def find_mentioned_filenames(text: str, min_score: float) -> List[Tuple[str, float]]:
+    """Note names spelled out as a phrase (typos allowed) in the text, with their phrase score between 0 and 1."""
+    try:
+        sync_filename_index()
+    except Exception as e:
+        log.error(f"Could not sync the filename index: {e}")
+    return filename_index.mentioned_names(text, min_score)
+
+
+def suggest_filenames(
+    text: str,
+    n: Optional[int] = None,
+    query_embedding: Optional[np.ndarray] = None,
+    embedding_text: Optional[str] = None,
+) -> list[str]:
+    """
+    Returns the FILENAME_CANDIDATES note names most likely to be relevant to the text (e.g. a task briefing),
+    or every note name when the vault is no larger than that. Titles are trigram-matched against `text` and
+    compared with the embedding of `embedding_text` (default `text`); `query_embedding` reuses an already embedded one.
+    """
+    n = n or config.FILENAME_CANDIDATES
+    try:
+        sync_filename_index()
+        if len(filename_index) <= n:
+            return filename_index.names
+        if query_embedding is None:
+            query_embedding = np.asarray(embedding_model_instance.embed_query(embedding_text or text))
+    except Exception as e:
+        log.error(f"Filename index lookup degraded to trigram matching: {e}")
+        query_embedding = None
+    return filename_index.top_matches(text, n, query_embedding)
+
+
+def build_metadata_filter(query_filter: VectorSearchOutputSchema) -> Optional[WhereFilter]:
+    """
+    Translates the structured search parameters into a metadata pre-filter for the vector backend.
+    """
     filenames_to_filter = query_filter.filenames_filter
 
-    filter = None
+    filename_clause = None
     if filenames_to_filter and len(filenames_to_filter) > 0:
-        filter = {"file_name": {"$in": filenames_to_filter}}
+        filename_clause = {"file_name": {"$in": filenames_to_filter}}
+
+    # tags are stored as one boolean `tag:<tag>` key per tag; any of the requested tags qualifies
+    tag_clauses = [{f"tag:{normalize_tag(tag)}": True} for tag in (query_filter.tags_filter or []) if normalize_tag(tag)]
+    tag_clause = {"$or": tag_clauses} if len(tag_clauses) > 1 else (tag_clauses[0] if tag_clauses else None)
+
+    # a property matches when it equals the value, or when it is a list holding the value
+    property_clauses = [
+        {"$or": [{property_key(prop.name): property_value_for_filter(prop.value)}, {property_element_key(prop.name, prop.value): True}]}
+        for prop in (query_filter.properties_filter or []) if prop.name.strip()
+    ]
+
+    return combine_filters(
+        filename_clause, tag_clause, *property_clauses, build_scope_clause(query_filter), build_date_clause(query_filter)
+    )
+
+
+def build_scope_clause(query_filter: VectorSearchOutputSchema) -> Optional[WhereFilter]:
+    """
+    Folder and heading scope pre-filters over the per-level `folder_<i>` / `heading_<i>` keys.
+    A folder scope matches the folder and everything below it. A heading breadcrumb ('Design > API')
+    matches from the top heading down; a single heading name matches that section at any depth.
+    """
+    clauses = []
+    folder_parts = split_folder_scope(query_filter.folder_scope or "")[:MAX_SCOPE_DEPTH]
+    clauses.extend({f"folder_{depth}": part} for depth, part in enumerate(folder_parts))
+
+    heading_parts = split_heading_scope(query_filter.heading_scope or "")[:MAX_SCOPE_DEPTH]
+    if len(heading_parts) > 1:
+        clauses.extend({f"heading_{depth}": part} for depth, part in enumerate(heading_parts))
+    elif heading_parts:
+        clauses.append({"$or": [{f"heading_{depth}": heading_parts[0]} for depth in range(MAX_SCOPE_DEPTH)]})
+    return combine_filters(*clauses)
+
+
+def build_date_clause(query_filter: VectorSearchOutputSchema) -> Optional[WhereFilter]:
+    """
+    Date range pre-filter on the note's own date (or its modification time when `date_field` says so).
+    `date_to` is inclusive of the whole day. Unparseable dates are ignored rather than failing the search.
+    """
+    date_field = query_filter.date_field or "note_date"
+    date_from = to_unix_timestamp(query_filter.date_from)
+    date_to = to_unix_timestamp(query_filter.date_to)
+    if query_filter.date_to and date_to is not None and len(query_filter.date_to.strip()) == 10:
+        date_to += 86400 - 1
+
+    clauses = []
+    if date_from is not None:
+        clauses.append({date_field: {"$gte": date_from}})
+    if date_to is not None:
+        clauses.append({date_field: {"$lte": date_to}})
+    return combine_filters(*clauses)
+
+
+def restrict_to_top_notes(query_vectors: np.ndarray, filter: Optional[WhereFilter]) -> List[Optional[WhereFilter]]:
+    """
+    Coarse stage of the two-stage search: narrows an otherwise unfiltered search to the chunks of the
+    top-M notes by centroid similarity. Explicit metadata filters already narrow the search and win.
+    Takes a (b, d) batch of query vectors and returns one filter per query.
+    """
+    global _centroids_cover_corpus
+    top_notes = config.COARSE_TO_FINE_TOP_NOTES
+    unchanged = [filter] * len(query_vectors)
+    if top_notes > 0 and note_centroid_index.reload_if_changed():
+        _centroids_cover_corpus = None
+    if top_notes <= 0 or filter is not None or len(note_centroid_index) <= top_notes:
+        return unchanged
+
+    if _centroids_cover_corpus is None:
+        with SQLiteDB() as db:
+            _centroids_cover_corpus = len(note_centroid_index) >= db.count_enabled_completed_files()
+        if not _centroids_cover_corpus:
+            log.warning("Note centroids do not cover every ingested note yet. Re-ingest to enable coarse-to-fine search.")
+    if not _centroids_cover_corpus:
+        return unchanged
+
+    return [{"log_id": {"$in": log_ids}} for log_ids in note_centroid_index.top_notes(query_vectors, top_notes)]
+
+
+def search_hits(query_vectors: np.ndarray, filter: Optional[WhereFilter], k: int, mode: str) -> List[List[SearchHit]]:
+    """
+    Runs a (b, d) batch of queries sharing one filter against the vector backend in a single call
+    and applies the score threshold. In 'mmr' mode it over-fetches MMR_FETCH_K candidates with their
+    embeddings and keeps the k most relevant yet mutually diverse ones per query, so overlapping
+    chunks of one section don't crowd the context.
+    With RECENCY_HALF_LIFE_DAYS set, candidates are over-fetched the same way and re-ranked with a
+    recency decay on their note date before the final k are picked.
+    """
+    batched_hits = vector_store_instance.query(query_vectors, k=candidate_count(k, mode), where=filter, include_embeddings=(mode == "mmr"))
+    return [rank_hits(query_vector, hits, k, mode) for query_vector, hits in zip(query_vectors, batched_hits)]
+
+
+def recency_enabled() -> bool:
+    return config.RECENCY_HALF_LIFE_DAYS > 0 and config.RECENCY_WEIGHT > 0
+
+
+def candidate_count(k: int, mode: str) -> int:
+    """Number of candidates fetched per query before ranking picks the final k."""
+    return max(config.MMR_FETCH_K, k) if mode == "mmr" or recency_enabled() else k
+
+
+def rank_hits(query_vector: np.ndarray, hits: List[SearchHit], k: int, mode: str) -> List[SearchHit]:
+    """Applies the score threshold, the optional recency decay and MMR to one query's candidates and keeps k."""
+    hits = [hit for hit in hits if hit.score >= config.RETRIEVAL_SCORE_THRESHOLD]
+    if recency_enabled():
+        hits = apply_recency_decay(hits, config.RECENCY_HALF_LIFE_DAYS, config.RECENCY_WEIGHT)
+    if mode == "mmr" and len(hits) > k:
+        candidate_embeddings = np.vstack([hit.embedding for hit in hits]) # type: ignore
+        # the hit scores carry the recency decay, so MMR trades diversity against the decayed relevance
+        scores = np.array([hit.score for hit in hits], dtype=np.float32)
+        picked = maximal_marginal_relevance(query_vector, candidate_embeddings, k, config.MMR_LAMBDA, relevance=scores)
+        hits = [hits[i] for i in picked]
+    return hits[:k]
+
+
+def expand_with_linked_notes(
+    query_vectors: np.ndarray,
+    hits: List[SearchHit],
+    filter: Optional[WhereFilter],
+    extra_k: int,
+) -> List[SearchHit]:
+    """
+    Graph expansion over the wikilink index: takes the notes of the top GRAPH_EXPANSION_SEED_HITS hits,
+    looks up their one-hop neighbours (links and backlinks) in SQLite, and adds the `extra_k` best chunks
+    of those neighbours. The neighbour search is a vector query pre-filtered to the neighbours' log_ids
+    (and the user's own filters), so it only scores a handful of notes. Added hits are tagged
+    `retrieved_via = 'wikilink'` and appended after the direct hits.
+    """
+    if extra_k <= 0 or not hits:
+        return hits
+
+    seed_log_ids = list(dict.fromkeys(hit.metadata.get("log_id") for hit in hits[:config.GRAPH_EXPANSION_SEED_HITS]))
+    seed_log_ids = [log_id for log_id in seed_log_ids if log_id is not None]
+    with SQLiteDB() as db:
+        linked_log_ids = db.get_linked_file_ids(seed_log_ids)
+    hit_log_ids = {hit.metadata.get("log_id") for hit in hits}
+    linked_log_ids = [log_id for log_id in linked_log_ids if log_id not in hit_log_ids]
+    if not linked_log_ids:
+        return hits
+
+    neighbour_filter = combine_filters(filter, {"log_id": {"$in": linked_log_ids}})
+    hit_ids = {hit.id for hit in hits}
+    linked_hits = [
+        hit for hit in fuse_by_max_score(vector_store_instance.query(query_vectors, k=extra_k, where=neighbour_filter))
+        if hit.id not in hit_ids and hit.score >= config.RETRIEVAL_SCORE_THRESHOLD
+    ][:extra_k]
+    for hit in linked_hits:
+        hit.metadata = {**hit.metadata, "retrieved_via": "wikilink"}
+    log.info(f" -- Added {len(linked_hits)} chunks from {len(linked_log_ids)} linked notes.")
+    return hits + linked_hits
+
+
+def expand_with_neighbour_chunks(documents: list[Document], window: int) -> list[Document]:
+    """
+    Widens every hit with the chunks up to `window` positions before and after it in the same note,
+    using the indexed chunk table in SQLite (no extra embedding or vector search).
+    Neighbouring runs that touch are merged into one Document, which keeps the metadata and score
+    of the best hit inside it. Hits without a logged position are returned unchanged.
+    """
+    if window <= 0 or not documents:
+        return documents
+
+    hits_by_id = {doc.id: doc for doc in documents if doc.id}
+    with SQLiteDB() as db:
+        rows = db.get_neighbour_chunks(list(hits_by_id), window)
+
+    rows_by_file: dict = {}
+    for row in rows:
+        rows_by_file.setdefault(row["file_id"], {})[row["ordinal"]] = row
+
+    def merge_run(run: list) -> Optional[Document]:
+        hits = [hits_by_id[row["chunk_id"]] for row in run if row["chunk_id"] in hits_by_id]
+        if not hits:
+            return None
+        best = max(hits, key=lambda doc: doc.metadata.get("relevance_score", 0.0))
+        metadata = dict(best.metadata)
+        metadata["chunk_index_range"] = f"{run[0]['ordinal']}-{run[-1]['ordinal']}"
+        metadata["char_start"], metadata["char_end"] = run[0]["char_start"], run[-1]["char_end"]
+        metadata["chunk_ids"] = [row["chunk_id"] for row in run]
+        covered.update(doc.id for doc in hits)
+        return Document(id=best.id, page_content="\n\n".join(row["content"] or "" for row in run), metadata=metadata)
+
+    covered: set = set()
+    expanded: list[Document] = []
+    for by_ordinal in rows_by_file.values():
+        run: list = []
+        for ordinal in sorted(by_ordinal):
+            if run and ordinal != run[-1]["ordinal"] + 1:
+                expanded.append(merge_run(run)) # type: ignore
+                run = []
+            run.append(by_ordinal[ordinal])
+        if run:
+            expanded.append(merge_run(run)) # type: ignore
+
+    expanded = [doc for doc in expanded if doc is not None]
+    expanded.extend(doc for doc in documents if doc.id not in covered)
+    expanded.sort(key=lambda doc: doc.metadata.get("relevance_score", 0.0), reverse=True)
+    return expanded
+
+
+def similarity_search(
+    query_filter: VectorSearchOutputSchema,
+    k: Optional[int] = None,
+    mode: Optional[str] = None,
+    neighbour_window: Optional[int] = None,
+    graph_expansion_k: Optional[int] = None,
+) -> list[Document]:
+    """
+    Retrieves the chunks most relevant to the refined query, honouring the metadata filters.
+    `k` and `mode` ('similarity' or 'mmr') default to RETRIEVAL_K and RETRIEVAL_MODE.
+    `neighbour_window` (default RETRIEVAL_NEIGHBOUR_WINDOW) expands each hit with its sibling chunks.
+    `graph_expansion_k` (default GRAPH_EXPANSION_K) adds that many chunks from notes linked to the top hits.
+    """
+    if not query_filter:
+        raise ValueError("No Query filter received for similarity Search")
+    
+    filter = build_metadata_filter(query_filter)
 
     try: 
-        response =  vector_store_instance.similarity_search(query=query_filter.refined_query_for_vector_search,k = 3, filter=filter)
+        query_vector = l2_normalize(np.asarray([embedding_model_instance.embed_query(query_filter.refined_query_for_vector_search)]))
+        hits = search_hits(query_vector, restrict_to_top_notes(query_vector, filter)[0], k or config.RETRIEVAL_K, mode or config.RETRIEVAL_MODE)[0]
+        response = expand_hits_to_documents(query_vector, hits, filter, neighbour_window, graph_expansion_k)
         log.info(f" -- Retrieved {len(response)} documents from User's Notes.")
         return response
     except Exception as e:
@@ -110,23 +507,195 @@ def similarity_search( query_filter: VectorSearchOutputSchema) -> list[Document]
         return []
 
 
+def batch_similarity_search(
+    query_filters: List[VectorSearchOutputSchema],
+    k: Optional[int] = None,
+    mode: Optional[str] = None,
+    neighbour_window: Optional[int] = None,
+    graph_expansion_k: Optional[int] = None,
+    fusion: str = "max",
+    fused_k: Optional[int] = None,
+) -> list[Document]:
+    """
+    Searches many queries (paraphrases, sub-questions) at close to the cost of one:
+    all queries are embedded in a single `embed_documents` call, queries that end up with the same
+    filter are sent to the backend as one batched query, and the results are fused and
+    de-duplicated by chunk id. Each query contributes up to `k` chunks.
+    `fusion` 'max' keeps every chunk at its best score; 'rrf' ranks by reciprocal rank fusion and
+    keeps the `fused_k` (default RETRIEVAL_FUSED_K) best, favouring chunks several queries agree on.
+    """
+    if not query_filters:
+        raise ValueError("No Query filters received for batch similarity Search")
+
+    k = k or config.RETRIEVAL_K
+    mode = mode or config.RETRIEVAL_MODE
+    try:
+        texts = [query_filter.refined_query_for_vector_search for query_filter in query_filters]
+        query_vectors = l2_normalize(np.asarray(embedding_model_instance.embed_documents(texts)))
+
+        base_filters = [build_metadata_filter(query_filter) for query_filter in query_filters]
+        filters: List[Optional[WhereFilter]] = []
+        for base_filter, query_vector in zip(base_filters, query_vectors):
+            filters.extend(restrict_to_top_notes(query_vector[None, :], base_filter))
+
+        groups: dict = {}
+        for i, filter in enumerate(filters):
+            groups.setdefault(json.dumps(filter, sort_keys=True), []).append(i)
+
+        hit_lists: List[List[SearchHit]] = [[] for _ in query_filters]
+        for indices in groups.values():
+            for i, hits in zip(indices, search_hits(query_vectors[indices], filters[indices[0]], k, mode)):
+                hit_lists[i] = hits
+
+        if fusion == "rrf":
+            hits = reciprocal_rank_fusion(hit_lists, limit=fused_k or config.RETRIEVAL_FUSED_K)
+        else:
+            hits = fuse_by_max_score(hit_lists)
+        extra_k = config.GRAPH_EXPANSION_K if graph_expansion_k is None else graph_expansion_k
+        if extra_k > 0:
+            # linked notes may satisfy any one of the queries' filters
+            distinct_filters = list({json.dumps(f, sort_keys=True): f for f in base_filters}.values())
+            union_filter = None if None in distinct_filters else (distinct_filters[0] if len(distinct_filters) == 1 else {"$or": distinct_filters})
+            hits = expand_with_linked_notes(query_vectors, hits, union_filter, extra_k)
+
+        response = [hit.to_document() for hit in hits]
+        window = config.RETRIEVAL_NEIGHBOUR_WINDOW if neighbour_window is None else neighbour_window
+        response = expand_with_neighbour_chunks(response, window)
+        log.info(f" -- Retrieved {len(response)} documents from User's Notes for {len(query_filters)} queries.")
+        return response
+    except Exception as e:
+        log.error(f"Error during batch similarity search: {str(e)}")
+        return []
+
+
+def sub_query_searches(query_filter: VectorSearchOutputSchema) -> List[VectorSearchOutputSchema]:
+    """
+    The main query followed by one search per sub-query (at most MAX_SUB_QUERIES). A sub-query uses its own
+    filenames / tags / folder / heading filters where it sets them and the main query's otherwise;
+    properties and the date range always come from the main query.
+    """
+    searches = [query_filter]
+    for sub_query in (query_filter.sub_queries or [])[:MAX_SUB_QUERIES]:
+        overrides = {
+            field: value for field, value in sub_query.model_dump(exclude={"query"}).items() if value is not None
+        }
+        searches.append(query_filter.model_copy(update={
+            "refined_query_for_vector_search": sub_query.query, "sub_queries": None, **overrides,
+        }))
+    return searches
+
+
+def expand_hits_to_documents(
+    query_vector: np.ndarray,
+    hits: List[SearchHit],
+    filter: Optional[WhereFilter],
+    neighbour_window: Optional[int] = None,
+    graph_expansion_k: Optional[int] = None,
+) -> list[Document]:
+    """Adds chunks of linked notes, converts the hits to Documents and widens them with their sibling chunks."""
+    extra_k = config.GRAPH_EXPANSION_K if graph_expansion_k is None else graph_expansion_k
+    hits = expand_with_linked_notes(query_vector, hits, filter, extra_k)
+    response = [hit.to_document() for hit in hits]
+    window = config.RETRIEVAL_NEIGHBOUR_WINDOW if neighbour_window is None else neighbour_window
+    return expand_with_neighbour_chunks(response, window)
+
+
+@dataclass
+class SpeculativeSearch:
+    """Unfiltered search for a provisional query, started while the filter agent is still running."""
+    query_text: str
+    query_vector: np.ndarray  # (1, d), also reused by the filter agent's filename suggestions
+    future: "Future[List[SearchHit]]"  # the candidates
+
+
+_speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-search")
+
+
+def start_speculative_search(query_text: str) -> SpeculativeSearch:
+    """
+    Embeds a provisional query (e.g. the briefing's search text) and fetches SPECULATIVE_FETCH_K unfiltered
+    candidates in a background thread, so the search overlaps with the filter agent's LLM call.
+    The query is embedded up front, since the filter agent's prompt needs the same vector to suggest filenames.
+    """
+    query_vector = l2_normalize(np.asarray([embedding_model_instance.embed_query(query_text)]))
+
+    def run() -> List[SearchHit]:
+        return vector_store_instance.query(query_vector, k=config.SPECULATIVE_FETCH_K, include_embeddings=True)[0]
+
+    return SpeculativeSearch(query_text=query_text, query_vector=query_vector, future=_speculation_executor.submit(run))
+
+
+def query_overlap(first: str, second: str) -> float:
+    """Jaccard overlap of the lowercase word sets of two queries."""
+    first_words, second_words = set(re.findall(r"\w+", first.lower())), set(re.findall(r"\w+", second.lower()))
+    if not first_words or not second_words:
+        return 0.0
+    return len(first_words & second_words) / len(first_words | second_words)
+
+
+def similarity_search_from_speculation(
+    speculation: SpeculativeSearch,
+    query_filter: VectorSearchOutputSchema,
+    k: Optional[int] = None,
+    mode: Optional[str] = None,
+    neighbour_window: Optional[int] = None,
+    graph_expansion_k: Optional[int] = None,
+) -> Optional[list[Document]]:
+    """
+    Answers `query_filter` from the speculative candidates when that is safe, else returns None so the
+    caller runs a regular `similarity_search` (the speculation is cancelled, or ignored if already running).
+
+    Reused when the refined query overlaps the provisional one by at least SPECULATIVE_MIN_QUERY_OVERLAP,
+    so the two queries have largely the same nearest chunks. The refined query is embedded and the candidates
+    are rescored against it, which saves the backend search but not the query embedding. The metadata filter
+    is then applied to the candidates. If too few of them survive to fill the ranking (and the candidates
+    don't already cover the whole collection), None is returned.
+    """
+    k = k or config.RETRIEVAL_K
+    mode = mode or config.RETRIEVAL_MODE
+    refined_query = query_filter.refined_query_for_vector_search
+    overlap = query_overlap(refined_query, speculation.query_text)
+    if overlap < config.SPECULATIVE_MIN_QUERY_OVERLAP:
+        speculation.future.cancel()
+        log.info(f" -- Speculative search discarded, refined query overlap {overlap:.2f}.")
+        return None
+
+    try:
+        query_vector, candidates = speculation.query_vector, speculation.future.result()
+        if refined_query != speculation.query_text:
+            query_vector = l2_normalize(np.asarray([embedding_model_instance.embed_query(refined_query)]))
+        filter = build_metadata_filter(query_filter)
+        hits = candidates
+        if filter:
+            mask = MetadataColumns([hit.metadata for hit in hits]).evaluate(filter)
+            hits = [hit for hit, keep in zip(hits, mask) if keep]
+        if len(hits) < candidate_count(k, mode) and len(candidates) >= config.SPECULATIVE_FETCH_K:
+            log.info(" -- Speculative candidates too few after filtering, running a regular search.")
+            return None
+
+        # copies, since ranking rewrites the scores and the candidates came from another thread
+        hits = [replace(hit, score=float(l2_normalize(hit.embedding) @ query_vector[0])) for hit in hits] # type: ignore
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        hits = rank_hits(query_vector[0], hits, k, mode)
+        response = expand_hits_to_documents(query_vector, hits, filter, neighbour_window, graph_expansion_k)
+        log.info(f" -- Retrieved {len(response)} documents from speculative candidates (query overlap {overlap:.2f}).")
+        return response
+    except Exception as e:
+        log.error(f"Error reusing speculative search: {str(e)}")
+        return None
+
+
 #test Run the test function to verify the vector store
-def test_vector_store(vector_store_instance):
+def test_vector_store(vector_store_instance: VectorBackend):
     """
     Test function to verify the vector store.
     """
-    from langchain_core.documents import Document
     from uuid import uuid4
     try:
         log.info("Testing vector store...")
-        document_1 = Document(
-        page_content="I had chocolate chip pancakes and scrambled eggs for breakfast this morning.",
-        metadata={"source": "tweet"},
-        id=1,)
-
-        documents = [document_1]
-        uuids = [str(uuid4()) for _ in range(len(documents))]
-        vector_store_instance.add_documents(documents=documents, ids=uuids)
+        text = "I had chocolate chip pancakes and scrambled eggs for breakfast this morning."
+        embeddings = l2_normalize(np.asarray([embedding_model_instance.embed_query(text)]))
+        vector_store_instance.add(ids=[str(uuid4())], embeddings=embeddings, documents=[text], metadatas=[{"source": "tweet"}])
 
     except Exception as e:
         log.error(f"Error testing vector store: {str(e)}")
@@ -1,6 +1,7 @@
 import streamlit as st
 import uuid
 from src import bot, run_ingestion
+from src.utils import config
 
 st.set_page_config(
     page_title="ObsiQuery",
@@ -63,6 +64,11 @@ with st.sidebar:
     🛠️ Project by [@shridhar600](https://www.linkedin.com/in/shridhar600)
     """)
 
+    fast_mode = st.toggle(
+        "⚡ Fast mode", value=config.GRAPH_MODE == "fast",
+        help="Answer in a single LLM call, straight from the notes matching your message. Quicker, but no multi-step research.",
+    )
+
 # --- Main Header ---
 st.title("🧠 ObsiQuery")
 st.markdown("Your personal AI over your Obsidian vault. Ask anything.")
@@ -136,18 +142,37 @@ if user_input := st.chat_input("Ask your second brain..."):
         st.markdown(user_input)
 
     with st.chat_message("assistant"):
-        with st.spinner("🧠 Thinking..."):
-            response = bot.invoke_graph(user_input, st.session_state.thread_id)
-            reply = response.get("reply", "Sorry, I couldn't generate a response.")
-            st.markdown(reply)
-
-            if response.get("artifact"):
-                with st.expander("📁 Retrieved Sources"):
-                    for source in response["artifact"]:
-                        st.info(f"📄 {source}", icon="📄")
-
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": reply,
-                "artifact": response.get("artifact", None)
-            })
+        # progress and the synthesizer's draft go into a collapsible status box, the answer streams below it
+        status = st.status("🧠 Thinking...", expanded=False)
+        draft_placeholder = status.empty()
+        answer_placeholder = st.empty()
+        draft, answer, response = "", "", {}
+
+        for event in bot.stream_graph(user_input, st.session_state.thread_id, "fast" if fast_mode else "agent"):
+            if event["type"] == "progress":
+                status.update(label=f"🔎 {event['message']}...")
+                answer = "" # text streamed before a tool call was the agent thinking out loud
+                answer_placeholder.empty()
+            elif event["type"] == "token" and event["source"] == "synthesizer":
+                draft += event["content"]
+                draft_placeholder.markdown(draft)
+            elif event["type"] == "token":
+                answer += event["content"]
+                answer_placeholder.markdown(answer + "▌")
+            else:
+                response = event
+
+        reply = response.get("reply") or response.get("error") or "Sorry, I couldn't generate a response."
+        status.update(label="✅ Done" if "reply" in response else "❌ Failed", state="complete" if "reply" in response else "error")
+        answer_placeholder.markdown(reply)
+
+        if response.get("artifact"):
+            with st.expander("📁 Retrieved Sources"):
+                for source in response["artifact"]:
+                    st.info(f"📄 {source}", icon="📄")
+
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": reply,
+            "artifact": response.get("artifact", None)
+        })
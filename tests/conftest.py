@@ -0,0 +1,104 @@
+import os
+import re
+import tempfile
+import zlib
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+# Config is read from the environment when `src.utils` is first imported, so every store the tests
+# touch is pointed at a throwaway directory before any test module imports the package.
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="obsiquery-tests-")
+os.environ.update({
+    "LLM_PROVIDER": "ollama",
+    "OLLAMA_MODEL_NAME": "qwen3:1.7b",
+    "OLLAMA_EMBEDDING_MODEL": "nomic-embed-text:v1.5",
+    "EMBEDDING_REDUCTION": "none",
+    "VECTOR_BACKEND": "numpy",
+    "VECTOR_QUANTIZATION": "none",
+    "VECTOR_STORE_COLLECTION": "obsiquery-test",
+    "VECTOR_STORE_DIR": TEST_DATA_DIR,
+    "SQLITE_DB_FILE": os.path.join(TEST_DATA_DIR, "obsiquery-test.db"),
+    "CHECKPOINT_DB_FILE": os.path.join(TEST_DATA_DIR, "checkpoints-test.db"),
+    "OBSIDIAN_VAULT_PATH": os.path.join(TEST_DATA_DIR, "vault"),
+    "LANGSMITH_TRACING": "false",
+})
+os.makedirs(os.environ["OBSIDIAN_VAULT_PATH"], exist_ok=True)
+
+
+@pytest.fixture
+def sqlite_db():
+    """The test SQLite database, emptied before each test that uses it."""
+    from src.data_ingestion import SQLiteDB
+    with SQLiteDB() as db:
+        for table in ("obq_answer_cache_chunk", "obq_answer_cache", "obq_chunk_log", "obq_note_link", "obq_index_settings", "obq_log"):
+            db.cursor.execute(f"DELETE FROM {table}")
+        db.connection.commit()
+    yield SQLiteDB
+
+
+def insert_file(db, file_name: str, status: str = "completed") -> int:
+    """Adds a file log row and returns its id."""
+    db.cursor.execute(
+        "INSERT INTO obq_log (file_name, file_path, last_modified, status) VALUES (?, ?, 0, ?)",
+        (file_name, f"/vault/{file_name}", status),
+    )
+    db.connection.commit()
+    return db.cursor.lastrowid
+
+
+def random_vectors(n, dim=16, seed=0):
+    """n random unit vectors."""
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def add_rows(backend, vectors, start=0):
+    """Adds chunks c<start>.. spread over three notes and returns their ids."""
+    ids = [f"c{start + i}" for i in range(len(vectors))]
+    metadatas = [{"file_name": f"note{(start + i) % 3}.md", "chunk_index": start + i} for i in range(len(vectors))]
+    backend.add(ids, vectors, [f"text {start + i}" for i in range(len(vectors))], metadatas)
+    return ids
+
+
+class WordEmbeddings(Embeddings):
+    """Deterministic bag-of-words vectors standing in for the embedding model: texts sharing words are similar."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dim] += 1.0
+        vector[-1] += 0.01  # keeps wordless texts from being a zero vector
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+NOTE_CHUNKS = {
+    "kafka.md": ["kafka consumer lag grows during the nightly batch", "kafka topic retention is seven days"],
+    "postgres.md": ["postgres vacuum runs every night", "postgres replication lag alerts"],
+    "garden.md": ["tomatoes need water every morning", "the garden fence needs paint"],
+}
+
+
+@pytest.fixture
+def search_index(tmp_path, monkeypatch):
+    """
+    A NumPy backend holding NOTE_CHUNKS, embedded with WordEmbeddings, installed as the store
+    the search functions in `vector_storage` use. Yields the backend.
+    """
+    from src.vector_store import vector_storage
+    from src.vector_store.numpy_backend import NumpyVectorBackend
+    embeddings = WordEmbeddings()
+    backend = NumpyVectorBackend(collection_name="search", persist_directory=str(tmp_path))
+    for log_id, (file_name, texts) in enumerate(NOTE_CHUNKS.items(), start=1):
+        ids = [f"{file_name}:{i}" for i in range(len(texts))]
+        metadatas = [{"file_name": file_name, "log_id": log_id, "chunk_index": i} for i in range(len(texts))]
+        backend.add(ids, np.asarray(embeddings.embed_documents(texts)), texts, metadatas)
+    monkeypatch.setattr(vector_storage, "vector_store_instance", backend)
+    monkeypatch.setattr(vector_storage, "embedding_model_instance", embeddings)
+    yield backend
@@ -0,0 +1,68 @@
+import pytest
+from langchain_core.documents import Document
+from conftest import WordEmbeddings, insert_file
+from src.utils import config
+from src.nodes import answer_cache
+from src.nodes.answer_cache import lookup_answer, normalize_briefing, store_answer
+
+BRIEFING = "**User Intent:** Find the kafka consumer lag notes\n- **Information Required:** causes of the lag"
+
+
+@pytest.fixture
+def cache(sqlite_db, monkeypatch):
+    """An empty answer cache over two logged notes; yields their file ids."""
+    monkeypatch.setattr(answer_cache, "embedding_model_instance", WordEmbeddings())
+    with sqlite_db() as db:
+        kafka, garden = insert_file(db, "kafka.md"), insert_file(db, "garden.md")
+        db.update_chunk_log(kafka, ["kafka:0", "kafka:1"])
+        db.update_chunk_log(garden, ["garden:0"])
+    return sqlite_db, kafka, garden
+
+
+def answer(briefing, text="Lag grows during the nightly batch.", chunk_ids=("kafka:0", "kafka:1")):
+    lookup = lookup_answer(briefing)
+    store_answer(lookup, text, {"sources": ["kafka.md"]}, [Document(id=chunk_id, page_content="") for chunk_id in chunk_ids])
+    return lookup
+
+
+def test_normalized_briefing_ignores_markdown_layout():
+    assert normalize_briefing(BRIEFING) == normalize_briefing("User Intent: find the Kafka consumer lag notes. Information Required: causes of the lag")
+
+
+def test_stored_answers_are_found_by_key_and_by_similar_briefing(cache):
+    assert not answer(BRIEFING).hit
+
+    exact = lookup_answer(BRIEFING)
+    similar = lookup_answer(BRIEFING + " please")
+
+    assert exact.hit and exact.answer == "Lag grows during the nightly batch."
+    assert exact.artifact == {"sources": ["kafka.md"]}
+    assert similar.hit
+    assert not lookup_answer("What should I plant in the garden?").hit
+
+
+def test_reingesting_a_source_note_invalidates_its_answers(cache):
+    db_class, kafka, garden = cache
+    answer(BRIEFING)
+    answer("What grows in the garden?", "Tomatoes.", ["garden:0"])
+
+    with db_class() as db:
+        db.fetch_and_delete_chunk_logs(kafka)
+
+    assert not lookup_answer(BRIEFING).hit
+    assert lookup_answer("What grows in the garden?").hit
+
+
+def test_answers_with_unknown_or_deleted_sources_are_not_stored(cache):
+    answer(BRIEFING, chunk_ids=["kafka:0", "kafka:9"])
+    assert not lookup_answer(BRIEFING).hit
+
+    store_answer(lookup_answer(BRIEFING), "No ids.", None, [Document(page_content="unidentified")])
+    assert not lookup_answer(BRIEFING).hit
+
+
+def test_expired_answers_are_ignored(cache, monkeypatch):
+    answer(BRIEFING)
+    monkeypatch.setattr(config, "ANSWER_CACHE_TTL_HOURS", -1)
+
+    assert not lookup_answer(BRIEFING).hit
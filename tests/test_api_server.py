@@ -0,0 +1,108 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+import api_server
+
+
+class FakeBot:
+    """Stands in for ObsiQueryBot: streams a progress event, the reply tokens and a final event per message."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.running: dict = {}
+        self.peak_per_thread: dict = {}
+        self.peak_total = 0
+        self.order: list = []
+
+    async def astream(self, message, thread_id, mode=None):
+        self.running[thread_id] = self.running.get(thread_id, 0) + 1
+        self.peak_per_thread[thread_id] = max(self.peak_per_thread.get(thread_id, 0), self.running[thread_id])
+        self.peak_total = max(self.peak_total, sum(self.running.values()))
+        self.order.append(message)
+        try:
+            yield {"type": "progress", "stage": "searching_notes", "message": "Searching your notes"}
+            await asyncio.sleep(self.delay)
+            if message == "fail":
+                yield {"type": "error", "error": "model is down"}
+                return
+            for token in (f"{mode or 'agent'} ", "reply"):
+                yield {"type": "token", "content": token}
+            yield {"type": "final", "reply": f"{mode or 'agent'} reply to {message}", "artifact": ["kafka.md"]}
+        finally:
+            self.running[thread_id] -= 1
+
+
+@pytest.fixture
+def fake_bot(monkeypatch):
+    bot = FakeBot()
+    monkeypatch.setattr(api_server, "bot", bot)
+    monkeypatch.setattr(api_server, "_run_slots", asyncio.Semaphore(4))
+    return bot
+
+
+def test_query_returns_the_final_reply(fake_bot):
+    response = TestClient(api_server.app).post("/query", json={"message": "kafka lag?", "thread_id": "t1", "mode": "fast"})
+
+    assert response.status_code == 200
+    assert response.json() == {"thread_id": "t1", "reply": "fast reply to kafka lag?", "artifact": ["kafka.md"]}
+
+
+def test_query_starts_a_thread_and_reports_errors(fake_bot):
+    client = TestClient(api_server.app)
+
+    assert client.post("/query", json={"message": "hi"}).json()["thread_id"]
+    failed = client.post("/query", json={"message": "fail", "thread_id": "t1"})
+    assert failed.status_code == 500
+    assert failed.json()["detail"] == "model is down"
+    assert client.post("/query", json={"message": ""}).status_code == 422
+
+
+def test_query_stream_sends_the_thread_then_every_event(fake_bot):
+    with TestClient(api_server.app).stream("POST", "/query/stream", json={"message": "kafka lag?", "thread_id": "t1"}) as response:
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [event["type"] for event in events] == ["thread", "progress", "token", "token", "final"]
+    assert events[0]["thread_id"] == "t1"
+    assert events[-1]["reply"] == "agent reply to kafka lag?"
+
+
+def test_health_reports_the_filter_paths(fake_bot):
+    body = TestClient(api_server.app).get("/health").json()
+
+    assert body["status"] == "ok"
+    assert isinstance(body["search_filter_paths"], dict)
+
+
+def post_concurrently(*requests):
+    async def run():
+        transport = httpx.ASGITransport(app=api_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post(path, json=body) for path, body in requests))
+    return asyncio.run(run())
+
+
+def test_requests_on_one_thread_are_serialized(fake_bot):
+    fake_bot.delay = 0.05
+
+    responses = post_concurrently(
+        ("/query", {"message": "first", "thread_id": "t1"}),
+        ("/query/stream", {"message": "second", "thread_id": "t1"}),
+        ("/query", {"message": "elsewhere", "thread_id": "t2"}),
+    )
+
+    assert all(response.status_code == 200 for response in responses)
+    assert fake_bot.peak_per_thread == {"t1": 1, "t2": 1}
+    assert fake_bot.peak_total == 2
+
+
+def test_run_slots_bound_runs_across_threads(fake_bot, monkeypatch):
+    fake_bot.delay = 0.02
+    monkeypatch.setattr(api_server, "_run_slots", asyncio.Semaphore(1))
+
+    post_concurrently(*(("/query", {"message": f"question {i}", "thread_id": f"t{i}"}) for i in range(3)))
+
+    assert fake_bot.peak_total == 1
+    assert sorted(fake_bot.order) == ["question 0", "question 1", "question 2"]
@@ -0,0 +1,71 @@
+from src.vector_store import vector_storage
+from src.models import VectorSearchOutputSchema
+from src.vector_store.base_backend import SearchHit
+from src.vector_store.ranking import fuse_by_max_score, reciprocal_rank_fusion
+
+
+def hit(chunk_id, score):
+    return SearchHit(id=chunk_id, document=chunk_id, metadata={}, score=score)
+
+
+def search(query, **filters):
+    return VectorSearchOutputSchema(refined_query_for_vector_search=query, filter_rationale="test", **filters)
+
+
+def test_fuse_by_max_score_keeps_the_best_score_per_chunk():
+    fused = fuse_by_max_score([[hit("a", 0.9), hit("b", 0.5)], [hit("b", 0.7), hit("c", 0.6)]])
+
+    assert [(h.id, h.score) for h in fused] == [("a", 0.9), ("b", 0.7), ("c", 0.6)]
+
+
+def test_rrf_ranks_chunks_several_queries_agree_on_first():
+    fused = reciprocal_rank_fusion(
+        [[hit("a", 0.95), hit("b", 0.5), hit("c", 0.4)], [hit("b", 0.6), hit("d", 0.55)], [hit("c", 0.3), hit("b", 0.2)]],
+        limit=3, rank_constant=60,
+    )
+
+    assert [h.id for h in fused] == ["b", "c", "a"]
+    assert fused[0].score == 0.6
+    assert fused[0].metadata["rrf_score"] == 1 / 62 + 1 / 61 + 1 / 62
+    assert fused[2].metadata["rrf_score"] == 1 / 61
+
+
+def test_rrf_breaks_ties_by_similarity_and_respects_the_limit():
+    fused = reciprocal_rank_fusion([[hit("a", 0.5)], [hit("b", 0.8)], [hit("c", 0.7)]], limit=2)
+
+    assert [h.id for h in fused] == ["b", "c"]
+
+
+def test_batch_search_embeds_all_queries_in_one_call(search_index, monkeypatch):
+    calls = []
+    embed_documents = vector_storage.embedding_model_instance.embed_documents
+    monkeypatch.setattr(vector_storage.embedding_model_instance, "embed_documents", lambda texts: calls.append(texts) or embed_documents(texts))
+
+    documents = vector_storage.batch_similarity_search(
+        [search("kafka consumer lag"), search("postgres vacuum")], k=1, neighbour_window=0, graph_expansion_k=0
+    )
+
+    assert calls == [["kafka consumer lag", "postgres vacuum"]]
+    assert [doc.page_content for doc in documents] == ["postgres vacuum runs every night", "kafka consumer lag grows during the nightly batch"]
+
+
+def test_batch_search_deduplicates_and_applies_each_filter(search_index):
+    documents = vector_storage.batch_similarity_search(
+        [search("lag"), search("lag", filenames_filter=["postgres.md"]), search("lag", filenames_filter=["postgres.md"])],
+        k=2, neighbour_window=0, graph_expansion_k=0,
+    )
+
+    ids = [doc.id for doc in documents]
+    assert sorted(ids) == ["kafka.md:0", "postgres.md:0", "postgres.md:1"]
+    assert len(ids) == len(set(ids))
+
+
+def test_batch_search_with_rrf_keeps_the_fused_k_best(search_index):
+    documents = vector_storage.batch_similarity_search(
+        [search("postgres vacuum"), search("postgres vacuum night"), search("kafka consumer lag")],
+        k=2, neighbour_window=0, graph_expansion_k=0, fusion="rrf", fused_k=2,
+    )
+
+    assert len(documents) == 2
+    assert documents[0].metadata["file_name"] == "postgres.md"
+    assert documents[0].metadata["rrf_score"] > documents[1].metadata["rrf_score"]
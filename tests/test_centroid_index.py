@@ -0,0 +1,79 @@
+from conftest import insert_file, random_vectors
+from src.utils import config
+from src.vector_store import vector_storage
+from src.vector_store.centroid_index import NoteCentroidIndex
+
+
+def save_centroids(path, log_ids):
+    """Writes centroids for `log_ids` the way a separate ingestion process would."""
+    index = NoteCentroidIndex(str(path))
+    for log_id in log_ids:
+        index.update(log_id, random_vectors(2, seed=log_id))
+    index.save()
+    return index
+
+
+def test_reload_picks_up_centroids_saved_elsewhere(tmp_path):
+    path = tmp_path / "centroids.npz"
+    save_centroids(path, [1, 2])
+    reader = NoteCentroidIndex(str(path))
+
+    assert reader.reload_if_changed() is False
+    save_centroids(path, [1, 2, 3])
+    assert reader.reload_if_changed() is True
+    assert len(reader) == 3
+    assert reader.top_notes(random_vectors(1, seed=3), 1) == [[3]]
+
+
+def test_unsaved_updates_are_not_overwritten_by_a_reload(tmp_path):
+    path = tmp_path / "centroids.npz"
+    save_centroids(path, [1])
+    writer = NoteCentroidIndex(str(path))
+    writer.update(2, random_vectors(2, seed=2))
+
+    save_centroids(path, [1, 3, 4])
+    assert writer.reload_if_changed() is False
+    assert len(writer) == 2
+
+
+def test_coarse_stage_rechecks_coverage_after_a_reload(tmp_path, sqlite_db, monkeypatch):
+    path = tmp_path / "centroids.npz"
+    save_centroids(path, [1, 2])
+    monkeypatch.setattr(vector_storage, "note_centroid_index", NoteCentroidIndex(str(path)))
+    monkeypatch.setattr(vector_storage, "_centroids_cover_corpus", None)
+    monkeypatch.setattr(config, "COARSE_TO_FINE_TOP_NOTES", 1)
+    with sqlite_db() as db:
+        for name in ("a.md", "b.md", "c.md"):
+            insert_file(db, name)
+    query = random_vectors(1, seed=3)
+
+    assert vector_storage.restrict_to_top_notes(query, None) == [None]
+    save_centroids(path, [1, 2, 3])
+    assert vector_storage.restrict_to_top_notes(query, None) == [{"log_id": {"$in": [3]}}]
+
+
+def test_updates_and_removals_keep_rows_and_log_ids_aligned(tmp_path):
+    index = NoteCentroidIndex(str(tmp_path / "centroids.npz"))
+    for log_id in range(1, 41):
+        index.update(log_id, random_vectors(2, seed=log_id))
+    for log_id in (1, 17, 40, 5):
+        index.remove(log_id)
+    index.update(17, random_vectors(2, seed=17))
+    index.update(8, random_vectors(2, seed=100))
+
+    assert len(index) == 37
+    for log_id in (2, 17, 39):
+        assert index.top_notes(random_vectors(1, seed=log_id), 1) == [[log_id]]
+    assert index.top_notes(random_vectors(1, seed=100), 1) == [[8]]
+    assert index.top_notes(random_vectors(1, seed=1), 40)[0].count(1) == 0
+
+
+def test_save_writes_only_the_rows_in_use(tmp_path):
+    path = tmp_path / "centroids.npz"
+    index = save_centroids(path, range(1, 20))
+    index.remove(3)
+    index.save()
+
+    reloaded = NoteCentroidIndex(str(path))
+    assert len(reloaded) == 18
+    assert sorted(reloaded.top_notes(random_vectors(1, seed=4), 18)[0]) == [i for i in range(1, 20) if i != 3]
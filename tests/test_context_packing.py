@@ -0,0 +1,64 @@
+from langchain_core.documents import Document
+from src.utils.context_packing import CONTEXT_SEPARATOR, join_without_overlap, merge_segments, pack_context
+from src.utils.message_history import estimate_tokens
+
+BLOCKS = [f"Block {i} of the kafka note." for i in range(5)]
+
+
+def chunk(first, last, score, file_name="kafka.md", heading="Consumers"):
+    """A chunk holding BLOCKS[first:last + 1], positioned like the chunker records it."""
+    text = "\n\n".join(BLOCKS[first:last + 1])
+    start = sum(len(block) + 2 for block in BLOCKS[:first])
+    return Document(page_content=text, metadata={
+        "file_name": file_name, "heading_path": heading, "relevance_score": score,
+        "char_start": start, "char_end": start + len(text), "chunk_index": first,
+    })
+
+
+def test_overlapping_chunks_are_merged_without_repeating_text():
+    segments = merge_segments([chunk(0, 2, 0.5), chunk(2, 3, 0.9), chunk(1, 1, 0.4)])
+
+    assert len(segments) == 1
+    assert segments[0].text == "\n\n".join(BLOCKS[:4])
+    assert segments[0].score == 0.9
+
+
+def test_duplicate_and_unpositioned_chunks_are_kept_once():
+    loose = Document(page_content="A loose passage.", metadata={"file_name": "other.md", "relevance_score": 0.3})
+
+    segments = merge_segments([chunk(0, 0, 0.5), chunk(0, 0, 0.5), loose, loose])
+
+    assert [segment.text for segment in segments] == [BLOCKS[0], "A loose passage."]
+
+
+def test_distant_chunks_stay_apart_and_equal_text_is_kept_once():
+    segments = merge_segments([chunk(0, 0, 0.5), chunk(3, 3, 0.6), chunk(0, 0, 0.7, file_name="copy.md"), chunk(1, 1, 0.7, file_name="copy.md")])
+
+    assert sorted((segment.file_name, segment.text) for segment in segments) == [
+        ("copy.md", BLOCKS[1]), ("kafka.md", BLOCKS[0]), ("kafka.md", BLOCKS[3])
+    ]
+
+
+def test_join_without_overlap_drops_shared_blocks():
+    assert join_without_overlap("a\n\nb", "b\n\nc") == "a\n\nb\n\nc"
+    assert join_without_overlap("a\n\nb", "c") == "a\n\nb\n\nc"
+    assert join_without_overlap("a\n\nb\n\nc", "b") == "a\n\nb\n\nc"
+
+
+def test_pack_context_orders_by_score_under_numbered_headers():
+    packed = pack_context([chunk(0, 0, 0.2), chunk(3, 3, 0.9, heading="Lag")], max_tokens=1000)
+
+    assert packed.split(CONTEXT_SEPARATOR) == [f"[1] kafka.md › Lag\n{BLOCKS[3]}", f"[2] kafka.md › Consumers\n{BLOCKS[0]}"]
+
+
+def test_pack_context_stays_within_the_budget():
+    short = Document(page_content="Short and relevant.", metadata={"file_name": "short.md", "relevance_score": 0.9})
+    long = Document(page_content=" ".join(["word"] * 2000), metadata={"file_name": "long.md", "relevance_score": 0.5})
+    too_late = Document(page_content="Nothing left for this.", metadata={"file_name": "late.md", "relevance_score": 0.1})
+
+    packed = pack_context([long, short, too_late], max_tokens=300)
+
+    assert estimate_tokens(packed) <= 300
+    assert packed.startswith("[1] short.md\nShort and relevant.")
+    assert packed.endswith("…[truncated]")
+    assert "late.md" not in packed
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from types import SimpleNamespace
+from conftest import random_vectors
+from src.data_ingestion import ingestion_pipeline
+from src.embedding import DimensionReducer, ReducedDimensionEmbeddings
+from src.utils import config
+
+
+class RandomEmbeddings(Embeddings):
+    """Deterministic per-text vectors, standing in for the full-dimension base model."""
+
+    def __init__(self, dim: int = 32):
+        self.dim = dim
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return np.random.default_rng(abs(hash(text)) % 2**32).normal(size=self.dim).tolist()
+
+
+def make_reducer(tmp_path, target_dim=8):
+    return DimensionReducer("pca", target_dim, str(tmp_path / "projection.npz"))
+
+
+def test_pca_with_fewer_samples_than_target_dim_keeps_the_target_dim(tmp_path):
+    reducer = make_reducer(tmp_path, target_dim=8)
+    reducer.fit(random_vectors(5, dim=32))
+
+    assert reducer.is_fitted
+    reduced = reducer.transform(random_vectors(3, dim=32, seed=1))
+    assert reduced.shape == (3, 8)
+    assert np.allclose(reduced[:, 5:], 0)
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1)
+
+
+def test_pca_projection_is_reloaded_from_disk(tmp_path):
+    reducer = make_reducer(tmp_path)
+    reducer.fit(random_vectors(20, dim=32))
+    queries = random_vectors(4, dim=32, seed=1)
+
+    assert np.allclose(make_reducer(tmp_path).transform(queries), reducer.transform(queries), atol=1e-6)
+
+
+def test_pca_with_a_single_sample_stays_unfitted(tmp_path):
+    reducer = make_reducer(tmp_path)
+    reducer.fit(random_vectors(1, dim=32))
+
+    assert not reducer.is_fitted
+    with pytest.raises(ValueError):
+        reducer.transform(random_vectors(1, dim=32))
+
+
+def test_reset_drops_the_stored_projection(tmp_path):
+    reducer = make_reducer(tmp_path)
+    reducer.fit(random_vectors(20, dim=32))
+    reducer.reset()
+
+    assert not reducer.is_fitted
+    assert not make_reducer(tmp_path).is_fitted
+
+
+def test_fit_uses_the_given_chunks(tmp_path, monkeypatch):
+    model = ReducedDimensionEmbeddings(RandomEmbeddings(), make_reducer(tmp_path, target_dim=16))
+    monkeypatch.setattr(ingestion_pipeline, "embedding_model_instance", model)
+
+    ingestion_pipeline.fit_dimension_reduction([Document(page_content=f"chunk {i}") for i in range(3)])
+
+    assert model.reducer.is_fitted
+    assert len(model.embed_query("chunk 0")) == 16
+
+
+def test_fit_never_raises(tmp_path, monkeypatch):
+    model = ReducedDimensionEmbeddings(RandomEmbeddings(), make_reducer(tmp_path))
+
+    def fail(texts):
+        raise ConnectionError("embedding model is down")
+    monkeypatch.setattr(model.base_embeddings, "embed_documents", fail)
+    monkeypatch.setattr(ingestion_pipeline, "embedding_model_instance", model)
+
+    ingestion_pipeline.fit_dimension_reduction([Document(page_content="chunk")])
+
+    assert not model.reducer.is_fitted
+
+
+@pytest.fixture
+def pipeline_events(monkeypatch):
+    """Stubs the per-file steps of the ingestion pipeline and records the order they run in."""
+    events = []
+
+    class FakeDB:
+        def __enter__(self):
+            return SimpleNamespace(update_file_status=lambda *args, **kwargs: None)
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(ingestion_pipeline, "SQLiteDB", FakeDB)
+    monkeypatch.setattr(ingestion_pipeline, "chunk_single_file", lambda file: events.append(("chunk", file.id)) or [Document(page_content=f"{file.id} {i}") for i in range(2)])
+    monkeypatch.setattr(ingestion_pipeline, "upload_single_file", lambda file, chunks: events.append(("upload", file.id)))
+    monkeypatch.setattr(ingestion_pipeline, "fit_dimension_reduction", lambda chunks: events.append(("fit", len(chunks))))
+    monkeypatch.setattr(ingestion_pipeline, "save_note_centroids", lambda: None)
+    monkeypatch.setattr(ingestion_pipeline, "refresh_filename_index", lambda: None)
+    return events
+
+
+FILES = [SimpleNamespace(id=i, file_path=f"note{i}.md") for i in range(4)]
+
+
+def test_ingestion_streams_files_when_no_fit_is_needed(pipeline_events, monkeypatch):
+    monkeypatch.setattr(ingestion_pipeline, "needs_dimension_reduction_fit", lambda: False)
+
+    ingestion_pipeline.ingest_md_files_to_vector_database(FILES)
+
+    assert pipeline_events == [(step, i) for i in range(4) for step in ("chunk", "upload")]
+
+
+def test_ingestion_chunks_only_enough_files_ahead_to_fit_the_projection(pipeline_events, monkeypatch):
+    monkeypatch.setattr(ingestion_pipeline, "needs_dimension_reduction_fit", lambda: True)
+    monkeypatch.setattr(config, "EMBEDDING_PCA_FIT_SAMPLES", 3)
+
+    ingestion_pipeline.ingest_md_files_to_vector_database(FILES)
+
+    assert pipeline_events == [
+        ("chunk", 0), ("chunk", 1), ("fit", 4), ("upload", 0), ("upload", 1),
+        ("chunk", 2), ("upload", 2), ("chunk", 3), ("upload", 3),
+    ]
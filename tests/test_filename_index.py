@@ -0,0 +1,107 @@
+import pytest
+from conftest import WordEmbeddings
+from src.vector_store import vector_storage
+from src.vector_store.filename_index import FilenameIndex, filename_title
+from langchain_core.messages import AIMessage, HumanMessage
+from src.nodes.search_filter_fast_path import derive_search_filters
+from src.nodes.fast_answer_node import fast_search_filters
+
+NAMES = ["Notes.md", "Meeting.md", "Kafka.md", "Ideas.md", "project_alpha-PRD.md", "Kafka consumer lag.md", "OKR2024.md"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = FilenameIndex(str(tmp_path / "filenames.npz"), WordEmbeddings().embed_documents)
+    index.refresh(NAMES)
+    return index
+
+
+@pytest.fixture
+def installed_index(index, monkeypatch):
+    monkeypatch.setattr(vector_storage, "filename_index", index)
+    monkeypatch.setattr(vector_storage, "_filename_index_synced", True)
+    return index
+
+
+def briefing(intent, information):
+    return f"**User Intent:** {intent}\n**Information Required:** {information}\n**Contextual Nuances:** None"
+
+
+def mentioned(index, text, min_score=0.6):
+    return [name for name, _ in index.mentioned_names(text, min_score)]
+
+
+def test_filename_title_splits_separators():
+    assert filename_title("project_alpha-PRD.md") == "project alpha PRD"
+
+
+def test_single_common_words_are_not_mentions(index):
+    text = "Find what the user's notes say about the kafka meeting"
+
+    assert mentioned(index, text) == []
+
+
+def test_title_words_must_form_one_phrase_in_order(index):
+    assert mentioned(index, "Ideas the user had for a project; PRD alpha version") == []
+    assert mentioned(index, "What does the project alpha PRD say about pricing?") == ["project_alpha-PRD.md"]
+    assert mentioned(index, "Summarize project_alpha-PRD") == ["project_alpha-PRD.md"]
+
+
+def test_multi_word_titles_match_as_a_phrase(index):
+    text = "Find what the user's notes say about the kafka consumer lag meeting"
+
+    assert index.mentioned_names(text, 0.6) == [("Kafka consumer lag.md", 1.0)]
+
+
+def test_typos_lower_the_phrase_score(index):
+    (name, score), = index.mentioned_names("what about the kafka consumer lgas", 0.6)
+
+    assert name == "Kafka consumer lag.md"
+    assert 0.6 <= score < 1.0
+
+
+def test_single_word_titles_need_an_explicit_reference(index):
+    assert mentioned(index, "Open Kafka.md and list the topics") == ["Kafka.md"]
+    assert mentioned(index, "What is in [[Ideas]]?") == ["Ideas.md"]
+    assert mentioned(index, "Progress on the okr2024 goals") == ["OKR2024.md"]
+
+
+def test_top_matches_still_suggest_loose_matches(index):
+    assert "Kafka.md" in index.top_matches("kafka consumer lag", 3)
+
+
+def test_fast_path_ignores_topic_words_that_are_also_note_names(installed_index):
+    filters = derive_search_filters(briefing(
+        "Find what the user's notes say about the kafka meeting", "Ideas the user had for a project; PRD alpha version"
+    ))
+
+    assert filters is not None
+    assert filters.filenames_filter is None
+
+
+def test_fast_path_filters_on_a_named_note(installed_index):
+    filters = derive_search_filters(briefing("Summarize a note", "The open questions in the project alpha PRD"))
+
+    assert filters is not None
+    assert filters.filenames_filter == ["project_alpha-PRD.md"]
+
+
+def test_fast_mode_filters_on_a_named_note(installed_index):
+    filters = fast_search_filters([HumanMessage("What does the project alpha PRD say about pricing?")])
+
+    assert filters.filenames_filter == ["project_alpha-PRD.md"]
+
+
+def test_fast_mode_searches_everything_for_common_words_and_loose_matches(installed_index):
+    assert fast_search_filters([HumanMessage("Any ideas from the kafka meeting?")]).filenames_filter is None
+    assert fast_search_filters([HumanMessage("What about the kafka consumer lgas?")]).filenames_filter is None
+    assert fast_search_filters([HumanMessage("Compare the project alpha PRD with the kafka consumer lgas")]).filenames_filter is None
+
+
+def test_fast_mode_follow_ups_keep_the_previous_question(installed_index):
+    filters = fast_search_filters([
+        HumanMessage("What does the project alpha PRD say about pricing?"), AIMessage("It is usage based."), HumanMessage("And the risks?"),
+    ])
+
+    assert filters.refined_query_for_vector_search == "What does the project alpha PRD say about pricing? And the risks?"
+    assert filters.filenames_filter == ["project_alpha-PRD.md"]
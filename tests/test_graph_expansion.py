@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from conftest import NOTE_CHUNKS, WordEmbeddings, insert_file
+from src.utils import config
+from src.vector_store import vector_storage
+from src.vector_store.base_backend import SearchHit
+from src.vector_store.numpy_backend import NumpyVectorBackend
+
+
+@pytest.fixture
+def linked_vault(sqlite_db, tmp_path, monkeypatch):
+    """
+    NOTE_CHUNKS logged in SQLite and indexed in a NumPy backend under their log ids, with wikilinks
+    kafka -> postgres (and a missing note) and garden -> kafka. Returns the log id per file name.
+    """
+    embeddings = WordEmbeddings()
+    backend = NumpyVectorBackend(collection_name="links", persist_directory=str(tmp_path))
+    log_ids = {}
+    with sqlite_db() as db:
+        for file_name, texts in NOTE_CHUNKS.items():
+            log_id = log_ids[file_name] = insert_file(db, file_name)
+            metadatas = [{"file_name": file_name, "log_id": log_id, "chunk_index": i} for i in range(len(texts))]
+            backend.add([f"{file_name}:{i}" for i in range(len(texts))], np.asarray(embeddings.embed_documents(texts)), texts, metadatas)
+        db.replace_note_links(log_ids["kafka.md"], ["Postgres", "Ideas/Missing note"])
+        db.replace_note_links(log_ids["garden.md"], ["Archive/kafka.md"])
+    monkeypatch.setattr(vector_storage, "vector_store_instance", backend)
+    monkeypatch.setattr(config, "RETRIEVAL_SCORE_THRESHOLD", 0.0)
+    return log_ids
+
+
+def direct_hit(file_name, log_id):
+    return SearchHit(id=f"{file_name}:0", document=NOTE_CHUNKS[file_name][0], metadata={"file_name": file_name, "log_id": log_id}, score=0.9)
+
+
+def query(text):
+    return np.asarray([WordEmbeddings().embed_query(text)], dtype=np.float32)
+
+
+def test_links_resolve_by_note_name_in_both_directions(linked_vault, sqlite_db):
+    kafka, postgres, garden = (linked_vault[name] for name in ("kafka.md", "postgres.md", "garden.md"))
+    with sqlite_db() as db:
+        assert sorted(db.get_linked_file_ids([kafka])) == sorted([postgres, garden])
+        assert db.get_linked_file_ids([postgres]) == [kafka]
+        assert sorted(db.get_linked_file_ids([kafka, postgres])) == [garden]
+
+
+def test_links_to_missing_or_unfinished_notes_are_ignored(linked_vault, sqlite_db):
+    with sqlite_db() as db:
+        draft = insert_file(db, "Missing note.md", status="processing")
+        assert draft not in db.get_linked_file_ids([linked_vault["kafka.md"]])
+        db.cursor.execute("UPDATE obq_log SET status = 'completed' WHERE id = ?", (draft,))
+        db.connection.commit()
+        assert draft in db.get_linked_file_ids([linked_vault["kafka.md"]])
+
+
+def test_expansion_adds_at_most_extra_k_chunks_of_linked_notes(linked_vault):
+    hits = [direct_hit("kafka.md", linked_vault["kafka.md"])]
+
+    one = vector_storage.expand_with_linked_notes(query("postgres replication lag"), list(hits), None, extra_k=1)
+    many = vector_storage.expand_with_linked_notes(query("postgres replication lag"), list(hits), None, extra_k=10)
+
+    assert [hit.id for hit in one] == ["kafka.md:0", "postgres.md:1"]
+    assert one[1].metadata["retrieved_via"] == "wikilink"
+    assert sorted(hit.id for hit in many[1:]) == ["garden.md:0", "garden.md:1", "postgres.md:0", "postgres.md:1"]
+
+
+def test_only_the_top_seed_hits_are_followed(linked_vault, monkeypatch):
+    hits = [direct_hit("postgres.md", linked_vault["postgres.md"]), direct_hit("garden.md", linked_vault["garden.md"])]
+
+    monkeypatch.setattr(config, "GRAPH_EXPANSION_SEED_HITS", 0)
+    assert vector_storage.expand_with_linked_notes(query("kafka"), list(hits), None, extra_k=2) == hits
+
+    monkeypatch.setattr(config, "GRAPH_EXPANSION_SEED_HITS", 1)
+    expanded = vector_storage.expand_with_linked_notes(query("kafka"), list(hits), None, extra_k=2)
+    assert sorted(hit.id for hit in expanded[2:]) == ["kafka.md:0", "kafka.md:1"]
+
+
+def test_expansion_respects_the_search_filter(linked_vault):
+    hits = [direct_hit("kafka.md", linked_vault["kafka.md"])]
+
+    expanded = vector_storage.expand_with_linked_notes(query("lag"), hits, {"file_name": {"$in": ["kafka.md", "garden.md"]}}, extra_k=5)
+
+    assert {hit.metadata["file_name"] for hit in expanded[1:]} == {"garden.md"}
+
+
+def test_search_adds_graph_expansion_k_chunks_by_default(linked_vault, monkeypatch):
+    hits = [direct_hit("kafka.md", linked_vault["kafka.md"])]
+
+    monkeypatch.setattr(config, "GRAPH_EXPANSION_K", 0)
+    assert len(vector_storage.expand_hits_to_documents(query("lag"), list(hits), None, neighbour_window=0)) == 1
+    monkeypatch.setattr(config, "GRAPH_EXPANSION_K", 2)
+    documents = vector_storage.expand_hits_to_documents(query("lag"), list(hits), None, neighbour_window=0)
+    assert [doc.metadata.get("retrieved_via") for doc in documents] == [None, "wikilink", "wikilink"]
@@ -0,0 +1,68 @@
+import pytest
+from conftest import add_rows, insert_file, random_vectors
+from src.utils import config
+from src.vector_store import vector_storage
+from src.vector_store.numpy_backend import NumpyVectorBackend
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = NumpyVectorBackend(collection_name="test", persist_directory=str(tmp_path))
+    monkeypatch.setattr(vector_storage, "vector_store_instance", backend)
+    return backend
+
+
+def file_statuses(db_class):
+    with db_class() as db:
+        db.cursor.execute("SELECT status FROM obq_log ORDER BY id")
+        return [row[0] for row in db.cursor.fetchall()]
+
+
+def test_first_run_records_the_settings_without_a_rebuild(sqlite_db, backend):
+    add_rows(backend, random_vectors(3))
+    with sqlite_db() as db:
+        insert_file(db, "a.md")
+
+    assert vector_storage.reset_index_if_settings_changed() is False
+    assert vector_storage.recorded_index_settings() == vector_storage.current_index_settings()
+    assert vector_storage.reset_index_if_settings_changed() is False
+    assert backend.count() == 3
+
+
+def test_changed_backend_clears_the_index_and_requeues_every_file(sqlite_db, backend, monkeypatch):
+    add_rows(backend, random_vectors(3))
+    with sqlite_db() as db:
+        insert_file(db, "a.md")
+        insert_file(db, "b.md", status="failed")
+        insert_file(db, "c.md", status="pending")
+    vector_storage.reset_index_if_settings_changed()
+
+    monkeypatch.setattr(config, "OLLAMA_EMBEDDING_MODEL", "another-embedding-model")
+    assert vector_storage.reset_index_if_settings_changed() is True
+    assert backend.count() == 0
+    assert file_statuses(sqlite_db) == ["pending", "pending", "pending"]
+    assert vector_storage.recorded_index_settings()["embedding_model"] == "another-embedding-model"
+
+
+def test_empty_index_with_completed_files_is_rebuilt(sqlite_db, backend):
+    with sqlite_db() as db:
+        insert_file(db, "a.md")
+
+    assert vector_storage.reset_index_if_settings_changed() is True
+    assert file_statuses(sqlite_db) == ["pending"]
+
+
+def test_changed_embedding_reduction_clears_the_index(sqlite_db, backend, monkeypatch):
+    add_rows(backend, random_vectors(3))
+    with sqlite_db() as db:
+        insert_file(db, "a.md")
+    vector_storage.reset_index_if_settings_changed()
+
+    monkeypatch.setattr(config, "EMBEDDING_REDUCTION", "matryoshka")
+    assert vector_storage.reset_index_if_settings_changed() is True
+    assert backend.count() == 0
+
+    monkeypatch.setattr(config, "EMBEDDING_REDUCED_DIM", 128)
+    add_rows(backend, random_vectors(3))
+    assert vector_storage.reset_index_if_settings_changed() is True
+    assert vector_storage.recorded_index_settings()["embedding_reduced_dim"] == 128
@@ -0,0 +1,75 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.utils.message_history import RunningSummary, budget_agent_messages, estimate_tokens
+
+
+def turn(n, answer_words=40, tool_words=400):
+    """One agent turn: question, tool call, tool output and answer, with ids like the checkpointer assigns."""
+    return [
+        HumanMessage(content=f"question {n}", id=f"h{n}"),
+        AIMessage(content="", tool_calls=[{"name": "retrieve_notes", "args": {"q": str(n)}, "id": f"call{n}"}], id=f"a{n}"),
+        ToolMessage(content=" ".join(["note"] * tool_words), tool_call_id=f"call{n}", id=f"t{n}"),
+        AIMessage(content=" ".join([f"answer{n}"] * answer_words), id=f"r{n}"),
+    ]
+
+
+def conversation(turns):
+    return [message for n in range(turns) for message in turn(n)] + [HumanMessage(content="latest question", id="latest")]
+
+
+def test_short_conversations_are_unchanged_except_old_tool_outputs():
+    messages = conversation(1)
+
+    budgeted = budget_agent_messages(messages, max_tokens=10_000, tool_message_max_tokens=20)
+
+    assert [message.id for message in budgeted] == [message.id for message in messages]
+    assert estimate_tokens(budgeted[2].content) <= 25
+    assert budgeted[2].content.endswith("…[truncated]")
+
+
+def test_long_conversations_keep_the_current_turn_and_summarize_the_rest():
+    messages = conversation(10) + [
+        AIMessage(content="", tool_calls=[{"name": "retrieve_notes", "args": {}, "id": "current"}], id="current-call"),
+        ToolMessage(content=" ".join(["fresh"] * 100), tool_call_id="current", id="current-output"),
+    ]
+
+    budgeted = budget_agent_messages(messages, max_tokens=600, tool_message_max_tokens=20)
+
+    assert [message.id for message in budgeted[-3:]] == ["latest", "current-call", "current-output"]
+    assert budgeted[-1].content == messages[-1].content  # the current turn is never truncated
+    assert budgeted[0].content.startswith("[Summary of the earlier conversation]")
+    assert isinstance(budgeted[1], HumanMessage)  # kept history starts on a user message
+    first_kept_turn = int(budgeted[1].id[1:])
+    assert 0 < first_kept_turn < 10
+    assert f"User: question {first_kept_turn - 1}" in budgeted[0].content
+    called = {call["id"] for message in budgeted if isinstance(message, AIMessage) for call in message.tool_calls}
+    assert all(message.tool_call_id in called for message in budgeted if isinstance(message, ToolMessage))
+
+
+def test_running_summary_extends_incrementally():
+    summary = RunningSummary(max_tokens=1000)
+    summary.summarize(turn(0))
+    # same ids, other content: turns already summarized are not summarized again
+    rewritten = [message.model_copy(update={"content": "rewritten"}) for message in turn(0)]
+
+    extended = summary.summarize(rewritten + turn(1))
+
+    assert extended.startswith("User: question 0\n")
+    assert "rewritten" not in extended
+    assert "User: question 1" in extended
+
+
+def test_running_summary_drops_the_oldest_lines_beyond_its_budget():
+    summary = RunningSummary(max_tokens=100)
+
+    lines = summary.summarize(turn(0) + turn(1)).split("\n")
+
+    assert lines[0] == "User: question 1"
+    assert estimate_tokens("\n".join(lines)) <= 100
+
+
+def test_running_summary_starts_over_when_the_history_was_edited():
+    summary = RunningSummary(max_tokens=1000)
+    summary.summarize(turn(0))
+    edited = [turn(0)[0], HumanMessage(content="edited question", id="edited")]
+
+    assert summary.summarize(edited) == "User: question 0\nUser: edited question"
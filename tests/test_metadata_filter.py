@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.vector_store.metadata_filter import MetadataColumns, combine_filters
+
+METADATAS = [
+    {"file_name": "a.md", "tag:work": True, "note_date": 100.0, "priority": 1},
+    {"file_name": "b.md", "tag:work": True, "note_date": 200.0},
+    {"file_name": "c.md", "note_date": 300.0, "priority": True},
+    {"file_name": "a.md", "tag:home": True},
+]
+
+
+def mask(where):
+    return MetadataColumns(METADATAS).evaluate(where).tolist()
+
+
+def test_equality_and_membership():
+    assert mask({"file_name": "a.md"}) == [True, False, False, True]
+    assert mask({"file_name": {"$eq": "b.md"}}) == [False, True, False, False]
+    assert mask({"file_name": {"$in": ["b.md", "c.md", "missing.md"]}}) == [False, True, True, False]
+    assert mask({"file_name": {"$in": ["missing.md"]}}) == [False, False, False, False]
+
+
+def test_negations_skip_rows_without_the_key():
+    assert mask({"tag:work": {"$ne": False}}) == [True, True, False, False]
+    assert mask({"file_name": {"$nin": ["a.md"]}}) == [False, True, True, False]
+
+
+def test_true_and_one_are_different_values():
+    assert mask({"priority": 1}) == [True, False, False, False]
+    assert mask({"priority": True}) == [False, False, True, False]
+
+
+def test_range_operators_ignore_missing_and_non_numeric_values():
+    assert mask({"note_date": {"$gte": 200}}) == [False, True, True, False]
+    assert mask({"note_date": {"$gt": 100, "$lt": 300}}) == [False, True, False, False]
+    assert mask({"priority": {"$lte": 5}}) == [True, False, False, False]
+
+
+def test_and_or_nesting():
+    where = {"$or": [{"tag:work": True}, {"tag:home": True}], "note_date": {"$lte": 150}}
+    assert mask(where) == [True, False, False, False]
+    assert mask({"$and": [{"file_name": "a.md"}, {"$or": [{"tag:home": True}, {"note_date": {"$gte": 0}}]}]}) == [True, False, False, True]
+
+
+def test_unknown_operator_raises():
+    with pytest.raises(ValueError, match=r"\$like"):
+        mask({"file_name": {"$like": "a%"}})
+
+
+def test_empty_columns():
+    assert MetadataColumns([]).evaluate({"file_name": "a.md"}).shape == (0,)
+    assert np.all(MetadataColumns(METADATAS).evaluate({}))
+
+
+def test_combine_filters():
+    assert combine_filters() is None
+    assert combine_filters(None, {}) is None
+    assert combine_filters({"a": 1}, None) == {"a": 1}
+    assert combine_filters({"a": 1}, {"b": 2}) == {"$and": [{"a": 1}, {"b": 2}]}
@@ -0,0 +1,72 @@
+import pytest
+from langchain_core.documents import Document
+from conftest import insert_file
+from src.vector_store.vector_storage import expand_with_neighbour_chunks
+from src.utils.context_packing import ContextSegment
+
+
+def chunk(file_name, ordinal):
+    return Document(
+        page_content=f"{file_name} part {ordinal}",
+        metadata={"chunk_index": ordinal, "char_start": ordinal * 100, "char_end": ordinal * 100 + 90, "heading_path": "Notes"},
+    )
+
+
+@pytest.fixture
+def logged_notes(sqlite_db):
+    """Two notes of six logged chunks each, with ids '<note>:<ordinal>'. Returns their file ids."""
+    file_ids = {}
+    with sqlite_db() as db:
+        for file_name in ("kafka.md", "postgres.md"):
+            file_id = file_ids[file_name] = insert_file(db, file_name)
+            db.update_chunk_log(file_id, [f"{file_name}:{i}" for i in range(6)], [chunk(file_name, i) for i in range(6)])
+    return file_ids
+
+
+def hit(chunk_id, score):
+    file_name, ordinal = chunk_id.split(":")
+    return Document(id=chunk_id, page_content=f"{file_name} part {ordinal}",
+                    metadata={"file_name": file_name, "chunk_index": int(ordinal), "relevance_score": score})
+
+
+def test_windows_stop_at_the_start_and_end_of_a_note(logged_notes):
+    first, last = expand_with_neighbour_chunks([hit("kafka.md:0", 0.9), hit("postgres.md:5", 0.8)], window=2)
+
+    assert first.metadata["chunk_index_range"] == "0-2"
+    assert first.metadata["chunk_ids"] == ["kafka.md:0", "kafka.md:1", "kafka.md:2"]
+    assert (first.metadata["char_start"], first.metadata["char_end"]) == (0, 290)
+    assert last.metadata["chunk_index_range"] == "3-5"
+    assert last.page_content == "postgres.md part 3\n\npostgres.md part 4\n\npostgres.md part 5"
+
+
+def test_overlapping_windows_in_one_note_merge_into_one_passage(logged_notes):
+    expanded = expand_with_neighbour_chunks([hit("kafka.md:2", 0.6), hit("kafka.md:4", 0.9)], window=1)
+
+    assert len(expanded) == 1
+    merged = expanded[0]
+    assert merged.id == "kafka.md:4"
+    assert merged.metadata["relevance_score"] == 0.9
+    assert merged.metadata["chunk_index_range"] == "1-5"
+    assert merged.page_content.count("kafka.md part") == 5
+
+
+def test_separate_windows_stay_separate_and_unlogged_hits_pass_through(logged_notes):
+    unlogged = hit("garden.md:0", 0.7)
+    expanded = expand_with_neighbour_chunks([hit("kafka.md:0", 0.5), hit("kafka.md:5", 0.9), unlogged], window=1)
+
+    assert [doc.metadata.get("chunk_index_range") for doc in expanded] == ["4-5", None, "0-1"]
+    assert expanded[1] is unlogged
+
+
+def test_zero_window_returns_the_hits_unchanged(logged_notes):
+    hits = [hit("kafka.md:3", 0.5)]
+
+    assert expand_with_neighbour_chunks(hits, window=0) is hits
+
+
+def test_context_packing_reads_the_expanded_chunk_range(logged_notes):
+    merged, = expand_with_neighbour_chunks([hit("postgres.md:3", 0.8)], window=1)
+    segment = ContextSegment.from_document(merged)
+
+    assert (segment.first_chunk, segment.last_chunk) == (2, 4)
+    assert (segment.char_start, segment.char_end) == (200, 490)
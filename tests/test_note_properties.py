@@ -0,0 +1,65 @@
+from datetime import date, datetime
+from src.vector_store.vector_storage import build_metadata_filter
+from src.vector_store.metadata_filter import MetadataColumns
+from src.models import PropertyFilter, VectorSearchOutputSchema
+from src.data_ingestion.note_properties import (
+    build_chunk_metadata, extract_note_properties, property_value_for_filter, split_frontmatter
+)
+
+NOTE = """---
+Status: Active
+authors: [Ada, Grace Hopper]
+reviewed: 2024-05-17 09:30:00
+tags: [Work, project/alpha]
+---
+# Plan #Planning
+
+See [[Roadmap#Q3|the roadmap]] and ![[diagram.png]].
+`#not-a-tag` and [[Roadmap]] again.
+```
+#also-not-a-tag [[Not A Link]]
+```
+"""
+
+
+def matches(metadata, **properties):
+    query_filter = VectorSearchOutputSchema(
+        refined_query_for_vector_search="plan",
+        filter_rationale="test",
+        properties_filter=[PropertyFilter(name=name, value=value) for name, value in properties.items()],
+    )
+    return bool(MetadataColumns([metadata]).evaluate(build_metadata_filter(query_filter))[0])
+
+
+def test_frontmatter_tags_and_wikilinks_are_parsed():
+    properties = extract_note_properties(NOTE)
+
+    assert properties["frontmatter"]["Status"] == "Active"
+    assert properties["tags"] == ["work", "project/alpha", "planning"]
+    assert properties["wikilinks"] == ["Roadmap"]
+
+
+def test_blanked_frontmatter_keeps_body_offsets():
+    _, body = split_frontmatter(NOTE)
+
+    assert len(body) == len(NOTE)
+    assert body.index("# Plan") == NOTE.index("# Plan")
+
+
+def test_stored_values_are_normalized_like_filter_values():
+    assert property_value_for_filter(datetime(2024, 5, 17, 9, 30)) == property_value_for_filter("2024-05-17T09:30:00")
+    assert property_value_for_filter(date(2024, 5, 17)) == "2024-05-17"
+    assert property_value_for_filter(True) == property_value_for_filter("true")
+    assert property_value_for_filter(["Ada", "Grace Hopper"]) == "ada, grace hopper"
+
+
+def test_property_filters_match_scalars_datetimes_and_list_elements():
+    metadata = build_chunk_metadata(extract_note_properties(NOTE))
+
+    assert "prop:tags" not in metadata
+    assert matches(metadata, status="active")
+    assert matches(metadata, Reviewed="2024-05-17T09:30:00")
+    assert matches(metadata, authors="Grace Hopper")
+    assert matches(metadata, authors="ada, grace hopper")
+    assert not matches(metadata, authors="Hopper")
+    assert not matches(metadata, status="active", authors="Linus")
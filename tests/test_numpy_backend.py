@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from conftest import add_rows, random_vectors
+from src.vector_store.numpy_backend import NumpyVectorBackend
+
+
+def make_backend(tmp_path, **kwargs):
+    return NumpyVectorBackend(collection_name="test", persist_directory=str(tmp_path), **kwargs)
+
+
+def test_query_returns_exact_top_k(tmp_path):
+    backend = make_backend(tmp_path)
+    vectors = random_vectors(50)
+    add_rows(backend, vectors)
+    query = vectors[7] + 0.01 * vectors[3]
+
+    hits = backend.query(query[None, :], k=5)[0]
+    expected = np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:5]
+    assert [hit.id for hit in hits] == [f"c{i}" for i in expected]
+    assert hits[0].document == "text 7"
+    assert hits[0].score == pytest.approx(float(vectors[7] @ query / np.linalg.norm(query)), abs=1e-5)
+    assert all(a.score >= b.score for a, b in zip(hits, hits[1:]))
+
+
+def test_filters_are_applied_before_ranking(tmp_path):
+    backend = make_backend(tmp_path)
+    vectors = random_vectors(30)
+    add_rows(backend, vectors)
+
+    hits = backend.query(vectors[:1], k=30, where={"file_name": "note1.md"})[0]
+    assert len(hits) == 10
+    assert {hit.metadata["file_name"] for hit in hits} == {"note1.md"}
+    assert backend.query(vectors[:1], k=3, where={"file_name": "missing.md"}) == [[]]
+
+
+def test_deletes_are_tombstoned_and_survive_a_reopen(tmp_path):
+    backend = make_backend(tmp_path, compact_ratio=0.9)
+    vectors = random_vectors(20)
+    add_rows(backend, vectors)
+    backend.delete(["c0", "c1", "unknown"])
+
+    assert backend.count() == 18
+    assert len(backend._ids) == 20  # rows stay until compaction
+    hits = backend.query(vectors[:2], k=20)
+    assert all(hit.id not in ("c0", "c1") for query_hits in hits for hit in query_hits)
+
+    reopened = make_backend(tmp_path, compact_ratio=0.9)
+    assert reopened.count() == 18
+    assert reopened.query(vectors[5:6], k=1)[0][0].id == "c5"
+
+
+def test_compaction_keeps_alive_rows_only(tmp_path):
+    backend = make_backend(tmp_path, compact_ratio=0.25)
+    vectors = random_vectors(20)
+    add_rows(backend, vectors)
+    backend.delete([f"c{i}" for i in range(8)])
+
+    assert len(backend._ids) == backend.count() == 12
+    for i in (8, 13, 19):
+        hit = backend.query(vectors[i:i + 1], k=1)[0][0]
+        assert (hit.id, hit.document) == (f"c{i}", f"text {i}")
+
+    reopened = make_backend(tmp_path)
+    assert reopened.count() == 12
+    assert reopened.query(vectors[19:20], k=1)[0][0].id == "c19"
+
+
+def test_re_adding_an_id_replaces_the_row(tmp_path):
+    backend = make_backend(tmp_path)
+    vectors = random_vectors(5)
+    add_rows(backend, vectors)
+    backend.add(["c2"], vectors[4:5], ["replaced"], [{"file_name": "x.md"}])
+
+    assert backend.count() == 5
+    hits = backend.query(vectors[4:5], k=5)[0]
+    assert [hit.document for hit in hits if hit.id == "c2"] == ["replaced"]
+
+
+def test_dimension_mismatch_is_rejected_until_reset(tmp_path):
+    backend = make_backend(tmp_path)
+    add_rows(backend, random_vectors(4, dim=16))
+    with pytest.raises(ValueError):
+        add_rows(backend, random_vectors(2, dim=8), start=4)
+
+    backend.reset()
+    assert backend.count() == 0
+    add_rows(backend, random_vectors(2, dim=8))
+    assert make_backend(tmp_path).dim == 8
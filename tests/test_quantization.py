@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from conftest import add_rows, random_vectors
+from src.vector_store.numpy_backend import NumpyVectorBackend
+from src.vector_store.quantization import binary_scores, int8_scores, quantize_binary, quantize_int8
+from src.vector_store.vector_math import l2_normalize
+
+
+def noisy_queries(vectors, n, seed=1, noise=0.05):
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), size=n, replace=False)]
+    return l2_normalize(picked + rng.normal(scale=noise, size=picked.shape))
+
+
+def test_int8_scores_approximate_cosine():
+    vectors = random_vectors(200, dim=64)
+    queries = noisy_queries(vectors, 10)
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8 and scales.shape == (200,)
+    assert np.abs(int8_scores(codes, scales, queries) - vectors @ queries.T).max() < 0.02
+
+
+def test_binary_scores_are_negated_hamming_distances():
+    vectors = random_vectors(50, dim=20)
+    queries = random_vectors(3, dim=20, seed=5)
+    codes = quantize_binary(vectors)
+
+    assert codes.shape == (50, 3)  # 20 bits packed into 3 bytes
+    hamming = ((vectors > 0)[:, None, :] != (queries > 0)[None, :, :]).sum(axis=2)
+    assert np.array_equal(binary_scores(codes, queries), -hamming)
+
+
+# sign bits of isotropic random vectors carry little information, so binary needs a deeper shortlist here than on real embeddings
+@pytest.mark.parametrize("mode, rescore_factor, min_recall", [("int8", 4, 0.98), ("binary", 40, 0.9)])
+def test_quantized_search_recall_against_exact_search(tmp_path, mode, rescore_factor, min_recall):
+    vectors = random_vectors(1000, dim=64)
+    queries = noisy_queries(vectors, 50)
+    exact = NumpyVectorBackend("test", str(tmp_path))
+    add_rows(exact, vectors)
+    quantized = NumpyVectorBackend("test", str(tmp_path), quantization=mode, rescore_factor=rescore_factor)
+
+    truth = [{hit.id for hit in hits} for hits in exact.query(queries, k=5)]
+    found = quantized.query(queries, k=5)
+    recall = np.mean([len({hit.id for hit in hits} & expected) / 5 for hits, expected in zip(found, truth)])
+    assert recall >= min_recall
+    for query, hits in zip(queries, found):  # rescored hits carry exact scores
+        assert [hit.score for hit in hits] == pytest.approx((exact.get_embeddings([hit.id for hit in hits]) @ query).tolist(), abs=1e-5)
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_codes_stay_aligned_after_appends_compaction_and_reopen(tmp_path, mode):
+    vectors = random_vectors(300, dim=32)
+    backend = NumpyVectorBackend("test", str(tmp_path), quantization=mode, rescore_factor=4)
+    add_rows(backend, vectors[:200])
+    add_rows(backend, vectors[200:], start=200)
+    backend.delete([f"c{i}" for i in range(0, 300, 2)])  # compacts
+
+    reopened = NumpyVectorBackend("test", str(tmp_path), quantization=mode, rescore_factor=4)
+    for backend_under_test in (backend, reopened):
+        assert len(backend_under_test._codes) == len(backend_under_test._ids) == 150
+        for i in (1, 151, 299):
+            assert backend_under_test.query(vectors[i:i + 1], k=1)[0][0].id == f"c{i}"
+
+
+def test_ids_and_get_embeddings(tmp_path):
+    vectors = random_vectors(6)
+    backend = NumpyVectorBackend("test", str(tmp_path))
+    add_rows(backend, vectors)
+    backend.delete(["c1"])
+
+    assert backend.ids() == ["c0", "c2", "c3", "c4", "c5"]
+    assert np.allclose(backend.get_embeddings(["c4", "c0"]), vectors[[4, 0]])
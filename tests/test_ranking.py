@@ -0,0 +1,79 @@
+import time
+import numpy as np
+from conftest import random_vectors
+from src.utils import config
+from src.vector_store import vector_storage
+from src.vector_store.base_backend import SearchHit
+from src.vector_store.ranking import apply_recency_decay, maximal_marginal_relevance
+from src.vector_store.vector_math import l2_normalize
+
+DAY = 86400.0
+
+
+def reference_mmr(query, candidates, k, lambda_mult):
+    """The per-pair loop the vectorized MMR replaces; the first pick is the most relevant candidate."""
+    query, candidates = l2_normalize(query).reshape(-1), l2_normalize(candidates)
+    selected = [int(np.argmax(candidates @ query))]
+    while len(selected) < min(k, len(candidates)):
+        def score(i):
+            redundancy = max((float(candidates[i] @ candidates[j]) for j in selected), default=0.0)
+            return lambda_mult * float(candidates[i] @ query) - (1 - lambda_mult) * redundancy
+        selected.append(max((i for i in range(len(candidates)) if i not in selected), key=score))
+    return selected
+
+
+def test_mmr_matches_the_reference_loop():
+    candidates = random_vectors(40, seed=1)
+    query = random_vectors(1, seed=2)[0]
+    for lambda_mult in (0.0, 0.3, 0.5, 0.9):
+        assert maximal_marginal_relevance(query, candidates, 8, lambda_mult) == reference_mmr(query, candidates, 8, lambda_mult)
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([[1.0, 0.1, 0.0], [1.0, 0.11, 0.0], [0.7, 0.0, 0.7]])
+
+    assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=1.0) == [0, 1]
+    assert maximal_marginal_relevance(query, candidates, 2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_with_fewer_candidates_than_k():
+    candidates = random_vectors(3)
+
+    assert sorted(maximal_marginal_relevance(candidates[0], candidates, 10)) == [0, 1, 2]
+    assert maximal_marginal_relevance(candidates[0], candidates[:0], 10) == []
+
+
+def dated_hit(chunk_id, embedding, age_days, now):
+    embedding = l2_normalize(np.asarray(embedding, dtype=np.float32))
+    return SearchHit(
+        id=chunk_id, document=chunk_id, metadata={"note_date": now - age_days * DAY},
+        score=float(embedding[0]), embedding=embedding,
+    )
+
+
+def test_recency_decay_blends_age_into_the_score():
+    now = time.time()
+    hits = [dated_hit("old", [1, 0, 0], 30, now), dated_hit("new", [1, 0, 0], 0, now)]
+    hits.append(SearchHit(id="undated", document="", metadata={}, score=1.0))
+
+    decayed = apply_recency_decay(hits, half_life_days=30, weight=0.5, now=now)
+
+    assert [(hit.id, round(hit.score, 3)) for hit in decayed] == [("new", 1.0), ("old", 0.75), ("undated", 0.5)]
+
+
+def test_mmr_ranks_by_the_recency_decayed_scores(monkeypatch):
+    monkeypatch.setattr(config, "RETRIEVAL_SCORE_THRESHOLD", 0.0)
+    monkeypatch.setattr(config, "RECENCY_HALF_LIFE_DAYS", 30.0)
+    monkeypatch.setattr(config, "RECENCY_WEIGHT", 0.5)
+    monkeypatch.setattr(config, "MMR_LAMBDA", 0.5)
+    now = time.time()
+    hits = [
+        dated_hit("old", [1.0, 0.05, 0.0], 365, now),
+        dated_hit("recent", [0.95, 0.3, 0.0], 1, now),
+        dated_hit("unrelated", [0.1, 0.0, 1.0], 1, now),
+    ]
+
+    ranked = vector_storage.rank_hits(np.array([1.0, 0.0, 0.0]), hits, k=1, mode="mmr")
+
+    assert [hit.id for hit in ranked] == ["recent"]
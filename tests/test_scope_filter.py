@@ -0,0 +1,72 @@
+import ntpath
+from src.vector_store.vector_storage import build_scope_clause
+from src.vector_store.metadata_filter import MetadataColumns
+from src.data_ingestion import note_properties
+from src.data_ingestion.note_properties import MAX_SCOPE_DEPTH, build_folder_metadata, build_heading_metadata
+from src.models import VectorSearchOutputSchema
+
+
+def scope(folder=None, heading=None):
+    return build_scope_clause(VectorSearchOutputSchema(
+        refined_query_for_vector_search="q", filter_rationale="test", folder_scope=folder, heading_scope=heading,
+    ))
+
+
+def matches(where, *metadatas):
+    return MetadataColumns(list(metadatas)).evaluate(where).tolist()
+
+
+def test_folder_metadata_is_relative_to_the_vault_and_lowercased():
+    metadata = build_folder_metadata("/vault/Projects/Alpha  Beta/note.md", "/vault")
+
+    assert metadata == {"folder_path": "Projects/Alpha  Beta", "folder_0": "projects", "folder_1": "alpha beta"}
+    assert build_folder_metadata("/vault/note.md", "/vault") == {"folder_path": ""}
+
+
+def test_folder_metadata_of_windows_paths(monkeypatch):
+    with monkeypatch.context() as patched:
+        patched.setattr(note_properties.os, "path", ntpath)
+        metadata = build_folder_metadata(r"E:\Notes\Vault\Projects\Alpha\note.md", r"E:\Notes\Vault")
+
+    assert metadata == {"folder_path": "Projects/Alpha", "folder_0": "projects", "folder_1": "alpha"}
+
+
+def test_folder_scope_is_a_prefix_match_on_folder_levels():
+    where = scope(folder="Projects/Alpha/**")
+    alpha = build_folder_metadata("/vault/Projects/Alpha/note.md", "/vault")
+    nested = build_folder_metadata("/vault/Projects/Alpha/Specs/api.md", "/vault")
+    sibling = build_folder_metadata("/vault/Projects/Beta/note.md", "/vault")
+
+    assert where == {"$and": [{"folder_0": "projects"}, {"folder_1": "alpha"}]}
+    assert matches(where, alpha, nested, sibling) == [True, True, False]
+
+
+def test_folder_scope_accepts_windows_separators_and_any_case():
+    assert scope(folder=r"projects\ALPHA\\") == scope(folder="Projects/Alpha")
+    assert scope(folder="./Projects/*") == {"folder_0": "projects"}
+    assert scope(folder="**") is None
+
+
+def test_heading_breadcrumb_matches_from_the_top_heading():
+    where = scope(heading="Design > API")
+    chunks = [build_heading_metadata(trail) for trail in (["Design", "API", "Errors"], ["API"], ["Design", "Data"])]
+
+    assert matches(where, *chunks) == [True, False, False]
+
+
+def test_single_heading_matches_that_section_at_any_depth():
+    where = scope(heading="  action   ITEMS ")
+    chunks = [build_heading_metadata(trail) for trail in (["Action Items"], ["Meeting", "Action items"], ["Notes"])]
+
+    assert matches(where, *chunks) == [True, True, False]
+
+
+def test_scopes_stop_at_the_max_depth():
+    deep = [f"level {i}" for i in range(MAX_SCOPE_DEPTH + 2)]
+    folder = build_folder_metadata("/vault/" + "/".join(deep) + "/note.md", "/vault")
+    where = scope(folder="/".join(deep), heading=" > ".join(deep))
+
+    assert f"folder_{MAX_SCOPE_DEPTH - 1}" in folder and f"folder_{MAX_SCOPE_DEPTH}" not in folder
+    assert len(build_heading_metadata(deep)) == MAX_SCOPE_DEPTH
+    assert len(where["$and"]) == 2 * MAX_SCOPE_DEPTH
+    assert matches(where, folder | build_heading_metadata(deep)) == [True]
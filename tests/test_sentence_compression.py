@@ -0,0 +1,78 @@
+import numpy as np
+from langchain_core.documents import Document
+from conftest import WordEmbeddings
+from src.vector_store import sentence_compression
+from src.vector_store.sentence_compression import OMISSION_MARKER, _compress_units, split_sentences
+
+CHUNK = """Kafka consumers read partitions. Lag grows when they fall behind! Is it bad? Yes.
+
+## Remedies
+- Add consumers to the group
+- Raise max.poll.records
+> Quoted advice about lag.
+
+```
+consumer.poll(100)
+```
+
+The garden needs water. Tomatoes too."""
+
+
+def test_split_sentences_keeps_structure_as_units():
+    assert split_sentences(CHUNK) == [
+        (0, "Kafka consumers read partitions."),
+        (0, "Lag grows when they fall behind!"),
+        (0, "Is it bad?"),
+        (0, "Yes."),
+        (1, "## Remedies"),
+        (1, "- Add consumers to the group"),
+        (1, "- Raise max.poll.records"),
+        (1, "> Quoted advice about lag."),
+        (2, "```\nconsumer.poll(100)\n```"),
+        (3, "The garden needs water."),
+        (3, "Tomatoes too."),
+    ]
+
+
+def test_split_sentences_does_not_split_abbreviations_or_decimals():
+    assert split_sentences("Version 2.5 of e.g. the client works. next line stays") == [
+        (0, "Version 2.5 of e.g. the client works. next line stays")
+    ]
+
+
+def compress(units, query, max_tokens, already_kept=()):
+    embeddings = WordEmbeddings(dim=512)
+    lookup = {sentence: np.asarray(embeddings.embed_query(sentence), dtype=np.float32) for _, sentence in units}
+    return _compress_units(units, lookup, np.asarray(embeddings.embed_query(query), dtype=np.float32), max_tokens, set(already_kept))
+
+
+def test_compression_keeps_the_closest_sentences_in_order_with_markers():
+    units = split_sentences(CHUNK)
+
+    assert compress(units, "when does lag grow behind", max_tokens=8) == f"{OMISSION_MARKER} Lag grows when they fall behind! {OMISSION_MARKER}"
+
+    text = compress(units, "kafka consumers read partitions and lag grows when they fall behind", max_tokens=16)
+    assert text == f"Kafka consumers read partitions. Lag grows when they fall behind! {OMISSION_MARKER}"
+
+
+def test_compression_skips_sentences_kept_from_an_overlapping_chunk():
+    units = split_sentences(CHUNK)
+
+    text = compress(units, "kafka consumers read partitions and lag grows when they fall behind", max_tokens=16,
+                    already_kept=["Kafka consumers read partitions."])
+
+    assert text.startswith(f"{OMISSION_MARKER} Lag grows when they fall behind!")
+    assert compress(units[:1], "kafka", max_tokens=20, already_kept=[units[0][1]]) == ""
+
+
+def test_compress_documents_leaves_short_chunks_alone(sqlite_db, monkeypatch):
+    monkeypatch.setattr(sentence_compression, "embedding_model_instance", WordEmbeddings())
+    short = Document(page_content="Kafka lag.", metadata={"file_name": "kafka.md"})
+    long = Document(page_content=CHUNK, metadata={"file_name": "kafka.md"})
+
+    compressed = sentence_compression.compress_documents("garden water", [short, long], max_tokens=10)
+
+    assert compressed[0].page_content == "Kafka lag." and not compressed[0].metadata["compressed"]
+    assert compressed[1].metadata["compressed"]
+    assert "The garden needs water." in compressed[1].page_content
+    assert "Kafka consumers" not in compressed[1].page_content
@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+import pytest
+from conftest import NOTE_CHUNKS, WordEmbeddings, random_vectors
+from src.utils import config
+from src.vector_store import vector_storage
+from src.vector_store.filename_index import FilenameIndex
+from src.models import VectorSearchOutputSchema
+from src.models.rag_agent_output_model import SubQuery
+from src.nodes import rag_agent_tool_node
+from src.nodes.search_filter_fast_path import briefing_search_text
+
+SEARCH_OPTIONS = {"k": 2, "mode": "similarity", "neighbour_window": 0, "graph_expansion_k": 0}
+
+
+def search(query, **filters):
+    return VectorSearchOutputSchema(refined_query_for_vector_search=query, filter_rationale="test", **filters)
+
+
+def ranked(documents):
+    return [(doc.id, round(doc.metadata["relevance_score"], 5)) for doc in documents]
+
+
+def test_candidates_are_rescored_with_the_refined_query(search_index):
+    speculation = vector_storage.start_speculative_search("lag alerts nightly")
+    refined = search("replication lag alerts nightly")
+
+    reused = vector_storage.similarity_search_from_speculation(speculation, refined, **SEARCH_OPTIONS)
+
+    assert reused is not None
+    assert ranked(reused) == ranked(vector_storage.similarity_search(refined, **SEARCH_OPTIONS))
+    assert reused[0].id == "postgres.md:1"
+
+
+def test_too_few_filtered_candidates_fall_back_to_a_regular_search(search_index, monkeypatch):
+    monkeypatch.setattr(config, "SPECULATIVE_FETCH_K", 2)
+    speculation = vector_storage.start_speculative_search("kafka lag")
+
+    assert vector_storage.similarity_search_from_speculation(
+        speculation, search("kafka lag", filenames_filter=["garden.md"]), **SEARCH_OPTIONS
+    ) is None
+
+
+def test_low_query_overlap_discards_the_speculation(search_index):
+    speculation = vector_storage.SpeculativeSearch(query_text="kafka lag", query_vector=random_vectors(1, dim=64), future=Future())
+
+    assert vector_storage.similarity_search_from_speculation(speculation, search("garden fence paint")) is None
+    assert speculation.future.cancelled()
+
+
+def test_sub_query_briefings_cancel_the_speculation(search_index, monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_COMPRESSION", False)
+    speculation = vector_storage.SpeculativeSearch(query_text="kafka lag", query_vector=random_vectors(1, dim=64), future=Future())
+    query_filters = search("kafka lag", sub_queries=[SubQuery(query="postgres vacuum")])
+
+    documents = rag_agent_tool_node.retrieve_context(query_filters, speculation)
+
+    assert speculation.future.cancelled()
+    assert {doc.metadata["file_name"] for doc in documents} >= {"kafka.md", "postgres.md"}
+
+
+BRIEFING = "**User Intent:** Check replication\n**Information Required:** postgres replication lag alerts\n**Contextual Nuances:** None"
+
+
+@pytest.fixture
+def embedded_texts(search_index, tmp_path, monkeypatch):
+    """Installs a filename index over NOTE_CHUNKS that suggests one name, and records every embedded query."""
+    index = FilenameIndex(str(tmp_path / "filenames.npz"), WordEmbeddings().embed_documents)
+    index.refresh(list(NOTE_CHUNKS))
+    monkeypatch.setattr(vector_storage, "filename_index", index)
+    monkeypatch.setattr(vector_storage, "_filename_index_synced", True)
+    monkeypatch.setattr(config, "FILENAME_CANDIDATES", 1)
+    texts = []
+    embed_query = vector_storage.embedding_model_instance.embed_query
+    monkeypatch.setattr(vector_storage.embedding_model_instance, "embed_query", lambda text: texts.append(text) or embed_query(text))
+    return texts
+
+
+def test_filter_prompt_reuses_the_speculation_vector(embedded_texts):
+    speculation = vector_storage.start_speculative_search(briefing_search_text(BRIEFING))
+    prompt = rag_agent_tool_node.build_vector_search_filter_prompt(BRIEFING, "", speculation)
+
+    assert embedded_texts == [briefing_search_text(BRIEFING)]
+    assert "- postgres.md" in prompt.to_string()
+
+
+def test_filter_prompt_embeds_the_briefing_search_text_without_a_speculation(embedded_texts):
+    prompt = rag_agent_tool_node.build_vector_search_filter_prompt(BRIEFING, "")
+
+    assert embedded_texts == [briefing_search_text(BRIEFING)]
+    assert "- postgres.md" in prompt.to_string()
@@ -0,0 +1,92 @@
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from src.graph.sqlite_checkpointer import BoundedSQLiteSaver
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = BoundedSQLiteSaver(str(tmp_path / "checkpoints.db"), maintenance_interval=3600)
+    yield saver
+    saver.close()
+
+
+def put(saver, thread_id, messages, parent=None):
+    """Stores a checkpoint holding `messages` and returns its config."""
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": messages}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "", **({"checkpoint_id": parent} if parent else {})}}
+    return saver.put(config, checkpoint, {"step": len(messages)}, {})
+
+
+def put_thread(saver, thread_id, turns):
+    config = None
+    for turn in range(turns):
+        config = put(saver, thread_id, [f"message {i}" for i in range(turn + 1)], config and config["configurable"]["checkpoint_id"])
+    return config
+
+
+def thread_ids(saver):
+    return sorted(row[0] for row in saver.connection.execute("SELECT thread_id FROM obq_checkpoint_thread"))
+
+
+def test_latest_checkpoint_and_writes_round_trip(saver):
+    config = put_thread(saver, "t1", 3)
+    saver.put_writes(config, [("messages", "pending")], task_id="task")
+
+    latest = saver.get_tuple({"configurable": {"thread_id": "t1"}})
+
+    assert latest.checkpoint["channel_values"]["messages"] == ["message 0", "message 1", "message 2"]
+    assert latest.metadata["step"] == 3
+    assert latest.parent_config is not None
+    assert latest.pending_writes == [("task", "messages", "pending")]
+    assert len(list(saver.list({"configurable": {"thread_id": "t1"}}))) == 3
+
+
+def test_threads_survive_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    first = BoundedSQLiteSaver(path)
+    put_thread(first, "t1", 2)
+    first.close()
+
+    second = BoundedSQLiteSaver(path)
+    assert second.get_tuple({"configurable": {"thread_id": "t1"}}).checkpoint["channel_values"]["messages"] == ["message 0", "message 1"]
+    second.close()
+
+
+def test_compaction_keeps_the_newest_checkpoints_and_their_writes(saver):
+    saver.keep_per_thread = 2
+    configs = []
+    for turn in range(4):
+        configs.append(put(saver, "t1", [f"message {turn}"]))
+        saver.put_writes(configs[-1], [("messages", f"write {turn}")], task_id="task")
+
+    saver.maintain()
+
+    kept = [item.config["configurable"]["checkpoint_id"] for item in saver.list({"configurable": {"thread_id": "t1"}})]
+    assert kept == [configs[3]["configurable"]["checkpoint_id"], configs[2]["configurable"]["checkpoint_id"]]
+    assert saver.connection.execute("SELECT COUNT(*) FROM obq_checkpoint_write").fetchone()[0] == 2
+
+
+def test_idle_threads_expire(saver):
+    put_thread(saver, "idle", 1)
+    put_thread(saver, "active", 1)
+    with saver.connection:
+        saver.connection.execute("UPDATE obq_checkpoint_thread SET last_access = last_access - ? WHERE thread_id = 'idle'", (saver.ttl_seconds + 1,))
+
+    saver.maintain()
+
+    assert thread_ids(saver) == ["active"]
+    assert saver.get_tuple({"configurable": {"thread_id": "idle"}}) is None
+
+
+def test_least_recently_used_threads_are_evicted_above_the_size_bound(saver):
+    for last_access, thread_id in enumerate(("oldest", "older", "newest")):
+        put_thread(saver, thread_id, 1)
+        with saver.connection:
+            saver.connection.execute("UPDATE obq_checkpoint_thread SET last_access = ? WHERE thread_id = ?", (last_access, thread_id))
+    saver.ttl_seconds = float("inf")
+    saver.max_bytes = 1
+
+    saver.maintain()
+
+    assert thread_ids(saver) == ["newest"]
@@ -0,0 +1,45 @@
+import asyncio
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from src.graph.base_graph import BoundedToolNode
+
+
+def tracking_tool(counters):
+    """An async tool that records how many of its calls are running at once."""
+    async def lookup(topic: str) -> str:
+        counters["running"] += 1
+        counters["peak"] = max(counters["peak"], counters["running"])
+        await asyncio.sleep(0.02)
+        counters["running"] -= 1
+        return topic
+
+    return StructuredTool.from_function(coroutine=lookup, name="lookup", description="Looks a topic up.")
+
+
+def ai_message(*topics):
+    return AIMessage("", tool_calls=[{"name": "lookup", "args": {"topic": topic}, "id": f"call-{topic}"} for topic in topics])
+
+
+def test_tool_calls_of_one_message_overlap_up_to_the_cap():
+    counters = {"running": 0, "peak": 0}
+    node = BoundedToolNode([tracking_tool(counters)], max_concurrency=2)
+
+    result = asyncio.run(node.ainvoke({"messages": [ai_message("a", "b", "c", "d", "e")]}))
+
+    assert counters["peak"] == 2
+    assert [message.content for message in result["messages"]] == ["a", "b", "c", "d", "e"]
+
+
+def test_each_message_gets_its_own_slots():
+    counters = {"running": 0, "peak": 0}
+    node = BoundedToolNode([tracking_tool(counters)], max_concurrency=2)
+
+    async def two_conversations():
+        await asyncio.gather(
+            node.ainvoke({"messages": [ai_message("a", "b")]}),
+            node.ainvoke({"messages": [ai_message("c", "d")]}),
+        )
+
+    asyncio.run(two_conversations())
+
+    assert counters["peak"] == 4